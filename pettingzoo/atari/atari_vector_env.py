@@ -0,0 +1,106 @@
+import numpy as np
+from gym.error import AlreadyPendingCallError
+
+from pettingzoo.utils.vector import AsyncVectorParallelEnv
+
+from .base_atari_env import ParallelAtariEnv
+
+
+class _TemplateEnvFn:
+    # constructor of the environments of the workers: they are forked, so
+    # they get their own copy of the template environment
+    def __init__(self, env):
+        self.env = env
+
+    def __call__(self):
+        return self.env
+
+
+class AtariVectorEnv(AsyncVectorParallelEnv):
+    """
+    Runs `num_envs` copies of an Atari environment in worker processes
+    forked from a single template environment, built by
+    `env_fn(**env_kwargs)`:
+
+        env = AtariVectorEnv(pong_v3.parallel_env, 8, obs_type="grayscale_image")
+        obs = env.reset(seed=42)  # shape (8, 2, 210, 160, 1), uint8
+        obs, rewards, dones, infos = env.step(actions)  # actions shape (8, 2)
+
+    The ROM is found and loaded once, by the template; the workers start
+    from copies of its emulator instead of building their own. Like in
+    AsyncVectorParallelEnv, the observations (RAM or screens, as uint8
+    arrays shaped like `observation_space(agent)`), rewards and dones are
+    written into shared memory. The actions of a step are also written into
+    a shared (num_envs, num_agents) int32 array, so that only the step
+    commands and the info dicts go through the pipes. As the workers step
+    the raw environments, the actions of the live agents are checked
+    against the action spaces before being written.
+
+    The first reset without a seed seeds each sub-environment with a random
+    seed drawn from `np_random`, as the workers are otherwise identical
+    copies of the template; so does the reset of a restarted worker.
+    Forking is not available on Windows.
+    """
+
+    _shared_array_names = AsyncVectorParallelEnv._shared_array_names + ("_actions",)
+
+    def __init__(
+        self, env_fn, num_envs, copy=True, restart_on_crash=True, **env_kwargs
+    ):
+        self.env = env_fn(**env_kwargs).unwrapped
+        assert isinstance(
+            self.env, ParallelAtariEnv
+        ), "AtariVectorEnv needs an Atari environment"
+        self._seeded = False
+        # seeds of the sub-environments when none is given, see reset
+        self.np_random = np.random.default_rng()
+        super().__init__(
+            [_TemplateEnvFn(self.env)] * num_envs,
+            copy=copy,
+            context="fork",
+            restart_on_crash=restart_on_crash,
+            template_env=self.env,
+        )
+        # the workers step the raw environments, the actions are checked here
+        self._num_actions = np.array(
+            [self.action_space(agent).n for agent in self.possible_agents]
+        )
+
+    def _start_workers(self):
+        self._actions = self._allocate((self.num_envs, self.max_num_agents), np.int32)
+        super()._start_workers()
+
+    def reset(self, seed=None, return_info=False, options=None):
+        if seed is None and not self._seeded:
+            seed = [self._restart_seed(i) for i in range(self.num_envs)]
+        result = super().reset(seed=seed, return_info=return_info, options=options)
+        self._seeded = True
+        return result
+
+    def _restart_seed(self, index):
+        # restarted workers are fresh copies of the template too
+        return int(self.np_random.integers(2**31))
+
+    def step_async(self, actions):
+        """
+        Writes the actions into the shared action array and sends the step
+        commands to the workers without waiting for the results.
+        """
+        self._assert_is_running()
+        if self._waiting is not None:
+            raise AlreadyPendingCallError(
+                f"Calling `step_async` while waiting for a pending call to `{self._waiting}` to complete",
+                self._waiting,
+            )
+        actions = np.asarray(actions)
+        assert (
+            ((actions >= 0) & (actions < self._num_actions)) | ~self.alive_mask
+        ).all(), "action is not in action space"
+        self._actions[...] = actions
+        for i in range(self.num_envs):
+            self._send(i, "step", None)
+        self._waiting = "step"
+
+    def close(self, timeout=None, terminate=False):
+        super().close(timeout=timeout, terminate=terminate)
+        self.env.close()
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from pathlib import Path
 
 import gym
@@ -24,10 +25,107 @@ def base_env_wrapper_fn(raw_env_fn):
     return env_fn
 
 
+def area_weights(size, new_size):
+    """
+    Returns the (new_size, size) float32 matrix that resizes an axis of
+    `size` pixels to `new_size` pixels with area interpolation: each new
+    pixel is the average of the old pixels it covers, weighted by overlap.
+    """
+    scale = size / new_size
+    edges = np.arange(new_size + 1) * scale
+    pixels = np.arange(size)
+    overlap = np.minimum(edges[1:, None], pixels + 1) - np.maximum(
+        edges[:-1, None], pixels
+    )
+    return (np.clip(overlap, 0, None) / scale).astype(np.float32)
+
+
+def area_taps(size, new_size):
+    """
+    Returns the nonzero entries of area_weights(size, new_size) as two
+    (new_size, taps) arrays, the indices of the old pixels that each new
+    pixel covers and their weights, padded with zero weights.
+    """
+    weights = area_weights(size, new_size)
+    taps = int(np.max(np.sum(weights > 0, axis=1)))
+    index = np.argsort(weights == 0, axis=1, kind="stable")[:, :taps]
+    return index, np.take_along_axis(weights, index, axis=1)
+
+
+# paths of the ROMs found by find_rom, by (game, auto_rom_install_path)
+_rom_paths = {}
+
+
+def find_rom(game, auto_rom_install_path=None):
+    """
+    Returns the path of the ROM of `game`, looked up once per process.
+    """
+    key = (game, auto_rom_install_path)
+    if key in _rom_paths:
+        return _rom_paths[key]
+
+    if auto_rom_install_path is None:
+        start = Path(multi_agent_ale_py.__file__).parent
+    else:
+        start = Path(auto_rom_install_path).resolve()
+
+    # start looking in local directory
+    final = start / f"{game}.bin"
+    if not final.exists():
+        # if that doesn't work, look in 'roms'
+        final = start / "roms" / f"{game}.bin"
+
+    if not final.exists():
+        # use old AutoROM install path as backup
+        final = start / "ROM" / game / f"{game}.bin"
+
+    if not final.exists():
+        raise OSError(
+            f"rom {game} is not installed. Please install roms using AutoROM tool (https://github.com/Farama-Foundation/AutoROM) "
+            "or specify and double-check the path to your Atari rom using the `rom_path` argument."
+        )
+
+    _rom_paths[key] = str(final)
+    return _rom_paths[key]
+
+
+def base_parallel_env_wrapper_fn(raw_env_fn):
+    # parallel environments wrap the ParallelAtariEnv of raw_env_fn directly,
+    # instead of stepping it agent by agent through the AEC wrappers
+    def env_fn(**kwargs):
+        env = raw_env_fn(**kwargs).env
+        env = wrappers.ParallelAssertOutOfBoundsWrapper(env)
+        env = wrappers.ParallelOrderEnforcingWrapper(env)
+        return env
+
+    return env_fn
+
+
 def BaseAtariEnv(**kwargs):
     return parallel_to_aec_wrapper(ParallelAtariEnv(**kwargs))
 
 
+class AtariSnapshot:
+    """
+    State of a ParallelAtariEnv saved by its `snapshot` method: the ALE
+    system state, which is freed by `release` or garbage collection, and the
+    state of the environment around it.
+    """
+
+    def __init__(self, ale, state, env_state):
+        self.ale = ale
+        self.state = state
+        self.env_state = env_state
+
+    def release(self):
+        if self.state is not None:
+            self.ale.deleteState(self.state)
+            self.state = None
+
+    def __del__(self):
+        self.release()
+
+
 class ParallelAtariEnv(ParallelEnv, EzPickle):
     def __init__(
         self,
@@ -40,9 +138,37 @@ class ParallelAtariEnv(ParallelEnv, EzPickle):
         env_name=None,
         max_cycles=100000,
         auto_rom_install_path=None,
+        frameskip=1,
+        max_pool=False,
+        resize=None,
+        stack=1,
+        shared_obs=False,
+        reset_cache_size=0,
     ):
         """Frameskip should be either a tuple (indicating a random range to
-        choose from, with the top value exclude), or an int."""
+        choose from, with the top value exclude), or an int.
+
+        Each step repeats the actions for `frameskip` frames and sums the
+        rewards. The observations can be preprocessed like in the usual
+        Atari pipeline: with `max_pool`, the image is the maximum of the
+        last two frames of the step, which needs a frameskip of at least 2;
+        `resize=(height, width)` resizes the image with area interpolation;
+        `stack` concatenates the last `stack` observations along the last
+        axis, the missing ones being zero after a reset. The screens are read straight into preallocated uint8
+        buffers, so the observation shared by the agents is the only array
+        allocated per step.
+
+        With `shared_obs`, no array is allocated at all: the observation is
+        written into one persistent buffer, and every agent gets the same
+        read-only view of it, which the next step or reset overwrites in
+        place. Copy observations that must outlive the step.
+        `observe_batch` then returns a (num_agents, ...) view of the buffer
+        with a zero stride along the agents.
+
+        With `reset_cache_size` > 0, the emulator states right after seeded
+        resets are kept for the last `reset_cache_size` seeds, and resetting
+        with one of these seeds restores its state instead of loading the
+        ROM again."""
         EzPickle.__init__(
             self,
             game,
@@ -54,6 +180,12 @@ class ParallelAtariEnv(ParallelEnv, EzPickle):
             env_name,
             max_cycles,
             auto_rom_install_path,
+            frameskip,
+            max_pool,
+            resize,
+            stack,
+            shared_obs,
+            reset_cache_size,
         )
 
         assert obs_type in (
@@ -61,7 +193,28 @@ class ParallelAtariEnv(ParallelEnv, EzPickle):
             "rgb_image",
             "grayscale_image",
         ), "obs_type must  either be 'ram' or 'rgb_image' or 'grayscale_image'"
+        assert obs_type != "ram" or (
+            not max_pool and resize is None
+        ), "max_pool and resize only apply to image observations"
+        assert (
+            not max_pool
+            or (min(frameskip) if isinstance(frameskip, tuple) else frameskip) > 1
+        ), "max_pool needs a frameskip of at least 2"
+        assert stack >= 1, "stack must be at least 1"
         self.obs_type = obs_type
+        self.frameskip = frameskip
+        self.max_pool = max_pool
+        self.resize = resize
+        self.stack = stack
+        self.shared_obs = shared_obs
+        self.reset_cache_size = reset_cache_size
+        # ALE states after seeded resets, by (rom, mode, seed), least
+        # recently used first
+        self._reset_cache = OrderedDict()
+        # raw observation and RGB screen of a restored state, which the ALE
+        # does not restore; the RGB screen is rendered until the next act
+        self._restored_screen = None
+        self._restored_rgb = None
         self.full_action_space = full_action_space
         self.num_players = num_players
         self.max_cycles = max_cycles
@@ -78,28 +231,11 @@ class ParallelAtariEnv(ParallelEnv, EzPickle):
 
         self.ale.setFloat(b"repeat_action_probability", 0.0)
 
-        if auto_rom_install_path is None:
-            start = Path(multi_agent_ale_py.__file__).parent
-        else:
-            start = Path(auto_rom_install_path).resolve()
-
-        # start looking in local directory
-        final = start / f"{game}.bin"
-        if not final.exists():
-            # if that doesn't work, look in 'roms'
-            final = start / "roms" / f"{game}.bin"
-
-        if not final.exists():
-            # use old AutoROM install path as backup
-            final = start / "ROM" / game / f"{game}.bin"
-
-        if not final.exists():
-            raise OSError(
-                f"rom {game} is not installed. Please install roms using AutoROM tool (https://github.com/Farama-Foundation/AutoROM) "
-                "or specify and double-check the path to your Atari rom using the `rom_path` argument."
-            )
-
-        self.rom_path = str(final)
+        self.rom_path = find_rom(game, auto_rom_install_path)
+        # the seed is set before the ROM is loaded, so that it only needs to
+        # be loaded once
+        self.np_random, seed = seeding.np_random(seed)
+        self.ale.setInt(b"random_seed", seed)
         self.ale.loadROM(self.rom_path)
 
         all_modes = self.ale.getAvailableModes(num_players)
@@ -126,20 +262,41 @@ class ParallelAtariEnv(ParallelEnv, EzPickle):
         self.action_mapping = action_mapping
 
         if obs_type == "ram":
-            observation_space = gym.spaces.Box(
-                low=0, high=255, dtype=np.uint8, shape=(128,)
-            )
+            screen_shape = frame_shape = (128,)
         else:
             (screen_width, screen_height) = self.ale.getScreenDims()
             if obs_type == "rgb_image":
                 num_channels = 3
             elif obs_type == "grayscale_image":
                 num_channels = 1
-            observation_space = spaces.Box(
-                low=0,
-                high=255,
-                shape=(screen_height, screen_width, num_channels),
-                dtype=np.uint8,
+            screen_shape = (screen_height, screen_width, num_channels)
+            frame_shape = screen_shape if resize is None else (*resize, num_channels)
+        obs_shape = frame_shape[:-1] + (frame_shape[-1] * stack,)
+        observation_space = spaces.Box(low=0, high=255, shape=obs_shape, dtype=np.uint8)
+
+        # preprocessing buffers: the screen (when it is resized), the first
+        # of the two max-pooled screens and the ring of the stacked frames
+        self._preprocess = max_pool or resize is not None or stack > 1
+        self._screen_buffer = np.zeros(screen_shape, dtype=np.uint8)
+        self._pool_buffer = np.zeros(screen_shape, dtype=np.uint8)
+        self._frames = np.zeros((stack,) + frame_shape, dtype=np.uint8)
+        self._frame_index = 0
+        # the persistent observation of shared_obs mode and its read-only
+        # view handed to the agents
+        self._observation = None
+        if shared_obs:
+            self._observation = np.zeros(obs_shape, dtype=np.uint8)
+            self._shared_view = self._observation.view()
+            self._shared_view.flags.writeable = False
+        self._last_obs = None
+        if resize is not None:
+            self._resize_rows = area_taps(screen_shape[0], resize[0])
+            self._resize_columns = area_taps(screen_shape[1], resize[1])
+            self._resize_buffers = (
+                np.zeros((resize[0], screen_shape[1]), dtype=np.float32),
+                np.zeros((resize[0], screen_shape[1]), dtype=np.float32),
+                np.zeros(resize, dtype=np.float32),
+                np.zeros(resize, dtype=np.float32),
             )
 
         player_names = ["first", "second", "third", "fourth"]
@@ -154,22 +311,23 @@ class ParallelAtariEnv(ParallelEnv, EzPickle):
         }
 
         self._screen = None
-        self.seed(seed)
 
     def seed(self, seed=None):
-        if seed is None:
-            _, seed = seeding.np_random()
+        self.np_random, seed = seeding.np_random(seed)
         self.ale.setInt(b"random_seed", seed)
         self.ale.loadROM(self.rom_path)
         self.ale.setMode(self.mode)
 
     def reset(self, seed=None, return_info=False, options=None):
-        if seed is not None:
-            self.seed(seed=seed)
-        self.ale.reset_game()
+        self._restored_rgb = None
+        if seed is None:
+            self.ale.reset_game()
+        else:
+            self._seeded_reset(seed)
         self.agents = self.possible_agents[:]
         self.dones = {agent: False for agent in self.possible_agents}
         self.frame = 0
+        self._frames.fill(0)
 
         obs = self._observe()
 
@@ -181,20 +339,115 @@ class ParallelAtariEnv(ParallelEnv, EzPickle):
             }
             return {agent: obs for agent in self.agents}, infos
 
+    def _seeded_reset(self, seed):
+        key = (self.rom_path, self.mode, seed)
+        cached = self._reset_cache.get(key)
+        if cached is not None:
+            self._reset_cache.move_to_end(key)
+            state, self._restored_screen, self._restored_rgb = cached
+            self.np_random, _ = seeding.np_random(seed)
+            self.ale.restoreSystemState(state)
+            return
+        self.seed(seed=seed)
+        self.ale.reset_game()
+        if self.reset_cache_size > 0:
+            self._reset_cache[key] = (
+                self.ale.cloneSystemState(),
+                self._read_screen(),
+                self.ale.getScreenRGB(),
+            )
+            while len(self._reset_cache) > self.reset_cache_size:
+                _, (state, _, _) = self._reset_cache.popitem(last=False)
+                self.ale.deleteState(state)
+
+    def clear_reset_cache(self):
+        while self._reset_cache:
+            _, (state, _, _) = self._reset_cache.popitem()
+            self.ale.deleteState(state)
+
     def observation_space(self, agent):
         return self.observation_spaces[agent]
 
     def action_space(self, agent):
         return self.action_spaces[agent]
 
-    def _observe(self):
+    def _read_screen(self, out=None):
+        # raw observation of the current frame, read into out if given
+        if self._restored_screen is not None:
+            screen, self._restored_screen = self._restored_screen, None
+            if out is None:
+                return screen.copy()
+            out[...] = screen
+            return out
         if self.obs_type == "ram":
-            bytes = self.ale.getRAM()
-            return bytes
+            return self.ale.getRAM(out)
         elif self.obs_type == "rgb_image":
-            return self.ale.getScreenRGB()
+            return self.ale.getScreenRGB(out)
         elif self.obs_type == "grayscale_image":
-            return self.ale.getScreenGrayscale()
+            return self.ale.getScreenGrayscale(out)
+
+    def _observe(self, pooled=False):
+        self._last_obs = self._process_screen(pooled)
+        if self.shared_obs:
+            self._last_obs = self._shared_view
+        return self._last_obs
+
+    def _process_screen(self, pooled):
+        # observation of the current frame, in self._observation if shared
+        if not self._preprocess:
+            return self._read_screen(self._observation)
+        # the new frame replaces the oldest one of the ring
+        self._frame_index = (self._frame_index + 1) % self.stack
+        frame = self._frames[self._frame_index]
+        screen = self._screen_buffer if self.resize is not None else frame
+        self._read_screen(screen)
+        if pooled:
+            np.maximum(screen, self._pool_buffer, out=screen)
+        if self.resize is not None:
+            rows, row_term, resized, column_term = self._resize_buffers
+            row_index, row_weights = self._resize_rows
+            column_index, column_weights = self._resize_columns
+            for channel in range(screen.shape[-1]):
+                # weighted sums of the few old pixels under each new pixel,
+                # rows first, then columns
+                pixels = screen[..., channel]
+                np.multiply(pixels[row_index[:, 0]], row_weights[:, :1], out=rows)
+                for tap in range(1, row_index.shape[1]):
+                    np.multiply(
+                        pixels[row_index[:, tap]],
+                        row_weights[:, tap, None],
+                        out=row_term,
+                    )
+                    rows += row_term
+                np.multiply(
+                    rows[:, column_index[:, 0]], column_weights[:, 0], out=resized
+                )
+                for tap in range(1, column_index.shape[1]):
+                    np.multiply(
+                        rows[:, column_index[:, tap]],
+                        column_weights[:, tap],
+                        out=column_term,
+                    )
+                    resized += column_term
+                resized += 0.5
+                np.copyto(frame[..., channel], resized, casting="unsafe")
+        # oldest frame first
+        obs = self._observation
+        if obs is None:
+            obs = np.empty(
+                frame.shape[:-1] + (frame.shape[-1] * self.stack,), dtype=np.uint8
+            )
+        size = frame.shape[-1]
+        for k in range(self.stack):
+            index = (self._frame_index + 1 + k) % self.stack
+            obs[..., k * size : (k + 1) * size] = self._frames[index]
+        return obs
+
+    def observe_batch(self, agents):
+        obs = self._last_obs
+        if self.shared_obs:
+            return np.broadcast_to(obs, (len(agents),) + obs.shape)
+        return np.stack([obs] * len(agents))
 
     def step(self, action_dict):
         actions = np.zeros(self.max_num_agents, dtype=np.int32)
@@ -203,7 +456,20 @@ class ParallelAtariEnv(ParallelEnv, EzPickle):
                 actions[i] = action_dict[agent]
 
         actions = self.action_mapping[actions]
+        if isinstance(self.frameskip, tuple):
+            frameskip = self.np_random.integers(*self.frameskip)
+        else:
+            frameskip = self.frameskip
+        self._restored_rgb = None
         rewards = self.ale.act(actions)
+        pooled = False
+        for k in range(1, frameskip):
+            if self.ale.game_over():
+                break
+            if self.max_pool and k == frameskip - 1:
+                self._read_screen(self._pool_buffer)
+                pooled = True
+            rewards += self.ale.act(actions)
         self.frame += 1
         if self.ale.game_over() or self.frame >= self.max_cycles:
             dones = {agent: True for agent in self.agents}
@@ -216,7 +482,7 @@ class ParallelAtariEnv(ParallelEnv, EzPickle):
                 if agent in self.agents
             }
 
-        obs = self._observe()
+        obs = self._observe(pooled)
         observations = {agent: obs for agent in self.agents}
         rewards = {
             agent: rew
@@ -229,7 +495,10 @@ class ParallelAtariEnv(ParallelEnv, EzPickle):
 
     def render(self, mode="human"):
         (screen_width, screen_height) = self.ale.getScreenDims()
-        image = self.ale.getScreenRGB()
+        if self._restored_rgb is not None:
+            image = self._restored_rgb.copy()
+        else:
+            image = self.ale.getScreenRGB()
         if mode == "human":
             import pygame
 
@@ -257,12 +526,69 @@ class ParallelAtariEnv(ParallelEnv, EzPickle):
             raise ValueError("bad value for render mode")
 
     def close(self):
+        self.clear_reset_cache()
         if self._screen is not None:
             import pygame
 
             pygame.quit()
             self._screen = None
 
+    def snapshot(self):
+        """Returns an AtariSnapshot of the current state of the environment,
+        emulator included, for `restore`. Unlike `clone_full_state`, the
+        emulator state is kept as is instead of being encoded."""
+        return AtariSnapshot(
+            self.ale,
+            self.ale.cloneSystemState(),
+            {
+                "agents": self.agents[:],
+                "dones": dict(self.dones),
+                "frame": self.frame,
+                "frames": self._frames.copy(),
+                "frame_index": self._frame_index,
+                "last_obs": self._last_obs
+                if self._observation is None
+                else self._observation.copy(),
+                "np_random": self.np_random.bit_generator.state,
+            },
+        )
+
+    def restore(self, snapshot):
+        """Restores the state of the environment saved by `snapshot`."""
+        self.ale.restoreSystemState(snapshot.state)
+        self._restored_rgb = None
+        env_state = snapshot.env_state
+        self.agents = env_state["agents"][:]
+        self.dones = dict(env_state["dones"])
+        self.frame = env_state["frame"]
+        self._frames[...] = env_state["frames"]
+        self._frame_index = env_state["frame_index"]
+        if self._observation is None:
+            self._last_obs = env_state["last_obs"]
+        else:
+            self._observation[...] = env_state["last_obs"]
+        self.np_random.bit_generator.state = env_state["np_random"]
+
+    def branches(self, num_branches):
+        """Iterates `num_branches` times over rollouts that all start from the
+        current state, which is restored after each of them and at the end,
+        for tree searches:
+
+            for _ in env.branches(8):
+                for actions in plan():
+                    env.step(actions)
+            # env is back in its state before the loop
+        """
+        snapshot = self.snapshot()
+        try:
+            for branch in range(num_branches):
+                if branch:
+                    self.restore(snapshot)
+                yield branch
+        finally:
+            self.restore(snapshot)
+            snapshot.release()
+
     def clone_state(self):
         """Clone emulator state w/o system state. Restoring this state will
         *not* give an identical environment. For complete cloning and restoring
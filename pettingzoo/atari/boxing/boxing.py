@@ -1,7 +1,11 @@
 import os
 from glob import glob
 
-from ..base_atari_env import BaseAtariEnv, base_env_wrapper_fn, parallel_wrapper_fn
+from ..base_atari_env import (
+    BaseAtariEnv,
+    base_env_wrapper_fn,
+    base_parallel_env_wrapper_fn,
+)
 
 
 def raw_env(**kwargs):
@@ -17,4 +21,4 @@ def raw_env(**kwargs):
 
 
 env = base_env_wrapper_fn(raw_env)
-parallel_env = parallel_wrapper_fn(env)
+parallel_env = base_parallel_env_wrapper_fn(raw_env)
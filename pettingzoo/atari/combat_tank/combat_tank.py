@@ -2,7 +2,11 @@ import os
 import warnings
 from glob import glob
 
-from ..base_atari_env import BaseAtariEnv, base_env_wrapper_fn, parallel_wrapper_fn
+from ..base_atari_env import (
+    BaseAtariEnv,
+    base_env_wrapper_fn,
+    base_parallel_env_wrapper_fn,
+)
 
 
 def raw_env(has_maze=True, is_invisible=False, billiard_hit=True, **kwargs):
@@ -29,4 +33,4 @@ def raw_env(has_maze=True, is_invisible=False, billiard_hit=True, **kwargs):
 
 
 env = base_env_wrapper_fn(raw_env)
-parallel_env = parallel_wrapper_fn(env)
+parallel_env = base_parallel_env_wrapper_fn(raw_env)
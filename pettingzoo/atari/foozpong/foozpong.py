@@ -1,7 +1,11 @@
 import os
 from glob import glob
 
-from ..base_atari_env import BaseAtariEnv, base_env_wrapper_fn, parallel_wrapper_fn
+from ..base_atari_env import (
+    BaseAtariEnv,
+    base_env_wrapper_fn,
+    base_parallel_env_wrapper_fn,
+)
 
 
 def raw_env(num_players=4, **kwargs):
@@ -20,4 +24,4 @@ def raw_env(num_players=4, **kwargs):
 
 
 env = base_env_wrapper_fn(raw_env)
-parallel_env = parallel_wrapper_fn(env)
+parallel_env = base_parallel_env_wrapper_fn(raw_env)
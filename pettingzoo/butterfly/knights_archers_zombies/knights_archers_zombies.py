@@ -388,6 +388,57 @@ class raw_env(AECEnv, EzPickle):
 
             return state
 
+    def observe_batch(self, agents):
+        if not self.vector_state:
+            return super().observe_batch(agents)
+
+        # the vector state of everything is shared by all the observations
+        agent_states = np.stack(
+            [
+                self.agent_list[self.agent_name_mapping[agent]].vector_state
+                for agent in agents
+            ]
+        )
+        vector_state = self.get_vector_state()
+        state = vector_state[:, -4:]
+        is_dead = np.sum(np.abs(state), axis=1) == 0.0
+        all_ids = vector_state[:, :-4]
+        all_pos = state[:, 0:2]
+        all_ang = state[:, 2:4]
+
+        # get relative positions of everything to every agent
+        rel_pos = all_pos[None, :, :] - agent_states[:, None, 0:2]
+        norm_pos = np.linalg.norm(rel_pos, axis=2, keepdims=True) / np.sqrt(2)
+
+        # kill dead things
+        all_ids[is_dead] *= 0
+        all_ang[is_dead] *= 0
+        rel_pos[:, is_dead] *= 0
+        norm_pos[:, is_dead] *= 0
+
+        n = len(agents)
+        state = np.concatenate(
+            [
+                np.broadcast_to(all_ids, (n,) + all_ids.shape),
+                norm_pos,
+                rel_pos,
+                np.broadcast_to(all_ang, (n,) + all_ang.shape),
+            ],
+            axis=-1,
+        )
+
+        if self.use_typemasks:
+            typemask = np.zeros(self.typemask_width + 1)
+            typemask[-2] = 1.0
+        else:
+            typemask = np.array([0.0])
+        agent_state = np.concatenate(
+            [np.broadcast_to(typemask, (n, len(typemask))), agent_states], axis=1
+        )
+
+        # prepend agent state to the observation
+        return np.concatenate([agent_state[:, None, :], state], axis=1)
+
     def state(self):
         """
         Returns an observation of the global environment
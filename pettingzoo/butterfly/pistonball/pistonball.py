@@ -213,6 +213,19 @@ class raw_env(AECEnv, EzPickle):
         observation = np.fliplr(observation)
         return observation
 
+    def observe_batch(self, agents):
+        observation = pygame.surfarray.pixels3d(self.screen)
+        y_high = self.screen_height - self.wall_width - self.piston_body_height
+        y_low = self.wall_width
+        cropped = []
+        for agent in agents:
+            i = self.agent_name_mapping[agent]
+            x_high = self.wall_width + self.piston_width * (i + 2)
+            x_low = self.wall_width + self.piston_width * (i - 1)
+            cropped.append(observation[x_low:x_high, y_low:y_high, :])
+        # rot90(k=3) followed by fliplr swaps the x and y axes
+        return np.stack(cropped).transpose(0, 2, 1, 3)
+
     def state(self):
         """
         Returns an observation of the global environment
@@ -31,10 +31,12 @@ def raw_env(
     max_cycles=max_cycles_default,
     minimap_mode=minimap_mode_default,
     extra_features=False,
+    agent_tables=False,
     **reward_args
 ):
     return parallel_to_aec_wrapper(
-        parallel_env(max_cycles, minimap_mode, extra_features, **reward_args)
+        parallel_env(max_cycles, minimap_mode, extra_features, **reward_args),
+        agent_tables=agent_tables,
     )
 
 
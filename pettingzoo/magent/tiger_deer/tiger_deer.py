@@ -30,10 +30,12 @@ def raw_env(
     max_cycles=max_cycles_default,
     minimap_mode=minimap_mode_default,
     extra_features=False,
+    agent_tables=False,
     **env_args
 ):
     return parallel_to_aec_wrapper(
-        parallel_env(map_size, max_cycles, minimap_mode, extra_features, **env_args)
+        parallel_env(map_size, max_cycles, minimap_mode, extra_features, **env_args),
+        agent_tables=agent_tables,
     )
 
 
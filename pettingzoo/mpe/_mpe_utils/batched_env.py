@@ -0,0 +1,374 @@
+import gym
+import numpy as np
+from gym.utils import seeding
+
+from pettingzoo.utils.vector.vector_env import VectorParallelEnv, seed_list
+
+from .core import ScriptedPolicy, draw_noise
+from .rendering import Rasterizer
+from .simple_env import MOVES, SimpleEnv, noise_random
+
+
+class BatchedWorld:
+    """
+    State of `num_envs` copies of a World, stored as arrays with a leading
+    world axis: `p_pos` and `p_vel` have shape (num_envs, num_entities, dim_p),
+    with the entities ordered like `World.entities`, and `c` has shape
+    (num_envs, num_agents, dim_c).
+
+    The properties of the entities (sizes, masses, ...) are taken from the
+    template `world`, which must not change them between resets. `goal_a` and
+    `goal_b` hold the index of the entity each agent's `goal_a`/`goal_b`
+    attribute refers to (or -1), and `state` the per-world values returned by
+    the scenario's `batched_state`.
+    """
+
+    def __init__(self, world, num_envs):
+        assert all(
+            agent.action_callback is None
+            or isinstance(agent.action_callback, ScriptedPolicy)
+            for agent in world.agents
+        ), "batched worlds only support scripted agents with a ScriptedPolicy"
+        self.template = world
+        self.scripted_groups = world.agent_partitions()[2]
+        self.num_envs = num_envs
+        entities = world.entities
+        self.num_agents = len(world.agents)
+        self.num_entities = len(entities)
+        self.dim_p = world.dim_p
+        self.dim_c = world.dim_c
+        self.dt = world.dt
+        self.damping = world.damping
+        self.contact_force = world.contact_force
+        self.contact_margin = world.contact_margin
+
+        self.sizes = np.array([entity.size for entity in entities], dtype=float)
+        self.masses = np.array([entity.mass for entity in entities], dtype=float)
+        self.movable = np.array([entity.movable for entity in entities], dtype=bool)
+        self.collide = np.array([entity.collide for entity in entities], dtype=bool)
+        self.max_speeds = np.array(
+            [
+                np.inf if entity.max_speed is None else entity.max_speed
+                for entity in entities
+            ],
+            dtype=float,
+        )
+        agents = world.agents
+        self.silent = np.array([agent.silent for agent in agents], dtype=bool)
+        self.sensitivity = np.array(
+            [5.0 if agent.accel is None else agent.accel for agent in agents]
+        )
+        # standard deviations of the action noise, drawn like in World
+        self.u_noise = np.array(
+            [(agent.u_noise or 0.0) if agent.movable else 0.0 for agent in agents]
+        )
+        self.c_noise = np.array(
+            [0.0 if agent.silent else (agent.c_noise or 0.0) for agent in agents]
+        )
+        # generators of the action noise of each world
+        self.np_randoms = [np.random.default_rng() for _ in range(num_envs)]
+        self.colliders = np.flatnonzero(self.collide)
+        # entities whose velocity gets a force added, like the entities whose
+        # p_force is not None in World.step
+        self.pushed = np.zeros(self.num_entities, dtype=bool)
+        self.pushed[: self.num_agents] = self.movable[: self.num_agents]
+        if len(self.colliders) >= 2:
+            self.pushed[self.colliders] = True
+
+        shape = (num_envs, self.num_entities, self.dim_p)
+        self.p_pos = np.zeros(shape)
+        self.p_vel = np.zeros(shape)
+        self.c = np.zeros((num_envs, self.num_agents, self.dim_c))
+        self.action_u = np.zeros((num_envs, self.num_agents, self.dim_p))
+        self.action_c = np.zeros((num_envs, self.num_agents, self.dim_c))
+        self.goal_a = np.full((num_envs, self.num_agents), -1, dtype=np.int64)
+        self.goal_b = np.full((num_envs, self.num_agents), -1, dtype=np.int64)
+        self.colors = np.zeros((num_envs, self.num_entities, 3))
+        self.state = {}
+
+    @property
+    def agent_pos(self):
+        return self.p_pos[:, : self.num_agents]
+
+    @property
+    def agent_vel(self):
+        return self.p_vel[:, : self.num_agents]
+
+    @property
+    def landmark_pos(self):
+        return self.p_pos[:, self.num_agents :]
+
+    def load(self, k, world, state):
+        """
+        Copies the state of `world`, freshly reset by the scenario, into
+        world `k` of the batch.
+        """
+        index = {id(entity): i for i, entity in enumerate(world.entities)}
+        for i, entity in enumerate(world.entities):
+            self.p_pos[k, i] = entity.state.p_pos
+            self.p_vel[k, i] = 0.0 if entity.state.p_vel is None else entity.state.p_vel
+            # pygame reads colors of 4 values, like in simple_crypto, as RGBA
+            self.colors[k, i] = entity.color[:3]
+        for i, agent in enumerate(world.agents):
+            self.c[k, i] = agent.state.c
+            goal_a = getattr(agent, "goal_a", None)
+            goal_b = getattr(agent, "goal_b", None)
+            self.goal_a[k, i] = -1 if goal_a is None else index[id(goal_a)]
+            self.goal_b[k, i] = -1 if goal_b is None else index[id(goal_b)]
+        for key, value in state.items():
+            if key not in self.state:
+                value = np.asarray(value)
+                self.state[key] = np.zeros(
+                    (self.num_envs,) + value.shape, dtype=value.dtype
+                )
+            self.state[key][k] = value
+
+    def step(self):
+        # set actions for scripted agents
+        for policy, idxs in self.scripted_groups:
+            u, c = policy.act(self, idxs, self.p_pos, self.p_vel)
+            self.action_u[:, idxs] = u
+            self.action_c[:, idxs] = c
+        # apply agent physical controls
+        num_agents = self.num_agents
+        p_force = np.zeros_like(self.p_pos)
+        p_force[:, :num_agents] = self.action_u
+        if self.u_noise.any():
+            p_force[:, :num_agents] += self.noise(self.u_noise, self.dim_p)
+        # apply environment forces
+        self.apply_environment_force(p_force)
+        # integrate physical state
+        self.integrate_state(p_force)
+        # update agent state
+        self.c[:] = self.action_c
+        if self.c_noise.any():
+            self.c += self.noise(self.c_noise, self.dim_c)
+        self.c[:, self.silent] = 0.0
+
+    def noise(self, scales, dim):
+        # action noise of all worlds, each drawn from its own generator
+        return np.stack(
+            [draw_noise(np_random, scales, dim) for np_random in self.np_randoms]
+        )
+
+    def apply_environment_force(self, p_force):
+        colliders = self.colliders
+        m = len(colliders)
+        if m < 2:
+            return
+        pos = self.p_pos[:, colliders]
+        delta_pos = pos[:, :, None, :] - pos[:, None, :, :]
+        size = self.sizes[colliders]
+        dist_min = size[:, None] + size[None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dist = np.sqrt(np.sum(np.square(delta_pos), axis=3))
+            # softmax penetration
+            k = self.contact_margin
+            penetration = np.logaddexp(0, -(dist - dist_min) / k) * k
+            force = (
+                self.contact_force
+                * delta_pos
+                / dist[:, :, :, None]
+                * penetration[:, :, :, None]
+            )
+        diagonal = np.arange(m)
+        force[:, diagonal, diagonal] = 0.0
+        total = p_force[:, colliders]
+        # sum in the order of the entities, like World
+        for b in range(m):
+            total += force[:, :, b]
+        p_force[:, colliders] = total
+
+    def integrate_state(self, p_force):
+        movable = self.movable
+        vel = self.p_vel[:, movable] * (1 - self.damping)
+        pushed = self.pushed[movable]
+        vel[:, pushed] += (
+            p_force[:, movable][:, pushed] / self.masses[movable][pushed, None]
+        ) * self.dt
+        speed = np.sqrt(np.square(vel[:, :, 0]) + np.square(vel[:, :, 1]))
+        max_speed = np.broadcast_to(self.max_speeds[movable], speed.shape)
+        too_fast = speed > max_speed
+        vel[too_fast] = (
+            vel[too_fast] / speed[too_fast, None] * max_speed[too_fast, None]
+        )
+        self.p_vel[:, movable] = vel
+        self.p_pos[:, movable] += vel * self.dt
+
+
+class BatchedSimpleEnv(VectorParallelEnv):
+    """
+    Steps `num_envs` copies of an MPE environment with array operations over
+    all of them at once, instead of one copy after the other.
+
+    `env_fn` is called once with `env_kwargs` to build the environment, e.g.
+
+        env = BatchedSimpleEnv(simple_spread_v2.raw_env, 1024, N=3)
+        obs = env.reset(seed=0)  # shape (1024, 3, 18)
+        obs, rewards, dones, infos = env.step(actions)  # actions shape (1024, 3)
+
+    The scenario must implement `batched_reward` and `batched_observation`
+    (and `batched_global_reward` if the environment has a `local_ratio`).
+    World `i` reproduces the environment reset with seed `seed + i`.
+
+    Agents whose observation (or continuous action) is smaller than the
+    largest one use the first entries of their row; the rest is zero.
+    Continuous actions are passed as an array of shape
+    (num_envs, num_agents, largest_action_size). The info dicts of steps that
+    do not end the episodes are shared between steps and must not be
+    modified.
+
+    `render("rgb_array")` draws the frames of all worlds, shape
+    (num_envs, height, width, 3), with `rasterizer`, which can be replaced
+    by a smaller `Rasterizer(width, height)` for video logging.
+    """
+
+    def __init__(self, env_fn, num_envs, copy=True, **env_kwargs):
+        self.env = env_fn(**env_kwargs).unwrapped
+        assert isinstance(
+            self.env, SimpleEnv
+        ), "BatchedSimpleEnv needs an MPE environment"
+        self.scenario = self.env.scenario
+        self.max_cycles = self.env.max_cycles
+        self.continuous_actions = self.env.continuous_actions
+        self.local_ratio = self.env.local_ratio
+        self.world = BatchedWorld(self.env.world, num_envs)
+
+        possible_agents = self.env.possible_agents
+        self.obs_dims = np.array(
+            [self.env.observation_space(agent).shape[0] for agent in possible_agents]
+        )
+        self.action_dims = np.array(
+            [
+                self.env.action_space(agent).shape[0] if self.continuous_actions else 1
+                for agent in possible_agents
+            ]
+        )
+        metadata = dict(self.env.metadata, render_modes=["rgb_array"])
+        super().__init__(
+            num_envs=num_envs,
+            metadata=metadata,
+            possible_agents=possible_agents,
+            observation_space=gym.spaces.Box(
+                low=-np.float32(np.inf),
+                high=+np.float32(np.inf),
+                shape=(int(self.obs_dims.max()),),
+                dtype=np.float32,
+            ),
+            copy=copy,
+        )
+        self.np_randoms = [seeding.np_random(None)[0] for _ in range(num_envs)]
+        self.steps = 0
+        self._empty_infos = [
+            {agent: {} for agent in possible_agents} for _ in range(num_envs)
+        ]
+        self.rasterizer = Rasterizer(self.env.width, self.env.height)
+        self._frames = None
+
+    def observation_space(self, agent):
+        return self.env.observation_space(agent)
+
+    def action_space(self, agent):
+        return self.env.action_space(agent)
+
+    def reset(self, seed=None, return_info=False, options=None):
+        for i, env_seed in enumerate(seed_list(seed, self.num_envs)):
+            if env_seed is not None:
+                self.np_randoms[i], env_seed = seeding.np_random(env_seed)
+                # like SimpleEnv.seed, so that world i follows a SimpleEnv
+                # seeded with the same seed, noise included
+                self.world.np_randoms[i] = noise_random(env_seed)
+        self._reset_worlds()
+        self.alive_mask.fill(True)
+        all_infos = [
+            {agent: {} for agent in self.possible_agents} for _ in range(self.num_envs)
+        ]
+        return self._reset_results(all_infos, return_info)
+
+    def _reset_worlds(self):
+        template = self.world.template
+        for k, np_random in enumerate(self.np_randoms):
+            self.scenario.reset_world(template, np_random)
+            self.world.load(k, template, self.scenario.batched_state(template))
+        self.steps = 0
+        self._observe()
+
+    def _observe(self):
+        for idxs, obs in self.scenario.batched_observation(self.world):
+            self._observations[:, idxs, : obs.shape[-1]] = obs
+
+    def _set_actions(self, actions):
+        world = self.world
+        movable = world.movable[: world.num_agents]
+        talking = np.flatnonzero(~world.silent)
+        actions = np.asarray(actions)
+        world.action_c.fill(0.0)
+        if self.continuous_actions:
+            # the movement takes the first dim_p * 2 + 1 entries of the action
+            # of movable agents, the communication follows
+            u = np.zeros_like(world.action_u)
+            if movable.any():
+                u[:, movable, 0] += actions[:, movable, 1] - actions[:, movable, 2]
+                u[:, movable, 1] += actions[:, movable, 3] - actions[:, movable, 4]
+            offsets = np.where(movable[talking], world.dim_p * 2 + 1, 0)
+            columns = offsets[:, None] + np.arange(world.dim_c)
+            world.action_c[:, talking] = actions[:, talking[:, None], columns]
+        else:
+            # discrete actions of movable agents that talk are
+            # movement + (dim_p * 2 + 1) * message
+            mdim = world.dim_p * 2 + 1
+            u = MOVES[np.where(movable, actions % mdim, 0)]
+            messages = np.where(movable, actions // mdim, actions)[:, talking]
+            world.action_c[:, talking] = np.eye(world.dim_c)[messages]
+        world.action_u[:] = u * world.sensitivity[:, None]
+
+    def _rewards_from_world(self):
+        rewards = self.scenario.batched_reward(self.world)
+        if self.local_ratio is not None:
+            global_reward = self.scenario.batched_global_reward(self.world)
+            rewards = (
+                global_reward[:, None] * (1 - self.local_ratio)
+                + rewards * self.local_ratio
+            )
+        return rewards
+
+    def step(self, actions):
+        self._set_actions(actions)
+        self.world.step()
+        self._rewards[:] = self._rewards_from_world()
+        self.steps += 1
+        self._observe()
+
+        if self.steps >= self.max_cycles:
+            self._dones.fill(True)
+            all_infos = [
+                {
+                    agent: {
+                        "terminal_observation": self._observations[k, j, :dim].copy()
+                    }
+                    for j, (agent, dim) in enumerate(
+                        zip(self.possible_agents, self.obs_dims)
+                    )
+                }
+                for k in range(self.num_envs)
+            ]
+            self._reset_worlds()
+        else:
+            self._dones.fill(False)
+            all_infos = self._empty_infos
+        return self._step_results(all_infos)
+
+    def render(self, mode="rgb_array"):
+        assert mode == "rgb_array", "BatchedSimpleEnv only renders rgb_array frames"
+        rasterizer = self.rasterizer
+        shape = (self.num_envs, rasterizer.height, rasterizer.width, 3)
+        if self._frames is None or self._frames.shape != shape:
+            self._frames = np.empty(shape, dtype=np.uint8)
+        for k, frame in enumerate(self._frames):
+            rasterizer.draw(
+                self.world.p_pos[k], self.world.sizes, self.world.colors[k], out=frame
+            )
+        return self._frames.copy() if self.copy else self._frames
+
+    def close(self):
+        self.env.close()
@@ -1,5 +1,91 @@
 import numpy as np
 
+# below this number of circles, candidate_pairs returns all pairs
+BROADPHASE_MIN_SIZE = 32
+
+# contact forces are exactly zero (the softplus penetration underflows) when
+# entities are farther apart than this many contact margins
+CONTACT_CUTOFF = 750
+
+
+def candidate_pairs(p_pos, radii, margin=0.0):
+    """
+    Broadphase over a uniform grid (spatial hash): returns the pairs (i, j),
+    i < j, of the circles of centers `p_pos` (shape (n, 2)) and radii `radii`
+    whose distance may be smaller than radii[i] + radii[j] + margin, as two
+    index arrays sorted by i, then j. The exact test is left to the caller.
+    """
+    n = len(p_pos)
+    if n < 2:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    reach = 2 * np.max(radii) + margin
+    if n < BROADPHASE_MIN_SIZE or not (
+        reach > 0 and np.isfinite(reach) and np.isfinite(p_pos).all()
+    ):
+        return np.triu_indices(n, 1)
+
+    cells = np.floor(p_pos / reach).astype(np.int64)
+    cells -= cells.min(axis=0)
+    # one empty column on each side, so that neighbors never wrap around
+    width = cells[:, 1].max() + 2
+    keys = cells[:, 0] * width + cells[:, 1]
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    pairs_i = []
+    pairs_j = []
+    # the cell itself and half of its neighbors, so that every pair of cells
+    # is visited once
+    for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        neighbors = keys + dx * width + dy
+        start = np.searchsorted(sorted_keys, neighbors, "left")
+        counts = np.searchsorted(sorted_keys, neighbors, "right") - start
+        i = np.repeat(np.arange(n), counts)
+        offsets = np.arange(len(i)) - np.repeat(np.cumsum(counts) - counts, counts)
+        j = order[np.repeat(start, counts) + offsets]
+        if dx == 0 and dy == 0:
+            keep = i < j
+            i, j = i[keep], j[keep]
+        pairs_i.append(np.minimum(i, j))
+        pairs_j.append(np.maximum(i, j))
+    i = np.concatenate(pairs_i)
+    j = np.concatenate(pairs_j)
+    order = np.lexsort((j, i))
+    return i[order], j[order]
+
+
+def neighbor_pairs(p_pos, radius):
+    """
+    Returns the pairs (i, j), i != j, of the points of `p_pos` (shape (n, 2))
+    closer than `radius`, in both orders, and their distances, as three
+    arrays sorted by i, then by distance (then by j). The pairs are found
+    with the grid of candidate_pairs, so the cost grows with the number of
+    neighbors instead of n ** 2.
+    """
+    i, j = candidate_pairs(p_pos, np.zeros(len(p_pos)), radius)
+    dist = np.sqrt(np.sum(np.square(p_pos[j] - p_pos[i]), axis=1))
+    close = dist < radius
+    i, j, dist = i[close], j[close], dist[close]
+    i, j = np.concatenate([i, j]), np.concatenate([j, i])
+    dist = np.concatenate([dist, dist])
+    order = np.lexsort((j, dist, i))
+    return i[order], j[order], dist[order]
+
+
+def draw_noise(np_random, scales, dim):
+    """
+    Gaussian noise of standard deviation scales[i] for the action of size
+    `dim` of each agent i, shape (len(scales), dim), drawn from the Generator
+    `np_random` with one call for all the agents whose scale is not 0.
+    """
+    noise = np.zeros((len(scales), dim))
+    noisy = np.flatnonzero(scales)
+    if len(noisy):
+        noise[noisy] = (
+            np_random.standard_normal((len(noisy), dim)) * scales[noisy, None]
+        )
+    return noise
+
 
 class EntityState:  # physical/external base state of all entities
     def __init__(self):
@@ -59,6 +145,10 @@ class Landmark(Entity):  # properties of landmark entities
 
 
 class Agent(Entity):  # properties of agent entities
+    # number of assignments to the action_callback of any agent, lets the
+    # worlds notice them (see World.agent_partitions)
+    callback_assignments = 0
+
     def __init__(self):
         super().__init__()
         # agents are movable by default
@@ -80,6 +170,48 @@ class Agent(Entity):  # properties of agent entities
         # script behavior to execute
         self.action_callback = None
 
+    @property
+    def action_callback(self):
+        return self._action_callback
+
+    @action_callback.setter
+    def action_callback(self, callback):
+        self._action_callback = callback
+        Agent.callback_assignments += 1
+
+
+class ScriptedPolicy:
+    """
+    Policy of scripted agents that computes the actions of all the agents it
+    controls at once. It is set as the `action_callback` of these agents, and
+    World.step calls `act` once per step instead of calling a callback per
+    agent.
+    """
+
+    def act(self, world, agents, p_pos, p_vel):
+        """
+        Returns the physical actions (forces), shape (len(agents), dim_p),
+        and the communication actions, shape (len(agents), dim_c), of the
+        agents of indices `agents` in world.agents. `p_pos` and `p_vel` hold
+        the positions and velocities of world.entities, shape
+        (num_entities, dim_p). In a BatchedWorld, all the arrays have a
+        leading world axis.
+        """
+        raise NotImplementedError()
+
+    def __call__(self, agent, world):
+        # action of a single agent, like a per-agent action_callback
+        u, c = self.act(
+            world,
+            np.array([world.agents.index(agent)]),
+            world.positions(),
+            world.velocities(),
+        )
+        action = Action()
+        action.u = np.array(u[0], dtype=float)
+        action.c = np.array(c[0], dtype=float)
+        return action
+
 
 class World:  # multi-agent world
     def __init__(self):
@@ -99,6 +231,28 @@ class World:  # multi-agent world
         # contact response parameters
         self.contact_force = 1e2
         self.contact_margin = 1e-3
+        # random number generator of the action noise, replaced by the one of
+        # the environment on seeding
+        self.np_random = np.random.default_rng()
+        # actions of the agents, see bind_action_buffers
+        self.action_u = None
+        self.action_c = None
+        # overlapping entities at the current positions, see collision_pairs
+        self._collisions = None
+        # contact forces between the entities at the current positions, see
+        # contacts
+        self._contacts = None
+        # positions, relative positions and distances of the entities, see
+        # positions, relative_positions and distances
+        self._entity_indices = None
+        self._positions = None
+        self._relative_positions = None
+        self._distances = None
+        self._velocities = None
+        # values computed by the scenario from the current state, see cached
+        self._scenario_cache = {}
+        # policy and scripted agents, see agent_partitions
+        self._agent_partitions = None
 
     # return all entities in the world
     @property
@@ -108,18 +262,108 @@ class World:  # multi-agent world
     # return all agents controllable by external policies
     @property
     def policy_agents(self):
-        return [agent for agent in self.agents if agent.action_callback is None]
+        return self.agent_partitions()[0]
 
     # return all agents controlled by world scripts
     @property
     def scripted_agents(self):
-        return [agent for agent in self.agents if agent.action_callback is not None]
+        return self.agent_partitions()[1]
+
+    # policy agents, scripted agents, and the scripted agents grouped by
+    # ScriptedPolicy as (policy, agent indices) pairs, computed again only
+    # when the list of agents is replaced or changes size, or when the
+    # action_callback of an agent is assigned; invalidate_agents must be
+    # called after replacing agents in place in the list
+    def agent_partitions(self):
+        agents = self.agents
+        key = (len(agents), Agent.callback_assignments)
+        cached = self._agent_partitions
+        if cached is None or cached[0] is not agents or cached[1] != key:
+            policy_agents = []
+            scripted_agents = []
+            groups = {}
+            for i, agent in enumerate(agents):
+                callback = agent.action_callback
+                if callback is None:
+                    policy_agents.append(agent)
+                    continue
+                scripted_agents.append(agent)
+                if isinstance(callback, ScriptedPolicy):
+                    groups.setdefault(callback, []).append(i)
+            groups = [
+                (policy, np.array(idxs, dtype=np.intp))
+                for policy, idxs in groups.items()
+            ]
+            self._agent_partitions = (
+                agents,
+                key,
+                policy_agents,
+                scripted_agents,
+                groups,
+            )
+        return self._agent_partitions[2:]
+
+    def invalidate_agents(self):
+        self._agent_partitions = None
+
+    # set the actions of the scripted agents: ScriptedPolicy callbacks write
+    # the actions of all their agents into the action buffers at once, other
+    # callbacks return a new action per agent
+    def apply_scripted_actions(self):
+        _, scripted_agents, groups = self.agent_partitions()
+        if not scripted_agents:
+            return
+        if groups:
+            if self.action_u is None or len(self.action_u) != len(self.agents):
+                self.bind_action_buffers()
+            p_pos = self.positions()
+            p_vel = self.velocities()
+            for policy, idxs in groups:
+                u, c = policy.act(self, idxs, p_pos, p_vel)
+                self.action_u[idxs] = u
+                self.action_c[idxs] = c
+        for agent in scripted_agents:
+            if not isinstance(agent.action_callback, ScriptedPolicy):
+                agent.action = agent.action_callback(agent, self)
+
+    # preallocate the actions of the agents: the action.u and action.c of
+    # agent i become views of row i of action_u, shape (num_agents, dim_p),
+    # and action_c, shape (num_agents, dim_c), which are written in place
+    def bind_action_buffers(self):
+        num_agents = len(self.agents)
+        if self.action_u is None or self.action_u.shape != (num_agents, self.dim_p):
+            self.action_u = np.zeros((num_agents, self.dim_p))
+        if self.action_c is None or self.action_c.shape != (num_agents, self.dim_c):
+            self.action_c = np.zeros((num_agents, self.dim_c))
+        for i, agent in enumerate(self.agents):
+            agent.action.u = self.action_u[i]
+            agent.action.c = self.action_c[i]
+
+    # forget everything computed from the positions of the entities, must be
+    # called when they are moved outside of step
+    def invalidate_cache(self):
+        self._collisions = None
+        self._contacts = None
+        self._entity_indices = None
+        self._positions = None
+        self._relative_positions = None
+        self._distances = None
+        self._velocities = None
+        self._scenario_cache = {}
+
+    # value returned by compute(), kept until the next step or reset, for
+    # scenarios that compute the observations or rewards of all agents at
+    # once
+    def cached(self, key, compute):
+        if key not in self._scenario_cache:
+            self._scenario_cache[key] = compute()
+        return self._scenario_cache[key]
 
     # update state of the world
     def step(self):
+        self.invalidate_cache()
         # set actions for scripted agents
-        for agent in self.scripted_agents:
-            agent.action = agent.action_callback(agent, self)
+        self.apply_scripted_actions()
         # gather forces applied to entities
         p_force = [None] * len(self.entities)
         # apply agent physical controls
@@ -129,38 +373,176 @@ class World:  # multi-agent world
         # integrate physical state
         self.integrate_state(p_force)
         # update agent state
-        for agent in self.agents:
-            self.update_agent_state(agent)
+        self.update_agent_states()
+        self.invalidate_cache()
+
+    # noise of the physical (u) or communication (c) actions of all agents
+    # for one step, shape (num_agents, dim_p or dim_c), drawn at once from
+    # np_random; None when no agent has noise
+    def action_noise(self, kind):
+        if kind == "u":
+            dim = self.dim_p
+            scales = [agent.u_noise if agent.movable else None for agent in self.agents]
+        else:
+            dim = self.dim_c
+            scales = [None if agent.silent else agent.c_noise for agent in self.agents]
+        if not any(scales):
+            return None
+        scales = np.array([scale or 0.0 for scale in scales], dtype=float)
+        return draw_noise(self.np_random, scales, dim)
 
     # gather agent action forces
     def apply_action_force(self, p_force):
+        noise = self.action_noise("u")
         # set applied forces
         for i, agent in enumerate(self.agents):
             if agent.movable:
-                noise = (
-                    np.random.randn(*agent.action.u.shape) * agent.u_noise
-                    if agent.u_noise
-                    else 0.0
-                )
-                p_force[i] = agent.action.u + noise
+                p_force[i] = agent.action.u + (0.0 if noise is None else noise[i])
         return p_force
 
+    # pairs (a, b), a < b, of colliding entities which may be in contact,
+    # in the order of the entities; the contact force of the other pairs is 0
+    def contact_pairs(self, entities):
+        colliders = np.array(
+            [i for i, entity in enumerate(entities) if entity.collide], dtype=np.intp
+        )
+        if len(colliders) < BROADPHASE_MIN_SIZE:
+            a, b = np.triu_indices(len(colliders), 1)
+        else:
+            a, b = candidate_pairs(
+                np.array([entities[i].state.p_pos for i in colliders], dtype=float),
+                np.array([entities[i].size for i in colliders], dtype=float),
+                CONTACT_CUTOFF * self.contact_margin,
+            )
+        return colliders[a], colliders[b]
+
+    # index of an entity in self.entities, and so in relative_positions and
+    # distances
+    def entity_index(self, entity):
+        if self._entity_indices is None:
+            self._entity_indices = {other: i for i, other in enumerate(self.entities)}
+        return self._entity_indices[entity]
+
+    # positions of the entities, shape (num_entities, dim_p), computed once
+    # per step
+    def positions(self):
+        if self._positions is None:
+            entities = self.entities
+            self._positions = np.array(
+                [entity.state.p_pos for entity in entities], dtype=np.float64
+            ).reshape(len(entities), self.dim_p)
+        return self._positions
+
+    # velocities of the entities, shape (num_entities, dim_p), zero for the
+    # entities without a velocity, computed once per step
+    def velocities(self):
+        if self._velocities is None:
+            entities = self.entities
+            self._velocities = np.zeros((len(entities), self.dim_p))
+            for i, entity in enumerate(entities):
+                if entity.state.p_vel is not None:
+                    self._velocities[i] = entity.state.p_vel
+        return self._velocities
+
+    # positions of the entities in the reference frame of each other:
+    # relative_positions()[i, j] is the position of entity j minus the
+    # position of entity i. `origins` (an index or an array of indices of
+    # entities) restricts the result to the rows of those entities, so that
+    # the observation of a few agents does not compute the dense
+    # (num_entities, num_entities, dim_p) array; that one is computed once
+    # per step, when asked for without `origins`
+    def relative_positions(self, origins=None):
+        if origins is None:
+            if self._relative_positions is None:
+                p_pos = self.positions()
+                self._relative_positions = p_pos[None, :, :] - p_pos[:, None, :]
+            return self._relative_positions
+        if self._relative_positions is not None:
+            return self._relative_positions[origins]
+        p_pos = self.positions()
+        return p_pos - p_pos[origins][..., None, :]
+
+    # distances between the entities, restricted to the rows of `origins`
+    # like relative_positions, the dense array is computed once per step
+    def distances(self, origins=None):
+        if origins is None:
+            if self._distances is None:
+                self._distances = np.sqrt(
+                    np.sum(np.square(self.relative_positions()), axis=2)
+                )
+            return self._distances
+        if self._distances is not None:
+            return self._distances[origins]
+        return np.sqrt(np.sum(np.square(self.relative_positions(origins)), axis=-1))
+
+    # pairs of overlapping entities (closer than the sum of their sizes) at the
+    # current positions, computed once per step with the broadphase
+    def collision_pairs(self):
+        if self._collisions is None:
+            entities = self.entities
+            p_pos = np.array([entity.state.p_pos for entity in entities], dtype=float)
+            sizes = np.array([entity.size for entity in entities], dtype=float)
+            i, j = candidate_pairs(p_pos, sizes)
+            dist = np.sqrt(np.sum(np.square(p_pos[i] - p_pos[j]), axis=1))
+            hit = dist < sizes[i] + sizes[j]
+            pairs = [(entities[a], entities[b]) for a, b in zip(i[hit], j[hit])]
+            overlaps = {}
+            for entity_a, entity_b in pairs:
+                overlaps.setdefault(entity_a, set()).add(entity_b)
+                overlaps.setdefault(entity_b, set()).add(entity_a)
+            self._collisions = (pairs, overlaps)
+        return self._collisions[0]
+
+    # whether two entities overlap, the cached version of the is_collision
+    # method of the scenarios
+    def is_collision(self, entity_a, entity_b):
+        if entity_a is entity_b:
+            return entity_a.size > 0
+        self.collision_pairs()
+        return entity_b in self._collisions[1].get(entity_a, ())
+
+    # contact forces at the current positions, computed once per step:
+    # (a, b, force) for the pairs of contact_pairs, force[k] being the force
+    # applied on entity a[k] by entity b[k] and -force[k] the one applied on
+    # b[k]; the physics step applies them to the movable entities
+    def contacts(self):
+        if self._contacts is None:
+            a, b = self.contact_pairs(self.entities)
+            self._contacts = (a, b, self.pair_contact_forces(a, b))
+        return self._contacts
+
+    # sizes of the entities, shape (num_entities,)
+    def entity_sizes(self):
+        return np.array([entity.size for entity in self.entities], dtype=float)
+
+    # contact forces applied on the entities of `a` by the entities of `b`,
+    # pair by pair, computed like get_collision_force
+    def pair_contact_forces(self, a, b):
+        p_pos = self.positions()
+        sizes = self.entity_sizes()
+        delta_pos = p_pos[a] - p_pos[b]
+        dist_min = sizes[a] + sizes[b]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dist = np.sqrt(np.sum(np.square(delta_pos), axis=1))
+            # softmax penetration
+            k = self.contact_margin
+            penetration = np.logaddexp(0, -(dist - dist_min) / k) * k
+            return self.contact_force * delta_pos / dist[:, None] * penetration[:, None]
+
     # gather physical forces acting on entities
     def apply_environment_force(self, p_force):
-        # simple (but inefficient) collision response
-        for a, entity_a in enumerate(self.entities):
-            for b, entity_b in enumerate(self.entities):
-                if b <= a:
-                    continue
-                [f_a, f_b] = self.get_collision_force(entity_a, entity_b)
-                if f_a is not None:
-                    if p_force[a] is None:
-                        p_force[a] = 0.0
-                    p_force[a] = f_a + p_force[a]
-                if f_b is not None:
-                    if p_force[b] is None:
-                        p_force[b] = 0.0
-                    p_force[b] = f_b + p_force[b]
+        entities = self.entities
+        # only the pairs found by the broadphase can be in contact
+        a, b, force = self.contacts()
+        for i, j, f in zip(a, b, force):
+            if entities[i].movable:
+                if p_force[i] is None:
+                    p_force[i] = 0.0
+                p_force[i] = +f + p_force[i]
+            if entities[j].movable:
+                if p_force[j] is None:
+                    p_force[j] = 0.0
+                p_force[j] = -f + p_force[j]
         return p_force
 
     # integrate physical state
@@ -186,17 +568,31 @@ class World:  # multi-agent world
                     )
             entity.state.p_pos += entity.state.p_vel * self.dt
 
-    def update_agent_state(self, agent):
-        # set communication state (directly for now)
+    def update_agent_states(self):
+        noise = self.action_noise("c")
+        for i, agent in enumerate(self.agents):
+            self.update_agent_state(agent, None if noise is None else noise[i])
+
+    def update_agent_state(self, agent, noise=None):
+        # set communication state (directly for now), in place when the agent
+        # already has a state array of its own; the noise is drawn here when
+        # not given by update_agent_states
+        c = agent.state.c
+        if (
+            not isinstance(c, np.ndarray)
+            or c.shape != (self.dim_c,)
+            or c.dtype != np.float64
+            or c.base is not None
+        ):
+            c = agent.state.c = np.zeros(self.dim_c)
         if agent.silent:
-            agent.state.c = np.zeros(self.dim_c)
+            c.fill(0.0)
         else:
-            noise = (
-                np.random.randn(*agent.action.c.shape) * agent.c_noise
-                if agent.c_noise
-                else 0.0
-            )
-            agent.state.c = agent.action.c + noise
+            if noise is None and agent.c_noise:
+                noise = (
+                    self.np_random.standard_normal(agent.action.c.shape) * agent.c_noise
+                )
+            np.add(agent.action.c, 0.0 if noise is None else noise, out=c)
 
     # get collision forces for any contact between two entities
     def get_collision_force(self, entity_a, entity_b):
@@ -216,3 +612,225 @@ class World:  # multi-agent world
         force_a = +force if entity_a.movable else None
         force_b = -force if entity_b.movable else None
         return [force_a, force_b]
+
+
+class VectorizedWorld(World):  # multi-agent world with array-based physics
+    """
+    World whose physics step works on arrays of the positions, velocities and
+    properties of all entities at once instead of looping over the entities
+    and pairs of entities in Python.
+
+    It computes the same floating point operations in the same order as
+    World, so trajectories are identical under the same seed. The arrays
+    `p_pos` and `p_vel` hold the state of all entities (rows follow
+    `entities`), and `state.p_pos` and `state.p_vel` of every entity are
+    views of their rows, so the physics step updates them in place.
+    `bind_state` moves the states into the arrays; it is called again by
+    `step` when the scenario replaced the state arrays of the entities, as
+    `reset_world` does. The properties of the entities (size, mass, ...) are
+    read by `bind_state` too: call it after changing them between resets.
+    """
+
+    p_pos = None
+    p_vel = None
+    _bound_entities = ()
+
+    @classmethod
+    def from_world(cls, world):
+        vectorized = cls.__new__(cls)
+        vectorized.__dict__.update(world.__dict__)
+        return vectorized
+
+    def bind_state(self):
+        entities = self.entities
+        self.p_pos = np.zeros((len(entities), self.dim_p))
+        self.p_vel = np.zeros((len(entities), self.dim_p))
+        for i, entity in enumerate(entities):
+            self.p_pos[i] = entity.state.p_pos
+            entity.state.p_pos = self.p_pos[i]
+            # entities without a velocity keep None, and a zero row
+            if entity.state.p_vel is not None:
+                self.p_vel[i] = entity.state.p_vel
+                entity.state.p_vel = self.p_vel[i]
+        self.movable_mask = np.array(
+            [entity.movable for entity in entities], dtype=bool
+        )
+        self.collide_mask = np.array(
+            [entity.collide for entity in entities], dtype=bool
+        )
+        self.sizes = np.array([entity.size for entity in entities], dtype=float)
+        self.masses = np.array([entity.mass for entity in entities], dtype=float)
+        self.max_speeds = np.array(
+            [
+                np.inf if entity.max_speed is None else entity.max_speed
+                for entity in entities
+            ],
+            dtype=float,
+        )
+        self._bound_entities = (entities[0], entities[-1]) if entities else ()
+        self._positions = None
+        self._velocities = None
+        self._relative_positions = None
+        self._distances = None
+        self._collisions = None
+        self._contacts = None
+
+    def _state_is_bound(self):
+        # reset_world replaces the state arrays of all the entities, checking
+        # the first and the last one is enough to detect it
+        agents = self.agents
+        landmarks = self.landmarks
+        if self.p_pos is None or len(self.p_pos) != len(agents) + len(landmarks):
+            return False
+        if not len(self.p_pos):
+            return True
+        first = agents[0] if agents else landmarks[0]
+        last = landmarks[-1] if landmarks else agents[-1]
+        return (
+            self._bound_entities == (first, last)
+            and first.state.p_pos.base is self.p_pos
+            and last.state.p_pos.base is self.p_pos
+        )
+
+    # the positions and velocities are the state arrays themselves, read-only
+    def positions(self):
+        if not self._state_is_bound():
+            self.bind_state()
+        if self._positions is None:
+            self._positions = self.p_pos.view()
+            self._positions.flags.writeable = False
+        return self._positions
+
+    def velocities(self):
+        if not self._state_is_bound():
+            self.bind_state()
+        if self._velocities is None:
+            self._velocities = self.p_vel.view()
+            self._velocities.flags.writeable = False
+        return self._velocities
+
+    def step(self):
+        if not self._state_is_bound():
+            self.bind_state()
+        # set actions for scripted agents
+        self.apply_scripted_actions()
+        entities = self.entities
+        # apply agent physical controls
+        p_force, has_force = self.apply_action_force_array(entities)
+        # apply environment forces
+        self.apply_environment_force_array(p_force, has_force)
+        # integrate physical state
+        self.integrate_state_array(p_force, has_force)
+        # update agent state
+        self.update_agent_states()
+        self.invalidate_cache()
+
+    def apply_action_force_array(self, entities):
+        p_force = np.zeros((len(entities), self.dim_p))
+        has_force = np.zeros(len(entities), dtype=bool)
+        # the noise is drawn like in World.apply_action_force
+        noise = self.action_noise("u")
+        for i, agent in enumerate(self.agents):
+            if agent.movable:
+                p_force[i] = agent.action.u + (0.0 if noise is None else noise[i])
+                has_force[i] = True
+        return p_force, has_force
+
+    def contact_forces(self, idxs):
+        """
+        Returns the (len(idxs), len(idxs), dim_p) array of the contact forces
+        between the entities of `idxs`, [a, b] being the force applied on a by
+        b; the diagonal is zero.
+        """
+        pos = self.p_pos[idxs]
+        delta_pos = pos[:, None, :] - pos[None, :, :]
+        size = self.sizes[idxs]
+        dist_min = size[:, None] + size[None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dist = np.sqrt(np.sum(np.square(delta_pos), axis=2))
+            # softmax penetration
+            k = self.contact_margin
+            penetration = np.logaddexp(0, -(dist - dist_min) / k) * k
+            force = (
+                self.contact_force
+                * delta_pos
+                / dist[:, :, None]
+                * penetration[:, :, None]
+            )
+        diagonal = np.arange(len(idxs))
+        force[diagonal, diagonal] = 0.0
+        return force
+
+    def entity_sizes(self):
+        if not self._state_is_bound():
+            self.bind_state()
+        return self.sizes
+
+    def contact_pairs(self, entities):
+        if not self._state_is_bound():
+            self.bind_state()
+        colliders = np.flatnonzero(self.collide_mask)
+        if len(colliders) < BROADPHASE_MIN_SIZE:
+            a, b = np.triu_indices(len(colliders), 1)
+        else:
+            a, b = candidate_pairs(
+                self.p_pos[colliders],
+                self.sizes[colliders],
+                CONTACT_CUTOFF * self.contact_margin,
+            )
+        return colliders[a], colliders[b]
+
+    def apply_environment_force_array(self, p_force, has_force):
+        colliders = np.flatnonzero(self.collide_mask)
+        if len(colliders) < 2:
+            return
+        total = p_force[colliders]
+        if len(colliders) < BROADPHASE_MIN_SIZE:
+            force = self.contact_forces(colliders)
+            # World adds the forces of the other entities one at a time, in
+            # the order of the entities; add.accumulate sums in that order
+            # too, which keeps the same rounding
+            total = np.add.accumulate(
+                np.concatenate([total[:, None], force], axis=1), axis=1
+            )[:, -1]
+        else:
+            a, b, force = self.contacts()
+            # positions of the entities of the pairs among the colliders
+            local = np.zeros(len(self.p_pos), dtype=np.intp)
+            local[colliders] = np.arange(len(colliders))
+            a = local[a]
+            b = local[b]
+            targets = np.concatenate([a, b])
+            sources = np.concatenate([b, a])
+            forces = np.concatenate([force, -force])
+            # the forces on each entity are added in the order of World:
+            # sorted by source, one column of a padded table at a time
+            order = np.lexsort((sources, targets))
+            targets = targets[order]
+            counts = np.bincount(targets, minlength=len(colliders))
+            if len(targets):
+                starts = np.cumsum(counts) - counts
+                columns = np.arange(len(targets)) - starts[targets]
+                table = np.zeros((len(colliders), counts.max(), self.dim_p))
+                table[targets, columns] = forces[order]
+                for column in table.transpose(1, 0, 2):
+                    total += column
+        p_force[colliders] = total
+        has_force[colliders] = True
+
+    def integrate_state_array(self, p_force, has_force):
+        movable = self.movable_mask
+        vel = self.p_vel[movable] * (1 - self.damping)
+        pushed = has_force[movable]
+        vel[pushed] += (
+            p_force[movable][pushed] / self.masses[movable][pushed, None]
+        ) * self.dt
+        speed = np.sqrt(np.square(vel[:, 0]) + np.square(vel[:, 1]))
+        max_speed = self.max_speeds[movable]
+        too_fast = speed > max_speed
+        vel[too_fast] = (
+            vel[too_fast] / speed[too_fast, None] * max_speed[too_fast, None]
+        )
+        # in place, the states of the entities are views of the rows
+        self.p_vel[movable] = vel
+        self.p_pos[movable] += vel * self.dt
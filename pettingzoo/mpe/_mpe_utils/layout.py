@@ -0,0 +1,149 @@
+import numpy as np
+
+# fields of the observations returned by Scenario.observation_layout, in the
+# order in which Scenario.observation concatenates them
+
+
+def velocity(entity):
+    return ("p_vel", entity)
+
+
+def position(entity):
+    return ("p_pos", entity)
+
+
+def relative_position(entity, origin):
+    # position of entity in the reference frame of origin
+    return ("relative_pos", entity, origin)
+
+
+def message(agent):
+    return ("c", agent)
+
+
+def constant(values):
+    # values that do not change until the next reset, like colors
+    return ("constant", values)
+
+
+class ObservationLayout:
+    """
+    Gathers the observations of all agents of a world into one float32
+    buffer, laid out like `SimpleEnv.state()`: the observation of agent i is
+    `buffer[slices[i]]`.
+
+    `fields` holds the fields of the observation of each agent (see
+    `Scenario.observation_layout`). They are compiled once into the indices
+    of the values of each field in the buffer and in the arrays of the world
+    state, so that `fill` copies every value with a few array operations
+    instead of building and concatenating small arrays agent by agent. The
+    layout must be compiled again when the fields change, e.g. on reset.
+    """
+
+    def __init__(self, world, fields):
+        self.world = world
+        dim_p = world.dim_p
+        dim_c = world.dim_c
+        num_entities = len(world.entities)
+        index = {entity: i for i, entity in enumerate(world.entities)}
+        # start of each field in the buffer and in its source array
+        starts = {"p_pos": [], "p_vel": [], "relative_pos": [], "c": []}
+        velocities = {}
+        messages = {}
+        origins = {}
+        constant_starts = []
+        constant_values = []
+
+        self.slices = []
+        offset = 0
+        for agent_fields in fields:
+            start = offset
+            for field in agent_fields:
+                kind = field[0]
+                if kind == "constant":
+                    values = np.asarray(field[1], dtype=np.float64).ravel()
+                    constant_starts.append(offset)
+                    constant_values.append(values)
+                    offset += len(values)
+                    continue
+                if kind == "p_pos":
+                    source = index[field[1]] * dim_p
+                elif kind == "relative_pos":
+                    origin = origins.setdefault(index[field[2]], len(origins))
+                    source = (origin * num_entities + index[field[1]]) * dim_p
+                elif kind == "p_vel":
+                    source = velocities.setdefault(field[1], len(velocities)) * dim_p
+                elif kind == "c":
+                    source = messages.setdefault(field[1], len(messages)) * dim_c
+                else:
+                    raise ValueError(f"unknown observation field {kind!r}")
+                starts[kind].append((offset, source))
+                offset += dim_c if kind == "c" else dim_p
+            self.slices.append(slice(start, offset))
+        self.size = offset
+        self.dims = [s.stop - s.start for s in self.slices]
+
+        # (buffer indices, source indices) of each kind of field
+        self._plans = {}
+        for kind, field_starts in starts.items():
+            size = dim_c if kind == "c" else dim_p
+            field_starts = np.array(field_starts, dtype=np.intp).reshape(-1, 2)
+            span = np.arange(size)
+            self._plans[kind] = (
+                (field_starts[:, 0, None] + span).ravel(),
+                (field_starts[:, 1, None] + span).ravel(),
+            )
+        self._velocity_entities = list(velocities)
+        # entities in whose reference frame relative positions are observed,
+        # only their rows of relative_positions are computed
+        self._relative_origins = np.array(list(origins), dtype=np.intp)
+        self._message_agents = list(messages)
+        if constant_values:
+            self._constant_index = np.concatenate(
+                [
+                    start + np.arange(len(values))
+                    for start, values in zip(constant_starts, constant_values)
+                ]
+            )
+            self._constant_values = np.concatenate(constant_values)
+        else:
+            self._constant_index = np.zeros(0, dtype=np.intp)
+            self._constant_values = np.zeros(0)
+
+    def _source(self, kind):
+        # array with the values of the fields of a kind, in the current state
+        world = self.world
+        if kind == "p_pos":
+            return world.positions()
+        if kind == "relative_pos":
+            return world.relative_positions(self._relative_origins)
+        if kind == "p_vel":
+            entities = self._velocity_entities
+            return np.array([entity.state.p_vel for entity in entities], dtype=float)
+        return np.array([agent.state.c for agent in self._message_agents], dtype=float)
+
+    def fill(self):
+        """
+        Returns a new buffer with the observations of the current state of
+        the world. A new buffer is used for every state, so that observations
+        returned earlier are not changed by later steps.
+        """
+        buffer = np.empty(self.size, dtype=np.float32)
+        buffer[self._constant_index] = self._constant_values
+        for kind, (buffer_index, source_index) in self._plans.items():
+            if len(buffer_index):
+                buffer[buffer_index] = self._source(kind).reshape(-1)[source_index]
+        return buffer
+
+    def gather(self, buffer, indices):
+        """
+        Returns the stacked observations of the agents at `indices` in a
+        buffer returned by `fill`, shape (len(indices), obs_dim).
+        """
+        dims = {self.dims[i] for i in indices}
+        if len(dims) > 1:
+            raise ValueError(
+                f"observations of sizes {sorted(dims)} cannot be stacked into one batch"
+            )
+        starts = np.array([self.slices[i].start for i in indices], dtype=np.intp)
+        return buffer[starts[:, None] + np.arange(dims.pop() if dims else 0)]
@@ -0,0 +1,78 @@
+import numpy as np
+
+# pixels of radius per unit of entity size on a 700 pixels wide screen, an
+# arbitrary scale factor to get pygame to render similar sizes as pyglet
+SIZE_SCALE = 350
+
+
+def camera_coordinates(p_pos, width, height):
+    """
+    Returns the pixel coordinates (x, y) of the positions `p_pos` (shape
+    (n, 2)) with the camera of SimpleEnv.draw, which keeps every entity on
+    the screen.
+    """
+    cam_range = np.max(np.abs(p_pos))
+    # y is flipped to mimic the old pyglet setup, and the .9 keeps entities
+    # from appearing "too" out-of-bounds
+    x = (p_pos[:, 0] / cam_range) * width // 2 * 0.9 + width // 2
+    y = (-p_pos[:, 1] / cam_range) * height // 2 * 0.9 + height // 2
+    return x, y
+
+
+class Rasterizer:
+    """
+    Draws MPE entities as filled circles with a black border straight into
+    (height, width, 3) uint8 NumPy arrays, without pygame or a display, e.g.
+    to log videos of many environments at once.
+
+    The pixel offsets of the disks are computed once per radius and reused.
+    The image follows SimpleEnv.render, scaled to `width`, but does not show
+    the messages of the agents.
+    """
+
+    def __init__(self, width=700, height=700):
+        self.width = width
+        self.height = height
+        self._disks = {}
+
+    def _disk(self, radius):
+        # offsets (dy, dx) of the pixels of a disk and whether they are on
+        # its border
+        radius = round(float(radius), 2)
+        if radius not in self._disks:
+            r = int(np.ceil(radius))
+            dy, dx = np.mgrid[-r : r + 1, -r : r + 1]
+            dist = np.sqrt(dy**2 + dx**2).ravel()
+            inside = dist <= radius
+            self._disks[radius] = (
+                dy.ravel()[inside],
+                dx.ravel()[inside],
+                dist[inside] > radius - 1,
+            )
+        return self._disks[radius]
+
+    def draw(self, p_pos, sizes, colors, out=None):
+        """
+        Draws entities of positions `p_pos` (shape (n, 2)), sizes `sizes` and
+        fill colors `colors` (shape (n, 3), in [0, 1] like `Entity.color`),
+        in order, into `out`, which is allocated if None, and returns it.
+        """
+        if out is None:
+            out = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        out.fill(255)
+        if not len(p_pos):
+            return out
+        x, y = camera_coordinates(p_pos, self.width, self.height)
+        cx = x.astype(np.int64)
+        cy = y.astype(np.int64)
+        radii = np.asarray(sizes) * SIZE_SCALE * self.width / 700
+        # like pygame, only the RGB part of RGBA colors is used
+        fills = (np.asarray(colors)[:, :3] * 200).astype(np.uint8)
+        for i in range(len(p_pos)):
+            dy, dx, border = self._disk(radii[i])
+            ys = cy[i] + dy
+            xs = cx[i] + dx
+            visible = (ys >= 0) & (ys < self.height) & (xs >= 0) & (xs < self.width)
+            out[ys[visible], xs[visible]] = fills[i]
+            out[ys[visible & border], xs[visible & border]] = 0
+        return out
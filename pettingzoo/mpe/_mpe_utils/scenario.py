@@ -1,6 +1,94 @@
+import numpy as np
+
+
 class BaseScenario:  # defines scenario upon which the world is built
     def make_world(self):  # create elements of the world
         raise NotImplementedError()
 
     def reset_world(self, world, np_random):  # create initial conditions of the world
         raise NotImplementedError()
+
+    def observation_batch(self, agents, world):
+        # stacked observations of several agents, scenarios without an observation_layout can override this with a vectorized version
+        return np.stack([self.observation(agent, world) for agent in agents])
+
+    def observation_layout(
+        self, agent, world
+    ):  # fields of the observation of agent (see layout.py), lets SimpleEnv gather all observations into one buffer
+        raise NotImplementedError()
+
+    # the batched_* methods are used by BatchedSimpleEnv and receive a BatchedWorld
+
+    def batched_state(
+        self, world
+    ):  # values of a freshly reset world, besides the entity states, that the batched methods need
+        return {}
+
+    def batched_reward(
+        self, world
+    ):  # rewards of all agents, shape (num_envs, num_agents)
+        raise NotImplementedError()
+
+    def batched_global_reward(self, world):  # global rewards, shape (num_envs,)
+        raise NotImplementedError()
+
+    def batched_observation(
+        self, world
+    ):  # list of (agent indices, observations of shape (num_envs, len(indices), obs_dim)) pairs
+        raise NotImplementedError()
+
+
+def agent_indices(agents, world):
+    index = {agent: i for i, agent in enumerate(world.agents)}
+    return np.array([index[agent] for agent in agents], dtype=np.int64)
+
+
+def other_indices(idxs, n):
+    # for each index i in idxs, the indices of range(n) without i, shape (len(idxs), n - 1)
+    others = np.arange(n - 1)[None, :]
+    return others + (others >= idxs[:, None])
+
+
+def batched_relative_positions(positions, origins):
+    # positions (num_envs, n, dim_p) relative to each origin (num_envs, m, dim_p), flattened per origin
+    num_envs, m = origins.shape[:2]
+    return (positions[:, None, :, :] - origins[:, :, None, :]).reshape(num_envs, m, -1)
+
+
+def batched_distances(positions_a, positions_b):
+    # distances between the positions (num_envs, n, dim_p) and (num_envs, m, dim_p), shape (num_envs, n, m)
+    delta_pos = positions_a[:, :, None, :] - positions_b[:, None, :, :]
+    return np.sqrt(np.sum(np.square(delta_pos), axis=3))
+
+
+def batched_collisions(world, idxs_a, idxs_b):
+    # whether the entities of idxs_a and idxs_b overlap, shape (num_envs, len(idxs_a), len(idxs_b))
+    dist = batched_distances(world.p_pos[:, idxs_a], world.p_pos[:, idxs_b])
+    dist_min = world.sizes[idxs_a][:, None] + world.sizes[idxs_b][None, :]
+    return dist < dist_min
+
+
+def batched_others(values, idxs):
+    # values (num_envs, n, ...) of the other agents of each index of idxs, flattened per index
+    num_envs, n = values.shape[:2]
+    return values[:, other_indices(np.asarray(idxs), n)].reshape(
+        num_envs, len(idxs), -1
+    )
+
+
+def batched_other_positions(positions, idxs):
+    # positions (num_envs, n, dim_p) of the other agents relative to each index of idxs, flattened per index
+    num_envs, n = positions.shape[:2]
+    idxs = np.asarray(idxs)
+    relative = positions[:, other_indices(idxs, n)] - positions[:, idxs, None, :]
+    return relative.reshape(num_envs, len(idxs), -1)
+
+
+def batched_bound(x):
+    # penalty of simple_tag and simple_world_comm for leaving the screen
+    with np.errstate(over="ignore"):
+        return np.where(
+            x < 0.9,
+            0,
+            np.where(x < 1.0, (x - 0.9) * 10, np.minimum(np.exp(2 * x - 2), 10)),
+        )
@@ -1,17 +1,22 @@
 import os
 
 import numpy as np
-import pygame
 from gym import spaces
 from gym.utils import seeding
 
 from pettingzoo import AECEnv
-from pettingzoo.mpe._mpe_utils.core import Agent
+from pettingzoo.mpe._mpe_utils.core import Agent, VectorizedWorld
+from pettingzoo.mpe._mpe_utils.layout import ObservationLayout
+from pettingzoo.mpe._mpe_utils.rendering import SIZE_SCALE, camera_coordinates
 from pettingzoo.utils import wrappers
 from pettingzoo.utils.agent_selector import agent_selector
+from pettingzoo.utils.agent_table import AgentTable
 
 alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
+# physical action of each discrete movement action: no-op, left, right, down, up
+MOVES = np.array([[0.0, 0.0], [-1.0, 0.0], [1.0, 0.0], [0.0, -1.0], [0.0, 1.0]])
+
 
 def make_env(raw_env):
     def env(**kwargs):
@@ -26,23 +31,39 @@ def make_env(raw_env):
     return env
 
 
+def noise_random(seed):
+    """
+    Generator of the action noise of an environment seeded with `seed`. It is
+    a stream of its own, so that the noise does not change the initial
+    states drawn from the `np_random` of later resets.
+    """
+    return np.random.Generator(
+        np.random.PCG64(np.random.SeedSequence(seed).spawn(1)[0])
+    )
+
+
 class SimpleEnv(AECEnv):
     def __init__(
-        self, scenario, world, max_cycles, continuous_actions=False, local_ratio=None
+        self,
+        scenario,
+        world,
+        max_cycles,
+        continuous_actions=False,
+        local_ratio=None,
+        vectorized_physics=False,
+        agent_tables=False,
     ):
         super().__init__()
 
-        pygame.init()
         self.viewer = None
         self.width = 700
         self.height = 700
-        self.screen = pygame.Surface([self.width, self.height])
+        # the drawing surface and font are created by the first render, so
+        # that environments which are never rendered do not load pygame
+        self.screen = None
         self.max_size = 1
-        self.game_font = pygame.freetype.Font(
-            os.path.join(os.path.dirname(__file__), "secrcode.ttf"), 24
-        )
-
-        # Set up the drawing window
+        self.game_font = None
+        self._render_geometry = None
 
         self.renderOn = False
         self.seed()
@@ -55,14 +76,21 @@ class SimpleEnv(AECEnv):
 
         self.max_cycles = max_cycles
         self.scenario = scenario
+        if vectorized_physics:
+            world = VectorizedWorld.from_world(world)
         self.world = world
+        self.world.np_random = self.noise_random
         self.continuous_actions = continuous_actions
         self.local_ratio = local_ratio
 
         self.scenario.reset_world(self.world, self.np_random)
+        self.world.invalidate_cache()
 
         self.agents = [agent.name for agent in self.world.agents]
         self.possible_agents = self.agents[:]
+        # with many agents, rewards and dones are stored in arrays so that
+        # the per-agent steps do not loop over all agents
+        self._agent_table = AgentTable(self.possible_agents) if agent_tables else None
         self._index_map = {
             agent.name: idx for idx, agent in enumerate(self.world.agents)
         }
@@ -108,6 +136,30 @@ class SimpleEnv(AECEnv):
             dtype=np.float32,
         )
 
+        # tables to decode the actions of all agents at once into the action
+        # buffers of the world, see _set_actions
+        agents = self.world.agents
+        self._movable = np.array([agent.movable for agent in agents], dtype=bool)
+        self._talking = np.flatnonzero([not agent.silent for agent in agents])
+        self._sensitivity = np.array(
+            [5.0 if agent.accel is None else agent.accel for agent in agents]
+        )
+        if self.continuous_actions:
+            self._action_dims = [
+                self.action_spaces[agent.name].shape[0] for agent in agents
+            ]
+            self._action_buffer = np.zeros(
+                (len(agents), max(self._action_dims, default=0)), dtype=np.float32
+            )
+            offsets = np.where(
+                self._movable[self._talking], self.world.dim_p * 2 + 1, 0
+            )
+            self._comm_columns = offsets[:, None] + np.arange(self.world.dim_c)
+        else:
+            self._action_buffer = np.zeros(len(agents), dtype=np.int64)
+        self.world.bind_action_buffers()
+        self._compile_observations()
+
         self.steps = 0
 
         self.current_actions = [None] * self.num_agents
@@ -120,13 +172,51 @@ class SimpleEnv(AECEnv):
 
     def seed(self, seed=None):
         self.np_random, seed = seeding.np_random(seed)
+        self.noise_random = noise_random(seed)
+        if hasattr(self, "world"):
+            self.world.np_random = self.noise_random
+
+    def _compile_observations(self):
+        # scenarios that describe the layout of their observations have all
+        # of them gathered into one buffer per state of the world
+        try:
+            fields = [
+                self.scenario.observation_layout(agent, self.world)
+                for agent in self.world.agents
+            ]
+        except NotImplementedError:
+            self._observation_layout = None
+        else:
+            self._observation_layout = ObservationLayout(self.world, fields)
+        self._observations = None
+
+    def _observation_buffer(self):
+        if self._observations is None:
+            self._observations = self._observation_layout.fill()
+        return self._observations
 
     def observe(self, agent):
-        return self.scenario.observation(
-            self.world.agents[self._index_map[agent]], self.world
-        ).astype(np.float32)
+        if self._observation_layout is None:
+            return self.scenario.observation(
+                self.world.agents[self._index_map[agent]], self.world
+            ).astype(np.float32)
+        return self._observation_buffer()[
+            self._observation_layout.slices[self._index_map[agent]]
+        ]
+
+    def observe_batch(self, agents):
+        if self._observation_layout is None:
+            return self.scenario.observation_batch(
+                [self.world.agents[self._index_map[agent]] for agent in agents],
+                self.world,
+            ).astype(np.float32)
+        return self._observation_layout.gather(
+            self._observation_buffer(), [self._index_map[agent] for agent in agents]
+        )
 
     def state(self):
+        if self._observation_layout is not None:
+            return self._observation_buffer()
         states = tuple(
             self.scenario.observation(
                 self.world.agents[self._index_map[agent]], self.world
@@ -139,11 +229,22 @@ class SimpleEnv(AECEnv):
         if seed is not None:
             self.seed(seed=seed)
         self.scenario.reset_world(self.world, self.np_random)
+        self.world.invalidate_cache()
+        self.world.bind_action_buffers()
+        self._render_geometry = None
+        self._compile_observations()
 
         self.agents = self.possible_agents[:]
-        self.rewards = {name: 0.0 for name in self.agents}
-        self._cumulative_rewards = {name: 0.0 for name in self.agents}
-        self.dones = {name: False for name in self.agents}
+        if self._agent_table is not None:
+            table = self._agent_table
+            self.agents = table.agent_list(self.agents)
+            self.rewards = table.fromkeys(self.agents, 0.0, float)
+            self._cumulative_rewards = table.fromkeys(self.agents, 0.0, float)
+            self.dones = table.fromkeys(self.agents, False, bool)
+        else:
+            self.rewards = {name: 0.0 for name in self.agents}
+            self._cumulative_rewards = {name: 0.0 for name in self.agents}
+            self.dones = {name: False for name in self.agents}
         self.infos = {name: {} for name in self.agents}
 
         self.agent_selection = self._agent_selector.reset()
@@ -153,22 +254,9 @@ class SimpleEnv(AECEnv):
 
     def _execute_world_step(self):
         # set action for each agent
-        for i, agent in enumerate(self.world.agents):
-            action = self.current_actions[i]
-            scenario_action = []
-            if agent.movable:
-                mdim = self.world.dim_p * 2 + 1
-                if self.continuous_actions:
-                    scenario_action.append(action[0:mdim])
-                    action = action[mdim:]
-                else:
-                    scenario_action.append(action % mdim)
-                    action //= mdim
-            if not agent.silent:
-                scenario_action.append(action)
-            self._set_action(scenario_action, agent, self.action_spaces[agent.name])
-
+        self._set_actions(self.current_actions)
         self.world.step()
+        self._observations = None
 
         global_reward = 0.0
         if self.local_ratio is not None:
@@ -186,43 +274,34 @@ class SimpleEnv(AECEnv):
 
             self.rewards[agent.name] = reward
 
-    # set env action for a particular agent
-    def _set_action(self, action, agent, action_space, time=None):
-        agent.action.u = np.zeros(self.world.dim_p)
-        agent.action.c = np.zeros(self.world.dim_c)
-
-        if agent.movable:
-            # physical action
-            agent.action.u = np.zeros(self.world.dim_p)
-            if self.continuous_actions:
-                # Process continuous action as in OpenAI MPE
-                agent.action.u[0] += action[0][1] - action[0][2]
-                agent.action.u[1] += action[0][3] - action[0][4]
-            else:
-                # process discrete action
-                if action[0] == 1:
-                    agent.action.u[0] = -1.0
-                if action[0] == 2:
-                    agent.action.u[0] = +1.0
-                if action[0] == 3:
-                    agent.action.u[1] = -1.0
-                if action[0] == 4:
-                    agent.action.u[1] = +1.0
-            sensitivity = 5.0
-            if agent.accel is not None:
-                sensitivity = agent.accel
-            agent.action.u *= sensitivity
-            action = action[1:]
-        if not agent.silent:
-            # communication action
-            if self.continuous_actions:
-                agent.action.c = action[0]
-            else:
-                agent.action.c = np.zeros(self.world.dim_c)
-                agent.action.c[action[0]] = 1.0
-            action = action[1:]
-        # make sure we used all elements of action
-        assert len(action) == 0
+    # set env actions of all agents, in the action buffers of the world
+    def _set_actions(self, actions):
+        movable = self._movable
+        talking = self._talking
+        buffer = self._action_buffer
+        u = self.world.action_u
+        c = self.world.action_c
+        c.fill(0.0)
+        if self.continuous_actions:
+            # Process continuous actions as in OpenAI MPE: the movement takes
+            # the first dim_p * 2 + 1 entries of the action of movable
+            # agents, the communication follows
+            for i, action in enumerate(actions):
+                buffer[i, : self._action_dims[i]] = action
+            u.fill(0.0)
+            if movable.any():
+                u[movable, 0] += buffer[movable, 1] - buffer[movable, 2]
+                u[movable, 1] += buffer[movable, 3] - buffer[movable, 4]
+            c[talking] = buffer[talking[:, None], self._comm_columns]
+        else:
+            # discrete actions of movable agents that talk are
+            # movement + (dim_p * 2 + 1) * message
+            buffer[:] = actions
+            mdim = self.world.dim_p * 2 + 1
+            np.take(MOVES, np.where(movable, buffer % mdim, 0), axis=0, out=u)
+            messages = np.where(movable, buffer // mdim, buffer)
+            c[talking, messages[talking]] = 1.0
+        u *= self._sensitivity[:, None]
 
     def step(self, action):
         if self.dones[self.agent_selection]:
@@ -247,49 +326,63 @@ class SimpleEnv(AECEnv):
         self._accumulate_rewards()
 
     def enable_render(self, mode="human"):
+        # pygame is only loaded on the first render; rgb_array mode draws on
+        # an off-screen surface and never opens a window
+        import pygame
+        import pygame.freetype
+
+        if self.game_font is None:
+            pygame.freetype.init()
+            self.game_font = pygame.freetype.Font(
+                os.path.join(os.path.dirname(__file__), "secrcode.ttf"), 24
+            )
         if not self.renderOn and mode == "human":
-            self.screen = pygame.display.set_mode(self.screen.get_size())
+            pygame.init()
+            self.screen = pygame.display.set_mode((self.width, self.height))
             self.renderOn = True
+        elif self.screen is None:
+            self.screen = pygame.Surface((self.width, self.height))
 
     def render(self, mode="human"):
-        self.enable_render()
+        import pygame
 
-        observation = np.array(pygame.surfarray.pixels3d(self.screen))
+        self.enable_render(mode)
+        self.draw()
         if mode == "human":
-            self.draw()
             pygame.display.flip()
-        return (
-            np.transpose(observation, axes=(1, 0, 2)) if mode == "rgb_array" else None
-        )
+            return None
+        observation = np.array(pygame.surfarray.pixels3d(self.screen))
+        return np.transpose(observation, axes=(1, 0, 2))
+
+    def _geometry(self):
+        # fill colors and radii of the entities, which only change on reset
+        if self._render_geometry is None:
+            entities = self.world.entities
+            self._render_geometry = (
+                [entity.color * 200 for entity in entities],
+                [entity.size * SIZE_SCALE for entity in entities],
+            )
+        return self._render_geometry
 
     def draw(self):
+        import pygame
+
         # clear screen
         self.screen.fill((255, 255, 255))
 
         # update bounds to center around agent
-        all_poses = [entity.state.p_pos for entity in self.world.entities]
-        cam_range = np.max(np.abs(np.array(all_poses)))
+        entities = self.world.entities
+        p_pos = np.array([entity.state.p_pos for entity in entities])
+        xs, ys = camera_coordinates(p_pos, self.width, self.height)
+        colors, radii = self._geometry()
 
         # update geometry and text positions
         text_line = 0
-        for e, entity in enumerate(self.world.entities):
+        for e, entity in enumerate(entities):
             # geometry
-            x, y = entity.state.p_pos
-            y *= (
-                -1
-            )  # this makes the display mimic the old pyglet setup (ie. flips image)
-            x = (
-                (x / cam_range) * self.width // 2 * 0.9
-            )  # the .9 is just to keep entities from appearing "too" out-of-bounds
-            y = (y / cam_range) * self.height // 2 * 0.9
-            x += self.width // 2
-            y += self.height // 2
-            pygame.draw.circle(
-                self.screen, entity.color * 200, (x, y), entity.size * 350
-            )  # 350 is an arbitrary scale factor to get pygame to render similar sizes as pyglet
-            pygame.draw.circle(
-                self.screen, (0, 0, 0), (x, y), entity.size * 350, 1
-            )  # borders
+            x, y = xs[e], ys[e]
+            pygame.draw.circle(self.screen, colors[e], (x, y), radii[e])
+            pygame.draw.circle(self.screen, (0, 0, 0), (x, y), radii[e], 1)  # borders
             assert (
                 0 < x < self.width and 0 < y < self.height
             ), f"Coordinates {(x, y)} are out of bounds."
@@ -317,6 +410,8 @@ class SimpleEnv(AECEnv):
 
     def close(self):
         if self.renderOn:
+            import pygame
+
             pygame.event.pump()
             pygame.display.quit()
             self.renderOn = False
@@ -3,15 +3,27 @@ import numpy as np
 from pettingzoo.utils.conversions import parallel_wrapper_fn
 
 from .._mpe_utils.core import Agent, Landmark, World
-from .._mpe_utils.scenario import BaseScenario
+from .._mpe_utils.layout import relative_position, velocity
+from .._mpe_utils.scenario import BaseScenario, batched_relative_positions
 from .._mpe_utils.simple_env import SimpleEnv, make_env
 
 
 class raw_env(SimpleEnv):
-    def __init__(self, max_cycles=25, continuous_actions=False):
+    def __init__(
+        self,
+        max_cycles=25,
+        continuous_actions=False,
+        vectorized_physics=False,
+    ):
         scenario = Scenario()
         world = scenario.make_world()
-        super().__init__(scenario, world, max_cycles, continuous_actions)
+        super().__init__(
+            scenario,
+            world,
+            max_cycles,
+            continuous_actions,
+            vectorized_physics=vectorized_physics,
+        )
         self.metadata["name"] = "simple_v2"
 
 
@@ -63,3 +75,20 @@ class Scenario(BaseScenario):
         for entity in world.landmarks:
             entity_pos.append(entity.state.p_pos - agent.state.p_pos)
         return np.concatenate([agent.state.p_vel] + entity_pos)
+
+    def observation_layout(self, agent, world):
+        return [velocity(agent)] + [
+            relative_position(entity, agent) for entity in world.landmarks
+        ]
+
+    def batched_reward(self, world):
+        landmark = world.landmark_pos[:, :1]
+        return -np.sum(np.square(world.agent_pos - landmark), axis=2)
+
+    def batched_observation(self, world):
+        pos = world.agent_pos
+        obs = np.concatenate(
+            [world.agent_vel, batched_relative_positions(world.landmark_pos, pos)],
+            axis=2,
+        )
+        return [(np.arange(world.num_agents), obs)]
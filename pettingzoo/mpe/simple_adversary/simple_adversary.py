@@ -4,21 +4,39 @@ from gym.utils import EzPickle
 from pettingzoo.utils.conversions import parallel_wrapper_fn
 
 from .._mpe_utils.core import Agent, Landmark, World
-from .._mpe_utils.scenario import BaseScenario
+from .._mpe_utils.layout import relative_position
+from .._mpe_utils.scenario import (
+    BaseScenario,
+    batched_other_positions,
+    batched_relative_positions,
+)
 from .._mpe_utils.simple_env import SimpleEnv, make_env
 
 
 class raw_env(SimpleEnv, EzPickle):
-    def __init__(self, N=2, max_cycles=25, continuous_actions=False):
+    def __init__(
+        self,
+        N=2,
+        max_cycles=25,
+        continuous_actions=False,
+        vectorized_physics=False,
+    ):
         EzPickle.__init__(
             self,
             N,
             max_cycles,
             continuous_actions,
+            vectorized_physics,
         )
         scenario = Scenario()
         world = scenario.make_world(N)
-        super().__init__(scenario, world, max_cycles, continuous_actions)
+        super().__init__(
+            scenario,
+            world,
+            max_cycles,
+            continuous_actions,
+            vectorized_physics=vectorized_physics,
+        )
         self.metadata["name"] = "simple_adversary_v2"
 
 
@@ -187,3 +205,48 @@ class Scenario(BaseScenario):
             )
         else:
             return np.concatenate(entity_pos + other_pos)
+
+    def observation_layout(self, agent, world):
+        entity_pos = [relative_position(entity, agent) for entity in world.landmarks]
+        other_pos = [
+            relative_position(other, agent)
+            for other in world.agents
+            if other is not agent
+        ]
+        if not agent.adversary:
+            return [relative_position(agent.goal_a, agent)] + entity_pos + other_pos
+        else:
+            return entity_pos + other_pos
+
+    def batched_reward(self, world):
+        is_adversary = np.array([agent.adversary for agent in world.template.agents])
+        envs = np.arange(world.num_envs)[:, None]
+        goal_pos = world.p_pos[envs, world.goal_a[:, : world.num_agents]]
+        # distance of each agent to the goal landmark, shape (num_envs, num_agents)
+        dists = np.sqrt(np.sum(np.square(world.agent_pos - goal_pos), axis=2))
+        rew = np.zeros((world.num_envs, world.num_agents))
+        rew[:, is_adversary] = -dists[:, is_adversary]
+        adv_rew = np.zeros(world.num_envs)
+        for i in np.flatnonzero(is_adversary):
+            adv_rew += dists[:, i]
+        pos_rew = -np.min(dists[:, ~is_adversary], axis=1)
+        rew[:, ~is_adversary] = (pos_rew + adv_rew)[:, None]
+        return rew
+
+    def batched_observation(self, world):
+        is_adversary = np.array([agent.adversary for agent in world.template.agents])
+        envs = np.arange(world.num_envs)[:, None]
+        pos = world.agent_pos
+        groups = []
+        for idxs in (np.flatnonzero(is_adversary), np.flatnonzero(~is_adversary)):
+            if not len(idxs):
+                continue
+            obs = [
+                batched_relative_positions(world.landmark_pos, pos[:, idxs]),
+                batched_other_positions(pos, idxs),
+            ]
+            if not is_adversary[idxs[0]]:
+                goal_pos = world.p_pos[envs, world.goal_a[:, idxs]]
+                obs.insert(0, goal_pos - pos[:, idxs])
+            groups.append((idxs, np.concatenate(obs, axis=2)))
+        return groups
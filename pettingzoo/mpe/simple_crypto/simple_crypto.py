@@ -11,20 +11,33 @@ from gym.utils import EzPickle
 from pettingzoo.utils.conversions import parallel_wrapper_fn
 
 from .._mpe_utils.core import Agent, Landmark, World
+from .._mpe_utils.layout import constant, message
 from .._mpe_utils.scenario import BaseScenario
 from .._mpe_utils.simple_env import SimpleEnv, make_env
 
 
 class raw_env(SimpleEnv, EzPickle):
-    def __init__(self, max_cycles=25, continuous_actions=False):
+    def __init__(
+        self,
+        max_cycles=25,
+        continuous_actions=False,
+        vectorized_physics=False,
+    ):
         EzPickle.__init__(
             self,
             max_cycles,
             continuous_actions,
+            vectorized_physics,
         )
         scenario = Scenario()
         world = scenario.make_world()
-        super().__init__(scenario, world, max_cycles, continuous_actions)
+        super().__init__(
+            scenario,
+            world,
+            max_cycles,
+            continuous_actions,
+            vectorized_physics=vectorized_physics,
+        )
         self.metadata["name"] = "simple_crypto_v2"
 
 
@@ -187,3 +200,67 @@ class Scenario(BaseScenario):
             #     print(agent.state.c)
             #     print(np.concatenate(comm))
             return np.concatenate(comm)
+
+    def observation_layout(self, agent, world):
+        goal_color = np.zeros(world.dim_color)
+        if agent.goal_a is not None:
+            goal_color = agent.goal_a.color
+        comm = [
+            message(other)
+            for other in world.agents
+            if other is not agent and other.state.c is not None and other.speaker
+        ]
+        key = world.agents[2].key
+        # speaker
+        if agent.speaker:
+            return [constant(goal_color), constant(key)]
+        # listener
+        if not agent.adversary:
+            return [constant(key)] + comm
+        return comm
+
+    def batched_state(self, world):
+        # index of the landmark whose color is the key of the speaker
+        key = world.agents[2].key
+        return {
+            "key": next(i for i, lm in enumerate(world.landmarks) if lm.color is key)
+        }
+
+    def batched_reward(self, world):
+        agents = world.template.agents
+        envs = np.arange(world.num_envs)
+        colors = np.array([landmark.color for landmark in world.template.landmarks])
+        goal_color = colors[world.goal_a[:, 0] - world.num_agents]
+        # squared error of the message of each agent, when it is not empty
+        errors = np.sum(np.square(world.c - goal_color[:, None, :]), axis=2)
+        errors[~np.any(world.c != 0, axis=2)] = 0.0
+        good_rew = np.zeros(len(envs))
+        adv_rew = np.zeros(len(envs))
+        for i, agent in enumerate(agents):
+            if agent.adversary:
+                adv_rew += errors[:, i]
+            elif not agent.speaker:
+                good_rew -= errors[:, i]
+        is_adversary = np.array([agent.adversary for agent in agents])
+        rew = np.zeros((world.num_envs, world.num_agents))
+        rew[:, is_adversary] = -errors[:, is_adversary]
+        rew[:, ~is_adversary] = (adv_rew + good_rew)[:, None]
+        return rew
+
+    def batched_observation(self, world):
+        agents = world.template.agents
+        colors = np.array([landmark.color for landmark in world.template.landmarks])
+        goal_color = colors[world.goal_a[:, 0] - world.num_agents]
+        key = colors[world.state["key"]]
+        speakers = np.array([agent.speaker for agent in agents])
+        comm = world.c[:, speakers].reshape(world.num_envs, -1)
+        groups = []
+        for i, agent in enumerate(agents):
+            if agent.speaker:
+                obs = [goal_color, key]
+            elif not agent.adversary:
+                obs = [key, comm]
+            else:
+                obs = [comm]
+            groups.append(([i], np.concatenate(obs, axis=1)[:, None, :]))
+        return groups
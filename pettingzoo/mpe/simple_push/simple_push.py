@@ -4,20 +4,37 @@ from gym.utils import EzPickle
 from pettingzoo.utils.conversions import parallel_wrapper_fn
 
 from .._mpe_utils.core import Agent, Landmark, World
-from .._mpe_utils.scenario import BaseScenario
+from .._mpe_utils.layout import constant, relative_position, velocity
+from .._mpe_utils.scenario import (
+    BaseScenario,
+    batched_other_positions,
+    batched_relative_positions,
+)
 from .._mpe_utils.simple_env import SimpleEnv, make_env
 
 
 class raw_env(SimpleEnv, EzPickle):
-    def __init__(self, max_cycles=25, continuous_actions=False):
+    def __init__(
+        self,
+        max_cycles=25,
+        continuous_actions=False,
+        vectorized_physics=False,
+    ):
         EzPickle.__init__(
             self,
             max_cycles,
             continuous_actions,
+            vectorized_physics,
         )
         scenario = Scenario()
         world = scenario.make_world()
-        super().__init__(scenario, world, max_cycles, continuous_actions)
+        super().__init__(
+            scenario,
+            world,
+            max_cycles,
+            continuous_actions,
+            vectorized_physics=vectorized_physics,
+        )
         self.metadata["name"] = "simple_push_v2"
 
 
@@ -131,3 +148,70 @@ class Scenario(BaseScenario):
             )
         else:
             return np.concatenate([agent.state.p_vel] + entity_pos + other_pos)
+
+    def observation_layout(self, agent, world):
+        entity_pos = [relative_position(entity, agent) for entity in world.landmarks]
+        entity_color = [constant(entity.color) for entity in world.landmarks]
+        other_pos = [
+            relative_position(other, agent)
+            for other in world.agents
+            if other is not agent
+        ]
+        if not agent.adversary:
+            return (
+                [velocity(agent)]
+                + [relative_position(agent.goal_a, agent)]
+                + [constant(agent.color)]
+                + entity_pos
+                + entity_color
+                + other_pos
+            )
+        else:
+            return [velocity(agent)] + entity_pos + other_pos
+
+    def batched_reward(self, world):
+        is_adversary = np.array([agent.adversary for agent in world.template.agents])
+        envs = np.arange(world.num_envs)[:, None]
+        goal_pos = world.p_pos[envs, world.goal_a[:, : world.num_agents]]
+        # distance of each agent to the goal landmark, shape (num_envs, num_agents)
+        dists = np.sqrt(np.sum(np.square(world.agent_pos - goal_pos), axis=2))
+        rew = np.zeros((world.num_envs, world.num_agents))
+        rew[:, ~is_adversary] = -dists[:, ~is_adversary]
+        pos_rew = np.min(dists[:, ~is_adversary], axis=1)
+        rew[:, is_adversary] = pos_rew[:, None] - dists[:, is_adversary]
+        return rew
+
+    def batched_observation(self, world):
+        is_adversary = np.array([agent.adversary for agent in world.template.agents])
+        envs = np.arange(world.num_envs)[:, None]
+        pos = world.agent_pos
+        groups = []
+        for idxs in (np.flatnonzero(is_adversary), np.flatnonzero(~is_adversary)):
+            if not len(idxs):
+                continue
+            vel = world.agent_vel[:, idxs]
+            entity_pos = batched_relative_positions(world.landmark_pos, pos[:, idxs])
+            other_pos = batched_other_positions(pos, idxs)
+            if is_adversary[idxs[0]]:
+                obs = [vel, entity_pos, other_pos]
+            else:
+                goal = world.goal_a[:, idxs]
+                # good agents are colored after the goal landmark
+                colors = np.full(goal.shape + (3,), 0.25)
+                landmark_idxs = goal - world.num_agents
+                colors[envs, np.arange(len(idxs)), landmark_idxs + 1] += 0.5
+                entity_color = np.concatenate(
+                    [landmark.color for landmark in world.template.landmarks]
+                )
+                obs = [
+                    vel,
+                    world.p_pos[envs, goal] - pos[:, idxs],
+                    colors,
+                    entity_pos,
+                    np.broadcast_to(
+                        entity_color, (world.num_envs, len(idxs), len(entity_color))
+                    ),
+                    other_pos,
+                ]
+            groups.append((idxs, np.concatenate(obs, axis=2)))
+        return groups
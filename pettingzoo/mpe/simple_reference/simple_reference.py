@@ -4,24 +4,43 @@ from gym.utils import EzPickle
 from pettingzoo.utils.conversions import parallel_wrapper_fn
 
 from .._mpe_utils.core import Agent, Landmark, World
-from .._mpe_utils.scenario import BaseScenario
+from .._mpe_utils.layout import constant, message, relative_position, velocity
+from .._mpe_utils.scenario import (
+    BaseScenario,
+    batched_others,
+    batched_relative_positions,
+)
 from .._mpe_utils.simple_env import SimpleEnv, make_env
 
 
 class raw_env(SimpleEnv, EzPickle):
-    def __init__(self, local_ratio=0.5, max_cycles=25, continuous_actions=False):
+    def __init__(
+        self,
+        local_ratio=0.5,
+        max_cycles=25,
+        continuous_actions=False,
+        vectorized_physics=False,
+    ):
         EzPickle.__init__(
             self,
             local_ratio,
             max_cycles,
             continuous_actions,
+            vectorized_physics,
         )
         assert (
             0.0 <= local_ratio <= 1.0
         ), "local_ratio is a proportion. Must be between 0 and 1."
         scenario = Scenario()
         world = scenario.make_world()
-        super().__init__(scenario, world, max_cycles, continuous_actions, local_ratio)
+        super().__init__(
+            scenario,
+            world,
+            max_cycles,
+            continuous_actions,
+            local_ratio,
+            vectorized_physics=vectorized_physics,
+        )
         self.metadata["name"] = "simple_reference_v2"
 
 
@@ -111,3 +130,48 @@ class Scenario(BaseScenario):
                 continue
             comm.append(other.state.c)
         return np.concatenate([agent.state.p_vel] + entity_pos + [goal_color[1]] + comm)
+
+    def observation_layout(self, agent, world):
+        goal_color = np.zeros(world.dim_color)
+        if agent.goal_b is not None:
+            goal_color = agent.goal_b.color
+        return (
+            [velocity(agent)]
+            + [relative_position(entity, agent) for entity in world.landmarks]
+            + [constant(goal_color)]
+            + [message(other) for other in world.agents if other is not agent]
+        )
+
+    def batched_reward(self, world):
+        envs = np.arange(world.num_envs)[:, None]
+        goal_a = world.p_pos[envs, world.goal_a]
+        goal_b = world.p_pos[envs, world.goal_b]
+        rew = -np.sqrt(np.sum(np.square(goal_a - goal_b), axis=2))
+        rew[(world.goal_a < 0) | (world.goal_b < 0)] = -0.0
+        return rew
+
+    def batched_global_reward(self, world):
+        rew = self.batched_reward(world)
+        all_rewards = np.zeros(world.num_envs)
+        for i in range(world.num_agents):
+            all_rewards += rew[:, i]
+        return all_rewards / world.num_agents
+
+    def batched_observation(self, world):
+        agents = np.arange(world.num_agents)
+        colors = np.array([landmark.color for landmark in world.template.landmarks])
+        colors = np.concatenate([colors, np.zeros((1, world.template.dim_color))])
+        # goals that are not set get the zero color of the last row
+        goal_b = np.where(
+            world.goal_b < 0, len(colors) - 1, world.goal_b - world.num_agents
+        )
+        obs = np.concatenate(
+            [
+                world.agent_vel,
+                batched_relative_positions(world.landmark_pos, world.agent_pos),
+                colors[goal_b],
+                batched_others(world.c, agents),
+            ],
+            axis=2,
+        )
+        return [(agents, obs)]
@@ -4,20 +4,37 @@ from gym.utils import EzPickle
 from pettingzoo.utils.conversions import parallel_wrapper_fn
 
 from .._mpe_utils.core import Agent, Landmark, World
-from .._mpe_utils.scenario import BaseScenario
+from .._mpe_utils.layout import constant, message, relative_position, velocity
+from .._mpe_utils.scenario import (
+    BaseScenario,
+    batched_others,
+    batched_relative_positions,
+)
 from .._mpe_utils.simple_env import SimpleEnv, make_env
 
 
 class raw_env(SimpleEnv, EzPickle):
-    def __init__(self, max_cycles=25, continuous_actions=False):
+    def __init__(
+        self,
+        max_cycles=25,
+        continuous_actions=False,
+        vectorized_physics=False,
+    ):
         EzPickle.__init__(
             self,
             max_cycles,
             continuous_actions,
+            vectorized_physics,
         )
         scenario = Scenario()
         world = scenario.make_world()
-        super().__init__(scenario, world, max_cycles, continuous_actions)
+        super().__init__(
+            scenario,
+            world,
+            max_cycles,
+            continuous_actions,
+            vectorized_physics=vectorized_physics,
+        )
         self.metadata["name"] = "simple_speaker_listener_v3"
 
 
@@ -113,3 +130,57 @@ class Scenario(BaseScenario):
         # listener
         if agent.silent:
             return np.concatenate([agent.state.p_vel] + entity_pos + comm)
+
+    def observation_layout(self, agent, world):
+        goal_color = np.zeros(world.dim_color)
+        if agent.goal_b is not None:
+            goal_color = agent.goal_b.color
+        # speaker
+        if not agent.movable:
+            return [constant(goal_color)]
+        # listener
+        if agent.silent:
+            return (
+                [velocity(agent)]
+                + [relative_position(entity, agent) for entity in world.landmarks]
+                + [
+                    message(other)
+                    for other in world.agents
+                    if other is not agent and other.state.c is not None
+                ]
+            )
+
+    def batched_reward(self, world):
+        envs = np.arange(world.num_envs)
+        goal_a = world.p_pos[envs, world.goal_a[:, 0]]
+        goal_b = world.p_pos[envs, world.goal_b[:, 0]]
+        dist2 = np.sum(np.square(goal_a - goal_b), axis=1)
+        return np.repeat(-dist2[:, None], world.num_agents, axis=1)
+
+    def batched_observation(self, world):
+        colors = np.array([landmark.color for landmark in world.template.landmarks])
+        colors = np.concatenate([colors, np.zeros((1, world.template.dim_color))])
+        # goals that are not set get the zero color of the last row
+        goal_b = np.where(
+            world.goal_b < 0, len(colors) - 1, world.goal_b - world.num_agents
+        )
+        agents = np.arange(world.num_agents)
+        groups = []
+        for i, agent in enumerate(world.template.agents):
+            # speaker
+            if not agent.movable:
+                obs = colors[goal_b[:, i]][:, None, :]
+            # listener
+            elif agent.silent:
+                obs = np.concatenate(
+                    [
+                        world.agent_vel[:, [i]],
+                        batched_relative_positions(
+                            world.landmark_pos, world.agent_pos[:, [i]]
+                        ),
+                        batched_others(world.c, [i]),
+                    ],
+                    axis=2,
+                )
+            groups.append((agents[[i]], obs))
+        return groups
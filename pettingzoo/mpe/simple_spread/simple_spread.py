@@ -4,25 +4,48 @@ from gym.utils import EzPickle
 from pettingzoo.utils.conversions import parallel_wrapper_fn
 
 from .._mpe_utils.core import Agent, Landmark, World
-from .._mpe_utils.scenario import BaseScenario
+from .._mpe_utils.layout import message, position, relative_position, velocity
+from .._mpe_utils.scenario import (
+    BaseScenario,
+    batched_collisions,
+    batched_distances,
+    batched_other_positions,
+    batched_others,
+    batched_relative_positions,
+)
 from .._mpe_utils.simple_env import SimpleEnv, make_env
 
 
 class raw_env(SimpleEnv, EzPickle):
-    def __init__(self, N=3, local_ratio=0.5, max_cycles=25, continuous_actions=False):
+    def __init__(
+        self,
+        N=3,
+        local_ratio=0.5,
+        max_cycles=25,
+        continuous_actions=False,
+        vectorized_physics=False,
+    ):
         EzPickle.__init__(
             self,
             N,
             local_ratio,
             max_cycles,
             continuous_actions,
+            vectorized_physics,
         )
         assert (
             0.0 <= local_ratio <= 1.0
         ), "local_ratio is a proportion. Must be between 0 and 1."
         scenario = Scenario()
         world = scenario.make_world(N)
-        super().__init__(scenario, world, max_cycles, continuous_actions, local_ratio)
+        super().__init__(
+            scenario,
+            world,
+            max_cycles,
+            continuous_actions,
+            local_ratio,
+            vectorized_physics=vectorized_physics,
+        )
         self.metadata["name"] = "simple_spread_v2"
 
 
@@ -74,18 +97,16 @@ class Scenario(BaseScenario):
         collisions = 0
         occupied_landmarks = 0
         min_dists = 0
-        for lm in world.landmarks:
-            dists = [
-                np.sqrt(np.sum(np.square(a.state.p_pos - lm.state.p_pos)))
-                for a in world.agents
-            ]
+        landmarks = [world.entity_index(lm) for lm in world.landmarks]
+        distances = world.distances(np.array(landmarks, dtype=np.intp))
+        for dists in distances[:, : len(world.agents)]:
             min_dists += min(dists)
             rew -= min(dists)
             if min(dists) < 0.1:
                 occupied_landmarks += 1
         if agent.collide:
             for a in world.agents:
-                if self.is_collision(a, agent):
+                if world.is_collision(a, agent):
                     rew -= 1
                     collisions += 1
         return (rew, collisions, min_dists, occupied_landmarks)
@@ -101,25 +122,24 @@ class Scenario(BaseScenario):
         rew = 0
         if agent.collide:
             for a in world.agents:
-                if self.is_collision(a, agent):
+                if world.is_collision(a, agent):
                     rew -= 1
         return rew
 
     def global_reward(self, world):
         rew = 0
-        for lm in world.landmarks:
-            dists = [
-                np.sqrt(np.sum(np.square(a.state.p_pos - lm.state.p_pos)))
-                for a in world.agents
-            ]
+        landmarks = [world.entity_index(lm) for lm in world.landmarks]
+        distances = world.distances(np.array(landmarks, dtype=np.intp))
+        for dists in distances[:, : len(world.agents)]:
             rew -= min(dists)
         return rew
 
     def observation(self, agent, world):
         # get positions of all entities in this agent's reference frame
+        relative_pos = world.relative_positions(world.entity_index(agent))
         entity_pos = []
         for entity in world.landmarks:  # world.entities:
-            entity_pos.append(entity.state.p_pos - agent.state.p_pos)
+            entity_pos.append(relative_pos[world.entity_index(entity)])
         # entity colors
         entity_color = []
         for entity in world.landmarks:  # world.entities:
@@ -131,7 +151,46 @@ class Scenario(BaseScenario):
             if other is agent:
                 continue
             comm.append(other.state.c)
-            other_pos.append(other.state.p_pos - agent.state.p_pos)
+            other_pos.append(relative_pos[world.entity_index(other)])
         return np.concatenate(
             [agent.state.p_vel] + [agent.state.p_pos] + entity_pos + other_pos + comm
         )
+
+    def observation_layout(self, agent, world):
+        others = [other for other in world.agents if other is not agent]
+        return (
+            [velocity(agent), position(agent)]
+            + [relative_position(entity, agent) for entity in world.landmarks]
+            + [relative_position(other, agent) for other in others]
+            + [message(other) for other in others]
+        )
+
+    def batched_reward(self, world):
+        agents = np.arange(world.num_agents)
+        collisions = batched_collisions(world, agents, agents)
+        rew = -np.sum(collisions, axis=1).astype(float)
+        rew[:, ~world.collide[agents]] = 0.0
+        return rew
+
+    def batched_global_reward(self, world):
+        dists = batched_distances(world.agent_pos, world.landmark_pos)
+        min_dists = np.min(dists, axis=1)
+        rew = np.zeros(world.num_envs)
+        for i in range(min_dists.shape[1]):
+            rew -= min_dists[:, i]
+        return rew
+
+    def batched_observation(self, world):
+        agents = np.arange(world.num_agents)
+        pos = world.agent_pos
+        obs = np.concatenate(
+            [
+                world.agent_vel,
+                pos,
+                batched_relative_positions(world.landmark_pos, pos),
+                batched_other_positions(pos, agents),
+                batched_others(world.c, agents),
+            ],
+            axis=2,
+        )
+        return [(agents, obs)]
@@ -0,0 +1,210 @@
+import numpy as np
+from gym.utils import EzPickle
+
+from pettingzoo.utils.conversions import parallel_wrapper_fn
+
+from .._mpe_utils.core import Agent, Landmark, World, neighbor_pairs
+from .._mpe_utils.scenario import BaseScenario, agent_indices, batched_bound
+from .._mpe_utils.simple_env import SimpleEnv, make_env
+
+
+class raw_env(SimpleEnv, EzPickle):
+    def __init__(
+        self,
+        num_good=40,
+        num_adversaries=10,
+        num_landmarks=10,
+        num_neighbors=8,
+        num_landmark_neighbors=4,
+        obs_radius=0.5,
+        max_cycles=25,
+        continuous_actions=False,
+        vectorized_physics=True,
+    ):
+        EzPickle.__init__(
+            self,
+            num_good,
+            num_adversaries,
+            num_landmarks,
+            num_neighbors,
+            num_landmark_neighbors,
+            obs_radius,
+            max_cycles,
+            continuous_actions,
+            vectorized_physics,
+        )
+        assert obs_radius > 0, "obs_radius must be positive."
+        scenario = Scenario(num_neighbors, num_landmark_neighbors, obs_radius)
+        world = scenario.make_world(num_good, num_adversaries, num_landmarks)
+        super().__init__(
+            scenario,
+            world,
+            max_cycles,
+            continuous_actions,
+            vectorized_physics=vectorized_physics,
+            agent_tables=True,
+        )
+        self.metadata["name"] = "simple_swarm_v0"
+
+
+env = make_env(raw_env)
+parallel_env = parallel_wrapper_fn(env)
+
+
+def neighbor_ranks(i):
+    # rank of each pair among the pairs of the same i, for pairs sorted by i
+    return np.arange(len(i)) - np.searchsorted(i, i, "left")
+
+
+class Scenario(BaseScenario):
+    """
+    Tag with thousands of agents: good agents cover landmarks while avoiding
+    adversaries, in an arena that grows with the number of agents so that
+    its density stays constant. Agents only see the entities within
+    obs_radius, at most the num_neighbors nearest agents and the
+    num_landmark_neighbors nearest landmarks, so that the size of the
+    observations does not depend on the number of agents. The neighbors are
+    found with the grid of the broadphase, and the observations and rewards
+    of all agents are computed together once per step.
+    """
+
+    def __init__(self, num_neighbors=8, num_landmark_neighbors=4, obs_radius=0.5):
+        self.num_neighbors = num_neighbors
+        self.num_landmark_neighbors = num_landmark_neighbors
+        self.obs_radius = obs_radius
+
+    def make_world(self, num_good=40, num_adversaries=10, num_landmarks=10):
+        world = World()
+        # set any world properties first
+        world.dim_c = 2
+        num_agents = num_adversaries + num_good
+        # half width of the arena, one agent per 0.25 x 0.25 square
+        world.arena_size = 0.125 * np.sqrt(num_agents)
+        # add agents
+        world.agents = [Agent() for i in range(num_agents)]
+        for i, agent in enumerate(world.agents):
+            agent.adversary = True if i < num_adversaries else False
+            base_name = "adversary" if agent.adversary else "agent"
+            base_index = i if i < num_adversaries else i - num_adversaries
+            agent.name = f"{base_name}_{base_index}"
+            agent.collide = True
+            agent.silent = True
+            agent.size = 0.075 if agent.adversary else 0.05
+            agent.accel = 3.0 if agent.adversary else 4.0
+            agent.max_speed = 1.0 if agent.adversary else 1.3
+        # add landmarks
+        world.landmarks = [Landmark() for i in range(num_landmarks)]
+        for i, landmark in enumerate(world.landmarks):
+            landmark.name = "landmark %d" % i
+            landmark.collide = False
+            landmark.movable = False
+            landmark.size = 0.05
+        return world
+
+    def reset_world(self, world, np_random):
+        arena_size = world.arena_size
+        for agent in world.agents:
+            agent.color = (
+                np.array([0.35, 0.85, 0.35])
+                if not agent.adversary
+                else np.array([0.85, 0.35, 0.35])
+            )
+            agent.state.p_pos = np_random.uniform(-arena_size, +arena_size, world.dim_p)
+            agent.state.p_vel = np.zeros(world.dim_p)
+            agent.state.c = np.zeros(world.dim_c)
+        for landmark in world.landmarks:
+            landmark.color = np.array([0.25, 0.25, 0.25])
+            landmark.state.p_pos = np_random.uniform(
+                -0.9 * arena_size, +0.9 * arena_size, world.dim_p
+            )
+            landmark.state.p_vel = np.zeros(world.dim_p)
+
+    def benchmark_data(self, agent, world):
+        # number of collisions of an adversary with good agents
+        if agent.adversary:
+            return int(self._swarm(world)["catches"][world.entity_index(agent)])
+        return 0
+
+    def reward(self, agent, world):
+        return self._swarm(world)["rewards"][world.entity_index(agent)]
+
+    def observation(self, agent, world):
+        return self._swarm(world)["observations"][world.entity_index(agent)]
+
+    def observation_batch(self, agents, world):
+        return self._swarm(world)["observations"][agent_indices(agents, world)]
+
+    def _swarm(self, world):
+        return world.cached("swarm", lambda: self._compute(world))
+
+    def _compute(self, world):
+        # observations and rewards of all agents in the current state
+        n = len(world.agents)
+        p_pos = world.positions()
+        p_vel = np.array([agent.state.p_vel for agent in world.agents], dtype=float)
+        sizes = np.array([agent.size for agent in world.agents])
+        team = np.array([-1.0 if agent.adversary else 1.0 for agent in world.agents])
+        # the query also covers every pair of colliding agents
+        radius = max(self.obs_radius, 2 * sizes.max(initial=0.0))
+        i, j, dist = neighbor_pairs(p_pos, radius)
+        from_agent = i < n
+        i, j, dist = i[from_agent], j[from_agent], dist[from_agent]
+
+        k = self.num_neighbors
+        k_landmarks = self.num_landmark_neighbors
+        obs_dim = (
+            2 * world.dim_p + k_landmarks * world.dim_p + k * (2 * world.dim_p + 1)
+        )
+        observations = np.zeros((n, obs_dim))
+        observations[:, : world.dim_p] = p_vel
+        observations[:, world.dim_p : 2 * world.dim_p] = p_pos[:n]
+        offset = 2 * world.dim_p
+
+        # nearest landmarks within the radius
+        is_landmark = (j >= n) & (dist < self.obs_radius)
+        li, lj, ldist = i[is_landmark], j[is_landmark], dist[is_landmark]
+        rank = neighbor_ranks(li)
+        seen = rank < k_landmarks
+        columns = offset + world.dim_p * rank[seen, None] + np.arange(world.dim_p)
+        observations[li[seen, None], columns] = p_pos[lj[seen]] - p_pos[li[seen]]
+        offset += k_landmarks * world.dim_p
+
+        # nearest agents within the radius: relative position, velocity and
+        # whether they are on the same team (1) or not (-1)
+        is_agent = (j < n) & (dist < self.obs_radius)
+        ai, aj = i[is_agent], j[is_agent]
+        rank = neighbor_ranks(ai)
+        seen = rank < k
+        ai, aj, rank = ai[seen], aj[seen], rank[seen]
+        values = np.concatenate(
+            [
+                p_pos[aj] - p_pos[ai],
+                p_vel[aj],
+                (team[aj] * team[ai])[:, None],
+            ],
+            axis=1,
+        )
+        columns = offset + values.shape[1] * rank[:, None] + np.arange(values.shape[1])
+        observations[ai[:, None], columns] = values
+
+        # collisions between agents
+        between_agents = j < n
+        ci, cj = i[between_agents], j[between_agents]
+        touching = dist[between_agents] < sizes[ci] + sizes[cj]
+        ci, cj = ci[touching], cj[touching]
+        is_adversary = team < 0
+        caught = np.bincount(ci[is_adversary[cj] & ~is_adversary[ci]], minlength=n)
+        catches = np.bincount(ci[is_adversary[ci] & ~is_adversary[cj]], minlength=n)
+        bumps = np.bincount(ci[~is_adversary[ci] & ~is_adversary[cj]], minlength=n)
+
+        # good agents stay close to a landmark, within the radius, and inside
+        # the arena
+        nearest = np.full(n, self.obs_radius)
+        if len(li):
+            first = np.r_[True, li[1:] != li[:-1]]
+            nearest[li[first]] = ldist[first]
+        rewards = -10.0 * caught - bumps - 0.1 * nearest
+        for p in range(world.dim_p):
+            rewards -= batched_bound(np.abs(p_pos[:n, p]) / world.arena_size)
+        rewards = np.where(is_adversary, 10.0 * catches, rewards)
+        return {"observations": observations, "rewards": rewards, "catches": catches}
@@ -0,0 +1 @@
+from .simple_swarm.simple_swarm import env, parallel_env, raw_env  # noqa: F401
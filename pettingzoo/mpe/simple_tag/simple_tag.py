@@ -4,7 +4,15 @@ from gym.utils import EzPickle
 from pettingzoo.utils.conversions import parallel_wrapper_fn
 
 from .._mpe_utils.core import Agent, Landmark, World
-from .._mpe_utils.scenario import BaseScenario
+from .._mpe_utils.layout import position, relative_position, velocity
+from .._mpe_utils.scenario import (
+    BaseScenario,
+    batched_bound,
+    batched_collisions,
+    batched_other_positions,
+    batched_relative_positions,
+    other_indices,
+)
 from .._mpe_utils.simple_env import SimpleEnv, make_env
 
 
@@ -16,6 +24,7 @@ class raw_env(SimpleEnv, EzPickle):
         num_obstacles=2,
         max_cycles=25,
         continuous_actions=False,
+        vectorized_physics=False,
     ):
         EzPickle.__init__(
             self,
@@ -24,10 +33,17 @@ class raw_env(SimpleEnv, EzPickle):
             num_obstacles,
             max_cycles,
             continuous_actions,
+            vectorized_physics,
         )
         scenario = Scenario()
         world = scenario.make_world(num_good, num_adversaries, num_obstacles)
-        super().__init__(scenario, world, max_cycles, continuous_actions)
+        super().__init__(
+            scenario,
+            world,
+            max_cycles,
+            continuous_actions,
+            vectorized_physics=vectorized_physics,
+        )
         self.metadata["name"] = "simple_tag_v2"
 
 
@@ -92,7 +108,7 @@ class Scenario(BaseScenario):
         if agent.adversary:
             collisions = 0
             for a in self.good_agents(world):
-                if self.is_collision(a, agent):
+                if world.is_collision(a, agent):
                     collisions += 1
             return collisions
         else:
@@ -135,7 +151,7 @@ class Scenario(BaseScenario):
                 )
         if agent.collide:
             for a in adversaries:
-                if self.is_collision(a, agent):
+                if world.is_collision(a, agent):
                     rew -= 10
 
         # agents are penalized for exiting the screen, so that they can be caught by the adversaries
@@ -167,18 +183,24 @@ class Scenario(BaseScenario):
                     for a in agents
                 )
         if agent.collide:
-            for ag in agents:
-                for adv in adversaries:
-                    if self.is_collision(ag, adv):
-                        rew += 10
+            # count the overlapping agent-adversary pairs from the cached
+            # collisions of the world instead of testing every pair
+            agents = set(agents)
+            adversaries = set(adversaries)
+            for entity_a, entity_b in world.collision_pairs():
+                if (entity_a in agents and entity_b in adversaries) or (
+                    entity_a in adversaries and entity_b in agents
+                ):
+                    rew += 10
         return rew
 
     def observation(self, agent, world):
         # get positions of all entities in this agent's reference frame
+        relative_pos = world.relative_positions(world.entity_index(agent))
         entity_pos = []
         for entity in world.landmarks:
             if not entity.boundary:
-                entity_pos.append(entity.state.p_pos - agent.state.p_pos)
+                entity_pos.append(relative_pos[world.entity_index(entity)])
         # communication of all other agents
         comm = []
         other_pos = []
@@ -187,7 +209,7 @@ class Scenario(BaseScenario):
             if other is agent:
                 continue
             comm.append(other.state.c)
-            other_pos.append(other.state.p_pos - agent.state.p_pos)
+            other_pos.append(relative_pos[world.entity_index(other)])
             if not other.adversary:
                 other_vel.append(other.state.p_vel)
         return np.concatenate(
@@ -197,3 +219,59 @@ class Scenario(BaseScenario):
             + other_pos
             + other_vel
         )
+
+    def observation_layout(self, agent, world):
+        others = [other for other in world.agents if other is not agent]
+        return (
+            [velocity(agent), position(agent)]
+            + [
+                relative_position(entity, agent)
+                for entity in world.landmarks
+                if not entity.boundary
+            ]
+            + [relative_position(other, agent) for other in others]
+            + [velocity(other) for other in others if not other.adversary]
+        )
+
+    def batched_reward(self, world):
+        is_adversary = np.array([agent.adversary for agent in world.template.agents])
+        adversaries = np.flatnonzero(is_adversary)
+        good_agents = np.flatnonzero(~is_adversary)
+        collisions = batched_collisions(world, adversaries, good_agents)
+        collide = world.collide[: world.num_agents]
+        rew = np.zeros((world.num_envs, world.num_agents))
+        rew[:, adversaries] = (
+            10.0 * np.sum(collisions, axis=(1, 2))[:, None] * collide[adversaries]
+        )
+        good_rew = -10.0 * np.sum(collisions, axis=1) * collide[good_agents]
+        for p in range(world.dim_p):
+            good_rew -= batched_bound(np.abs(world.p_pos[:, good_agents, p]))
+        rew[:, good_agents] = good_rew
+        return rew
+
+    def batched_observation(self, world):
+        is_adversary = np.array([agent.adversary for agent in world.template.agents])
+        landmarks = [
+            world.num_agents + i
+            for i, entity in enumerate(world.template.landmarks)
+            if not entity.boundary
+        ]
+        pos = world.agent_pos
+        groups = []
+        for idxs in (np.flatnonzero(is_adversary), np.flatnonzero(~is_adversary)):
+            if not len(idxs):
+                continue
+            others = other_indices(idxs, world.num_agents)
+            other_vel = world.agent_vel[:, others][:, ~is_adversary[others]]
+            obs = np.concatenate(
+                [
+                    world.agent_vel[:, idxs],
+                    pos[:, idxs],
+                    batched_relative_positions(world.p_pos[:, landmarks], pos[:, idxs]),
+                    batched_other_positions(pos, idxs),
+                    other_vel.reshape(world.num_envs, len(idxs), -1),
+                ],
+                axis=2,
+            )
+            groups.append((idxs, obs))
+        return groups
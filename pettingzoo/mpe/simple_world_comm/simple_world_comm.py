@@ -4,7 +4,14 @@ from gym.utils import EzPickle
 from pettingzoo.utils.conversions import parallel_wrapper_fn
 
 from .._mpe_utils.core import Agent, Landmark, World
-from .._mpe_utils.scenario import BaseScenario
+from .._mpe_utils.scenario import (
+    BaseScenario,
+    batched_bound,
+    batched_collisions,
+    batched_distances,
+    batched_relative_positions,
+    other_indices,
+)
 from .._mpe_utils.simple_env import SimpleEnv, make_env
 
 
@@ -18,6 +25,7 @@ class raw_env(SimpleEnv, EzPickle):
         max_cycles=25,
         num_forests=2,
         continuous_actions=False,
+        vectorized_physics=False,
     ):
         EzPickle.__init__(
             self,
@@ -27,12 +35,19 @@ class raw_env(SimpleEnv, EzPickle):
             max_cycles,
             num_forests,
             continuous_actions,
+            vectorized_physics,
         )
         scenario = Scenario()
         world = scenario.make_world(
             num_good, num_adversaries, num_obstacles, num_food, num_forests
         )
-        super().__init__(scenario, world, max_cycles, continuous_actions)
+        super().__init__(
+            scenario,
+            world,
+            max_cycles,
+            continuous_actions,
+            vectorized_physics=vectorized_physics,
+        )
         self.metadata["name"] = "simple_world_comm_v2"
 
 
@@ -168,7 +183,7 @@ class Scenario(BaseScenario):
         if agent.adversary:
             collisions = 0
             for a in self.good_agents(world):
-                if self.is_collision(a, agent):
+                if world.is_collision(a, agent):
                     collisions += 1
             return collisions
         else:
@@ -221,7 +236,7 @@ class Scenario(BaseScenario):
                 )
         if agent.collide:
             for a in adversaries:
-                if self.is_collision(a, agent):
+                if world.is_collision(a, agent):
                     rew -= 5
 
         def bound(x):
@@ -236,7 +251,7 @@ class Scenario(BaseScenario):
             rew -= 2 * bound(x)
 
         for food in world.food:
-            if self.is_collision(agent, food):
+            if world.is_collision(agent, food):
                 rew += 2
         rew -= 0.05 * min(
             np.sqrt(np.sum(np.square(food.state.p_pos - agent.state.p_pos)))
@@ -257,10 +272,15 @@ class Scenario(BaseScenario):
                 for a in agents
             )
         if agent.collide:
-            for ag in agents:
-                for adv in adversaries:
-                    if self.is_collision(ag, adv):
-                        rew += 5
+            # count the overlapping agent-adversary pairs from the cached
+            # collisions of the world instead of testing every pair
+            agents = set(agents)
+            adversaries = set(adversaries)
+            for entity_a, entity_b in world.collision_pairs():
+                if (entity_a in agents and entity_b in adversaries) or (
+                    entity_a in adversaries and entity_b in agents
+                ):
+                    rew += 5
         return rew
 
     def observation2(self, agent, world):
@@ -304,7 +324,7 @@ class Scenario(BaseScenario):
         inf = [False for _ in range(len(world.forests))]
 
         for i in range(len(world.forests)):
-            if self.is_collision(agent, world.forests[i]):
+            if world.is_collision(agent, world.forests[i]):
                 in_forest[i] = np.array([1])
                 inf[i] = True
 
@@ -322,7 +342,7 @@ class Scenario(BaseScenario):
             comm.append(other.state.c)
 
             oth_f = [
-                self.is_collision(other, world.forests[i])
+                world.is_collision(other, world.forests[i])
                 for i in range(len(world.forests))
             ]
 
@@ -347,14 +367,14 @@ class Scenario(BaseScenario):
         prey_forest = []
         ga = self.good_agents(world)
         for a in ga:
-            if any([self.is_collision(a, f) for f in world.forests]):
+            if any([world.is_collision(a, f) for f in world.forests]):
                 prey_forest.append(np.array([1]))
             else:
                 prey_forest.append(np.array([-1]))
         # to tell leader when pred are in forest
         prey_forest_lead = []
         for f in world.forests:
-            if any([self.is_collision(a, f) for a in ga]):
+            if any([world.is_collision(a, f) for a in ga]):
                 prey_forest_lead.append(np.array([1]))
             else:
                 prey_forest_lead.append(np.array([-1]))
@@ -390,3 +410,93 @@ class Scenario(BaseScenario):
                 + in_forest
                 + other_vel
             )
+
+    def _batched_indices(self, world, entities):
+        index = {id(entity): i for i, entity in enumerate(world.template.entities)}
+        return np.array([index[id(entity)] for entity in entities], dtype=np.int64)
+
+    def batched_reward(self, world):
+        agents = world.template.agents
+        is_adversary = np.array([agent.adversary for agent in agents])
+        adversaries = np.flatnonzero(is_adversary)
+        good_agents = np.flatnonzero(~is_adversary)
+        collide = world.collide[: world.num_agents]
+        food = self._batched_indices(world, world.template.food)
+        collisions = batched_collisions(world, adversaries, good_agents)
+        rew = np.zeros((world.num_envs, world.num_agents))
+
+        good_rew = -5.0 * np.sum(collisions, axis=1) * collide[good_agents]
+        for p in range(world.dim_p):
+            good_rew -= 2 * batched_bound(np.abs(world.p_pos[:, good_agents, p]))
+        food_collisions = batched_collisions(world, good_agents, food)
+        for f in range(len(food)):
+            good_rew += 2 * food_collisions[:, :, f]
+        food_dists = batched_distances(
+            world.p_pos[:, food], world.p_pos[:, good_agents]
+        )
+        good_rew -= 0.05 * np.min(food_dists, axis=1)
+        rew[:, good_agents] = good_rew
+
+        dists = batched_distances(
+            world.p_pos[:, good_agents], world.p_pos[:, adversaries]
+        )
+        adv_rew = -(0.1 * np.min(dists, axis=1))
+        # one reward per colliding pair, added one at a time like adversary_reward
+        for g in range(len(good_agents)):
+            for a in range(len(adversaries)):
+                adv_rew += np.where(
+                    collisions[:, a, g, None] & collide[adversaries], 5.0, 0.0
+                )
+        rew[:, adversaries] = adv_rew
+        return rew
+
+    def batched_observation(self, world):
+        agents = world.template.agents
+        is_adversary = np.array([agent.adversary for agent in agents])
+        is_leader = np.array([agent.leader for agent in agents])
+        landmarks = self._batched_indices(
+            world,
+            [entity for entity in world.template.landmarks if not entity.boundary],
+        )
+        forests = self._batched_indices(world, world.template.forests)
+        all_agents = np.arange(world.num_agents)
+        in_forests = batched_collisions(world, all_agents, forests)
+        pos = world.agent_pos
+        vel = world.agent_vel
+        comm = world.c[:, :1]
+        groups = []
+        for idxs in (np.flatnonzero(is_adversary), np.flatnonzero(~is_adversary)):
+            if not len(idxs):
+                continue
+            n = len(idxs)
+            others = other_indices(idxs, world.num_agents)
+            inf = in_forests[:, idxs]
+            oth_f = in_forests[:, others]
+            # other agents are seen when they are in the same forest, when
+            # neither is in a forest, or by the leader
+            visible = (
+                np.any(inf[:, :, None, :] & oth_f, axis=3)
+                | (~np.any(inf, axis=2)[:, :, None] & ~np.any(oth_f, axis=3))
+                | is_leader[idxs][None, :, None]
+            )
+            other_pos = np.where(
+                visible[..., None], pos[:, others] - pos[:, idxs, None, :], 0.0
+            )
+            good_others = ~is_adversary[others]
+            other_vel = np.where(visible[..., None], vel[:, others], 0.0)[
+                :, good_others
+            ]
+            obs = [
+                vel[:, idxs],
+                pos[:, idxs],
+                batched_relative_positions(world.p_pos[:, landmarks], pos[:, idxs]),
+                other_pos.reshape(world.num_envs, n, -1),
+            ]
+            in_forest = np.where(inf, 1.0, -1.0)
+            other_vel = other_vel.reshape(world.num_envs, n, -1)
+            if is_adversary[idxs[0]]:
+                obs += [other_vel, in_forest, np.repeat(comm, n, axis=1)]
+            else:
+                obs += [in_forest, other_vel]
+            groups.append((idxs, np.concatenate(obs, axis=2)))
+        return groups
@@ -75,6 +75,12 @@ class raw_env(AECEnv, EzPickle):
     def observe(self, agent):
         return self.env.observe(self.agent_name_mapping[agent])
 
+    def observe_batch(self, agents):
+        return np.array(
+            [self.env.last_obs[self.agent_name_mapping[agent]] for agent in agents],
+            dtype=np.float32,
+        )
+
     def step(self, action):
         if self.dones[self.agent_selection]:
             return self._was_done_step(action)
@@ -94,6 +94,12 @@ class raw_env(AECEnv, EzPickle):
         o = self.env.safely_observe(self.agent_name_mapping[agent])
         return np.swapaxes(o, 2, 0)
 
+    def observe_batch(self, agents):
+        o = self.env.safely_observe_batch(
+            [self.agent_name_mapping[agent] for agent in agents]
+        )
+        return np.swapaxes(o, 3, 1)
+
     def observation_space(self, agent: str):
         return self.observation_spaces[agent]
 
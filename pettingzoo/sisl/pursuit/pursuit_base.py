@@ -470,6 +470,26 @@ class Pursuit:
         obs = self.collect_obs(agent_layer, i)
         return obs
 
+    def safely_observe_batch(self, idxs):
+        return self.collect_obs_batch(self.pursuer_layer, idxs)
+
+    def collect_obs_batch(self, agent_layer, idxs):
+        # pad the map once so every observation window is a plain slice,
+        # outside of the map the wall channel is set like in collect_obs_by_idx
+        off = self.obs_offset
+        padded = np.zeros(
+            (3, self.x_size + 2 * off, self.y_size + 2 * off), dtype=np.float32
+        )
+        padded[0].fill(1.0)
+        padded[0:3, off : off + self.x_size, off : off + self.y_size] = np.abs(
+            self.model_state[0:3]
+        )
+        obs = np.empty((len(idxs), 3, self.obs_range, self.obs_range), dtype=np.float32)
+        for k, agent_idx in enumerate(idxs):
+            xp, yp = agent_layer.get_position(agent_idx)
+            obs[k] = padded[:, xp : xp + self.obs_range, yp : yp + self.obs_range]
+        return obs
+
     def collect_obs(self, agent_layer, i):
         for j in range(self.n_agents()):
             if i == j:
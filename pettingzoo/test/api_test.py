@@ -2,6 +2,7 @@ import random
 import re
 import warnings
 from collections import defaultdict
+from collections.abc import MutableMapping
 
 import gym
 import numpy as np
@@ -393,8 +394,8 @@ def api_test(env, num_cycles=1000, verbose_progress=False):
 
     progress_report("Finished play test")
 
-    assert isinstance(env.rewards, dict), "rewards must be a dict"
-    assert isinstance(env.dones, dict), "dones must be a dict"
+    assert isinstance(env.rewards, MutableMapping), "rewards must be a dict"
+    assert isinstance(env.dones, MutableMapping), "dones must be a dict"
     assert isinstance(env.infos, dict), "infos must be a dict"
 
     assert (
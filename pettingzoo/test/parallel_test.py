@@ -1,5 +1,6 @@
 import random
 import warnings
+from collections.abc import Mapping
 
 import numpy as np
 
@@ -40,7 +41,7 @@ def parallel_api_test(par_env, num_cycles=1000):
     MAX_RESETS = 2
     for _ in range(MAX_RESETS):
         obs = par_env.reset()
-        assert isinstance(obs, dict)
+        assert isinstance(obs, Mapping)
         assert set(obs.keys()) == (set(par_env.agents))
         done = {agent: False for agent in par_env.agents}
         live_agents = set(par_env.agents[:])
@@ -58,7 +59,7 @@ def parallel_api_test(par_env, num_cycles=1000):
                 if agent not in live_agents:
                     live_agents.add(agent)
 
-            assert isinstance(obs, dict)
+            assert isinstance(obs, Mapping)
             assert isinstance(rew, dict)
             assert isinstance(done, dict)
             assert isinstance(info, dict)
@@ -1,43 +1,421 @@
+import argparse
+import importlib
+import json
+import platform
 import random
+import sys
 import time
 
 import numpy as np
 
+import pettingzoo
 
-def performance_benchmark(env):
-    print("Starting performance benchmark")
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_kb():
+    """
+    Peak resident set size of the current process in kilobytes, or None if it
+    cannot be measured on this platform.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+class _Timer:
+    """
+    Accumulates the time spent in a callable, used to time the methods of the
+    unwrapped environment so that the time spent in wrappers can be separated
+    from the time spent in the environment itself.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.total = 0.0
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.fn(*args, **kwargs)
+        finally:
+            self.total += time.perf_counter() - start
+
+
+def _instrument(env):
+    # instance attributes shadow the methods, so wrappers calling
+    # self.env.step() go through the timers
+    raw_env = env.unwrapped
+    timers = {}
+    for name in ("step", "observe"):
+        if hasattr(raw_env, name):
+            timers[name] = _Timer(getattr(raw_env, name))
+            setattr(raw_env, name, timers[name])
+    return raw_env, timers
+
+
+def _uninstrument(raw_env, timers):
+    for name in timers:
+        delattr(raw_env, name)
+
+
+def _sample_action(env, agent, obs, rng):
+    if isinstance(obs, dict) and "action_mask" in obs:
+        return rng.choice(np.flatnonzero(obs["action_mask"]))
+    return env.action_space(agent).sample()
+
+
+def _aec_trial(env, duration, rng):
+    steps = 0
     cycles = 0
-    turn = 0
+    step_time = 0.0
+    last_time = 0.0
     env.reset()
-    start = time.time()
-    end = 0
-
-    while True:
-        cycles += 1
-        for agent in env.agent_iter(
-            env.num_agents
-        ):  # step through every agent once with observe=True
-            obs, reward, done, info = env.last()
-            if done:
-                action = None
-            elif isinstance(obs, dict) and "action_mask" in obs:
-                action = random.choice(np.flatnonzero(obs["action_mask"]))
-            else:
-                action = env.action_space(agent).sample()
-            env.step(action)
-            turn += 1
-
-            if all(env.dones.values()):
-                env.reset()
-
-        if time.time() - start > 5:
-            end = time.time()
-            break
-
-    length = end - start
-
-    turns_per_time = turn / length
-    cycles_per_time = cycles / length
-    print(str(turns_per_time) + " turns per second")
-    print(str(cycles_per_time) + " cycles per second")
+    raw_env, timers = _instrument(env)
+    start = time.perf_counter()
+    try:
+        while time.perf_counter() - start < duration:
+            cycles += 1
+            for agent in env.agent_iter(env.num_agents):
+                t0 = time.perf_counter()
+                obs, reward, done, info = env.last()
+                t1 = time.perf_counter()
+                action = None if done else _sample_action(env, agent, obs, rng)
+                t2 = time.perf_counter()
+                env.step(action)
+                t3 = time.perf_counter()
+                last_time += t1 - t0
+                step_time += t3 - t2
+                steps += 1
+
+                if all(env.dones.values()):
+                    env.reset()
+        length = time.perf_counter() - start
+    finally:
+        _uninstrument(raw_env, timers)
+
+    raw_step = timers["step"].total if "step" in timers else step_time
+    raw_observe = timers["observe"].total if "observe" in timers else 0.0
+    return {
+        "steps_per_sec": steps / length,
+        "cycles_per_sec": cycles / length,
+        "time": {
+            "step": raw_step,
+            "observe": raw_observe,
+            "last": last_time - raw_observe,
+            "wrappers": step_time - raw_step,
+            "other": length - step_time - last_time,
+            "total": length,
+        },
+    }
+
+
+def _parallel_trial(env, duration, rng):
+    steps = 0
+    cycles = 0
+    step_time = 0.0
+    obs = env.reset()
+    raw_env, timers = _instrument(env)
+    start = time.perf_counter()
+    try:
+        while time.perf_counter() - start < duration:
+            actions = {
+                agent: _sample_action(env, agent, obs[agent], rng)
+                for agent in env.agents
+            }
+            t0 = time.perf_counter()
+            obs, rewards, dones, infos = env.step(actions)
+            step_time += time.perf_counter() - t0
+            steps += len(actions)
+            cycles += 1
+
+            if not env.agents:
+                obs = env.reset()
+        length = time.perf_counter() - start
+    finally:
+        _uninstrument(raw_env, timers)
+
+    raw_step = timers["step"].total if "step" in timers else step_time
+    raw_observe = timers["observe"].total if "observe" in timers else 0.0
+    return {
+        "steps_per_sec": steps / length,
+        "cycles_per_sec": cycles / length,
+        "time": {
+            "step": raw_step,
+            "observe": raw_observe,
+            "last": 0.0,
+            "wrappers": step_time - raw_step - raw_observe,
+            "other": length - step_time,
+            "total": length,
+        },
+    }
+
+
+def _summarize(trials):
+    steps = np.array([trial["steps_per_sec"] for trial in trials])
+    cycles = np.array([trial["cycles_per_sec"] for trial in trials])
+    total = sum(trial["time"]["total"] for trial in trials)
+    fractions = {
+        name: sum(trial["time"][name] for trial in trials) / total
+        for name in trials[0]["time"]
+        if name != "total"
+    }
+    return {
+        "steps_per_sec": float(np.median(steps)),
+        "steps_per_sec_min": float(steps.min()),
+        "steps_per_sec_max": float(steps.max()),
+        "cycles_per_sec": float(np.median(cycles)),
+        "time_fraction": fractions,
+        "trials": len(trials),
+    }
+
+
+def benchmark_env(env, parallel=False, duration=5, warmup=1, trials=1, seed=0):
+    """
+    Measures the throughput of an AECEnv (or a ParallelEnv if parallel is
+    True), running `trials` trials of `duration` seconds each after `warmup`
+    seconds of warm-up.
+
+    Returns a dict with the median steps and cycles per second over the
+    trials, the fraction of the time spent in the environment's own `step` and
+    `observe`, in `last`, and in the wrappers around the environment.
+    """
+    rng = random.Random(seed)
+    env.reset(seed=seed)
+    for agent in env.possible_agents:
+        env.action_space(agent).seed(seed)
+    run_trial = _parallel_trial if parallel else _aec_trial
+    if warmup > 0:
+        run_trial(env, warmup, rng)
+    return _summarize([run_trial(env, duration, rng) for _ in range(trials)])
+
+
+def performance_benchmark(env, duration=5, warmup=0, trials=1):
+    print("Starting performance benchmark")
+    results = benchmark_env(env, duration=duration, warmup=warmup, trials=trials)
+    print(str(results["steps_per_sec"]) + " turns per second")
+    print(str(results["cycles_per_sec"]) + " cycles per second")
     print("Finished performance benchmark")
+    return results
+
+
+def benchmark_modules(
+    env_modules, modes=("aec", "parallel"), duration=5, warmup=1, trials=3
+):
+    """
+    Benchmarks every environment module of `env_modules` (a dict mapping names
+    to modules, like the ones returned by `load_env_modules`) in AEC and
+    parallel mode. Environments without a parallel API are only benchmarked in
+    AEC mode; environments that fail to run get an "error" entry instead.
+
+    Returns a JSON-serializable dict. The peak RSS never decreases during a
+    process, so it is reported once for the whole run, not per environment.
+    """
+    results = {}
+    for name, env_module in env_modules.items():
+        results[name] = {}
+        for mode in modes:
+            if mode == "parallel" and not hasattr(env_module, "parallel_env"):
+                continue
+            try:
+                if mode == "parallel":
+                    env = env_module.parallel_env()
+                else:
+                    env = env_module.env()
+                results[name][mode] = benchmark_env(
+                    env,
+                    parallel=mode == "parallel",
+                    duration=duration,
+                    warmup=warmup,
+                    trials=trials,
+                )
+                env.close()
+            except Exception as e:
+                results[name][mode] = {"error": f"{type(e).__name__}: {e}"}
+    return {
+        "pettingzoo": pettingzoo.__version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "config": {"duration": duration, "warmup": warmup, "trials": trials},
+        "peak_rss_kb": peak_rss_kb(),
+        "results": results,
+    }
+
+
+def compare_to_baseline(results, baseline, threshold=0.1):
+    """
+    Compares the output of `benchmark_modules` to a baseline produced by it.
+
+    Returns a list of rows, one for each environment and mode present in both,
+    with the relative change of steps per second; rows with a slowdown larger
+    than `threshold` are marked as regressions.
+    """
+    rows = []
+    for name, modes in results["results"].items():
+        for mode, current in modes.items():
+            previous = baseline["results"].get(name, {}).get(mode)
+            if previous is None or "error" in previous or "error" in current:
+                continue
+            change = current["steps_per_sec"] / previous["steps_per_sec"] - 1
+            rows.append(
+                {
+                    "env": name,
+                    "mode": mode,
+                    "baseline": previous["steps_per_sec"],
+                    "current": current["steps_per_sec"],
+                    "change": change,
+                    "regression": change < -threshold,
+                }
+            )
+    return rows
+
+
+# environments benchmarked by default, the ones of test/all_modules.py
+all_environments = (
+    "atari/basketball_pong_v3",
+    "atari/boxing_v2",
+    "atari/combat_tank_v2",
+    "atari/combat_plane_v2",
+    "atari/double_dunk_v3",
+    "atari/entombed_cooperative_v3",
+    "atari/flag_capture_v2",
+    "atari/foozpong_v3",
+    "atari/joust_v3",
+    "atari/ice_hockey_v2",
+    "atari/maze_craze_v3",
+    "atari/mario_bros_v3",
+    "atari/othello_v3",
+    "atari/pong_v3",
+    "atari/quadrapong_v4",
+    "atari/space_invaders_v2",
+    "atari/space_war_v2",
+    "atari/surround_v2",
+    "atari/tennis_v3",
+    "atari/video_checkers_v4",
+    "atari/volleyball_pong_v3",
+    "atari/wizard_of_wor_v3",
+    "atari/warlords_v3",
+    "classic/chess_v5",
+    "classic/checkers_v3",
+    "classic/rps_v2",
+    "classic/connect_four_v3",
+    "classic/tictactoe_v3",
+    "classic/leduc_holdem_v4",
+    "classic/mahjong_v4",
+    "classic/texas_holdem_v4",
+    "classic/texas_holdem_no_limit_v6",
+    "classic/uno_v4",
+    "classic/dou_dizhu_v4",
+    "classic/gin_rummy_v4",
+    "classic/go_v5",
+    "classic/hanabi_v4",
+    "classic/backgammon_v3",
+    "butterfly/knights_archers_zombies_v10",
+    "butterfly/pistonball_v6",
+    "butterfly/cooperative_pong_v5",
+    "butterfly/prospector_v4",
+    "magent/adversarial_pursuit_v4",
+    "magent/battle_v4",
+    "magent/battlefield_v5",
+    "magent/combined_arms_v6",
+    "magent/gather_v5",
+    "magent/tiger_deer_v4",
+    "mpe/simple_adversary_v2",
+    "mpe/simple_crypto_v2",
+    "mpe/simple_push_v2",
+    "mpe/simple_reference_v2",
+    "mpe/simple_speaker_listener_v3",
+    "mpe/simple_spread_v2",
+    "mpe/simple_swarm_v0",
+    "mpe/simple_tag_v2",
+    "mpe/simple_world_comm_v2",
+    "mpe/simple_v2",
+    "sisl/multiwalker_v9",
+    "sisl/pursuit_v4",
+)
+
+
+def load_env_modules(names=all_environments):
+    """
+    Imports the environment modules named like "mpe/simple_spread_v2".
+
+    Returns a dict mapping the names to the modules, and a dict mapping the
+    names of the modules that could not be imported, e.g. because of a
+    missing optional dependency, to the error.
+    """
+    env_modules = {}
+    errors = {}
+    for name in names:
+        try:
+            env_modules[name] = importlib.import_module(
+                "pettingzoo." + name.replace("/", ".")
+            )
+        except ImportError as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+    return env_modules, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the throughput of PettingZoo environments."
+    )
+    parser.add_argument(
+        "envs",
+        nargs="*",
+        help="environments to benchmark, like mpe/simple_spread_v2 (default: all the environments)",
+    )
+    parser.add_argument("--mode", choices=["aec", "parallel", "both"], default="both")
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--warmup", type=float, default=1)
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--output", help="file to write the JSON results to")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown reported as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    modes = ("aec", "parallel") if args.mode == "both" else (args.mode,)
+    env_modules, errors = load_env_modules(args.envs or all_environments)
+    results = benchmark_modules(
+        env_modules,
+        modes=modes,
+        duration=args.duration,
+        warmup=args.warmup,
+        trials=args.trials,
+    )
+    for name, error in errors.items():
+        results["results"][name] = {mode: {"error": error} for mode in modes}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare_to_baseline(results, baseline, args.threshold)
+        for row in rows:
+            sys.stderr.write(
+                "{env:40} {mode:8} {baseline:12.1f} -> {current:12.1f} steps/s ({change:+.1%}){flag}\n".format(
+                    flag="  REGRESSION" if row["regression"] else "", **row
+                )
+            )
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
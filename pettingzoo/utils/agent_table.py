@@ -0,0 +1,259 @@
+from collections.abc import MutableMapping, MutableSequence
+from itertools import islice
+
+import numpy as np
+
+
+class AgentTable:
+    """
+    Assigns a slot to every agent of an environment. The AgentArrayDicts
+    created from the same table store their values at these slots, so that
+    they can be combined with array operations.
+    """
+
+    def __init__(self, possible_agents=()):
+        self.agents = list(possible_agents)
+        self.slots = {agent: i for i, agent in enumerate(self.agents)}
+
+    def __len__(self):
+        return len(self.agents)
+
+    def slot(self, agent):
+        try:
+            return self.slots[agent]
+        except KeyError:
+            slot = self.slots[agent] = len(self.agents)
+            self.agents.append(agent)
+            return slot
+
+    def array_dict(self, values, dtype):
+        """
+        Returns an AgentArrayDict with the items of `values`, a dict or an
+        iterable of (agent, value) pairs.
+        """
+        table = AgentArrayDict(self, dtype)
+        items = values.items() if isinstance(values, dict) else values
+        for agent, value in items:
+            table[agent] = value
+        return table
+
+    def fromkeys(self, agents, value, dtype):
+        return self.array_dict(((agent, value) for agent in agents), dtype)
+
+    def agent_list(self, agents):
+        """
+        Returns an AgentList of `agents`, for the `agents` attribute of
+        environments whose dones and rewards are AgentArrayDicts.
+        """
+        return AgentList(agents)
+
+
+class AgentList(MutableSequence):
+    """
+    List of the live agents of an environment which removes agents in O(1),
+    so that removing done agents one by one in `_was_done_step` does not take
+    quadratic time.
+
+    The agents are kept as the keys of a dict: iteration, `len`, `in`,
+    `remove` and `append` are as cheap as on a dict, while indexing an agent
+    other than the first or inserting it anywhere but at the end is O(n).
+    Slices are plain lists, so `env.agents[:]` copies the agents into a list.
+    """
+
+    def __init__(self, agents=()):
+        self._agents = dict.fromkeys(agents)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._agents)[index]
+        size = len(self._agents)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("list index out of range")
+        return next(islice(self._agents, index, None))
+
+    def __setitem__(self, index, agent):
+        agents = list(self._agents)
+        agents[index] = agent
+        self._agents = dict.fromkeys(agents)
+
+    def __delitem__(self, index):
+        agents = list(self._agents)
+        del agents[index]
+        self._agents = dict.fromkeys(agents)
+
+    def insert(self, index, agent):
+        agents = list(self._agents)
+        agents.insert(index, agent)
+        self._agents = dict.fromkeys(agents)
+
+    def append(self, agent):
+        assert agent not in self._agents, f"agent {agent} is already in the list"
+        self._agents[agent] = None
+
+    def remove(self, agent):
+        try:
+            del self._agents[agent]
+        except KeyError:
+            raise ValueError(f"{agent!r} is not in the list") from None
+
+    def __iter__(self):
+        return iter(self._agents)
+
+    def __len__(self):
+        return len(self._agents)
+
+    def __contains__(self, agent):
+        return agent in self._agents
+
+    def copy(self):
+        return list(self._agents)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, AgentList)):
+            return list(self._agents) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self._agents))
+
+
+class AgentArrayDict(MutableMapping):
+    """
+    Dict-like mapping from agents to numbers backed by a NumPy array, meant
+    for the `rewards`, `dones` and `_cumulative_rewards` of environments with
+    many agents.
+
+    The keys keep their insertion order like a dict, removing an agent is
+    O(1), and `fill`, `add` and `first_true` (used by the AECEnv helpers
+    `_clear_rewards`, `_accumulate_rewards`, `_dones_step_first` and
+    `_was_done_step`) work on the whole array at once.
+    """
+
+    def __init__(self, table, dtype):
+        self.table = table
+        self.dtype = np.dtype(dtype)
+        self._keys = {}
+        size = max(len(table), 1)
+        self._values = np.zeros(size, dtype=self.dtype)
+        self._present = np.zeros(size, dtype=bool)
+        # slots in insertion order, deleted keys are replaced by -1
+        self._order = np.zeros(size, dtype=np.intp)
+        self._order_len = 0
+        self._position = np.zeros(size, dtype=np.intp)
+
+    def _grow(self, size):
+        size = max(size, 2 * len(self._values))
+        values = np.zeros(size, dtype=self.dtype)
+        values[: len(self._values)] = self._values
+        present = np.zeros(size, dtype=bool)
+        present[: len(self._present)] = self._present
+        position = np.zeros(size, dtype=np.intp)
+        position[: len(self._position)] = self._position
+        self._values = values
+        self._present = present
+        self._position = position
+
+    def _append_order(self, slot):
+        if self._order_len == len(self._order):
+            if len(self._keys) <= self._order_len // 2:
+                # drop the slots of deleted keys; _keys already holds the new
+                # slot, which is written again below
+                slots = np.array(list(self._keys.values()), dtype=np.intp)
+                self._order = np.zeros(max(2 * len(slots), 1), dtype=np.intp)
+                self._order[: len(slots)] = slots
+                self._position[slots] = np.arange(len(slots))
+                self._order_len = len(slots) - 1
+            else:
+                self._order = np.concatenate([self._order, np.zeros_like(self._order)])
+        self._order[self._order_len] = slot
+        self._position[slot] = self._order_len
+        self._order_len += 1
+
+    def __getitem__(self, agent):
+        return self._values[self._keys[agent]].item()
+
+    def __setitem__(self, agent, value):
+        slot = self._keys.get(agent)
+        if slot is None:
+            slot = self._keys[agent] = self.table.slot(agent)
+            if slot >= len(self._values):
+                self._grow(slot + 1)
+            self._present[slot] = True
+            self._append_order(slot)
+        self._values[slot] = value
+
+    def __delitem__(self, agent):
+        slot = self._keys.pop(agent)
+        # absent agents are kept at 0 so that `add` can ignore them
+        self._values[slot] = 0
+        self._present[slot] = False
+        self._order[self._position[slot]] = -1
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, agent):
+        return agent in self._keys
+
+    def copy(self):
+        other = AgentArrayDict(self.table, self.dtype)
+        other._keys = self._keys.copy()
+        other._values = self._values.copy()
+        other._present = self._present.copy()
+        other._order = self._order.copy()
+        other._order_len = self._order_len
+        other._position = self._position.copy()
+        return other
+
+    __copy__ = copy
+
+    def fill(self, value):
+        """
+        Sets the value of every agent.
+        """
+        if len(self._keys) == len(self._values):
+            self._values.fill(value)
+        else:
+            self._values[self._present] = value
+
+    def add(self, other):
+        """
+        Adds the values of `other`, an AgentArrayDict of the same table, like
+        `self[agent] += other[agent]` for every agent of `self`.
+        """
+        assert other.table is self.table, "can only add dicts of the same table"
+        if len(other._values) < len(self._values):
+            other._grow(len(self._values))
+        other_values = other._values[: len(self._values)]
+        if len(self._keys) == len(self._values):
+            self._values += other_values
+        else:
+            self._values[self._present] += other_values[self._present]
+
+    def _ordered_slots(self):
+        order = self._order[: self._order_len]
+        return order[order >= 0]
+
+    def first_true(self):
+        """
+        Returns the first agent in key order whose value is true, or None.
+        """
+        order = self._ordered_slots()
+        hits = np.flatnonzero(self._values[order])
+        if not len(hits):
+            return None
+        return self.table.agents[order[hits[0]]]
+
+    def values_array(self):
+        """
+        Returns the values as an array, in key order.
+        """
+        return self._values[self._ordered_slots()]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
@@ -2,8 +2,12 @@ import copy
 import warnings
 from collections import defaultdict
 
+import numpy as np
+
 from pettingzoo.utils import agent_selector
+from pettingzoo.utils.agent_table import AgentTable
 from pettingzoo.utils.env import AECEnv, ParallelEnv
+from pettingzoo.utils.lazy_observations import LazyObservationDict
 from pettingzoo.utils.wrappers import OrderEnforcingWrapper
 
 
@@ -16,28 +20,28 @@ def parallel_wrapper_fn(env_fn):
     return par_fn
 
 
-def aec_to_parallel(aec_env):
+def aec_to_parallel(aec_env, fast=False, lazy_obs=None):
     if isinstance(aec_env, parallel_to_aec_wrapper):
         return aec_env.env
     else:
-        par_env = aec_to_parallel_wrapper(aec_env)
+        par_env = aec_to_parallel_wrapper(aec_env, fast=fast, lazy_obs=lazy_obs)
         return par_env
 
 
-def parallel_to_aec(par_env):
+def parallel_to_aec(par_env, agent_tables=False):
     if isinstance(par_env, aec_to_parallel_wrapper):
         return par_env.aec_env
     else:
-        aec_env = parallel_to_aec_wrapper(par_env)
+        aec_env = parallel_to_aec_wrapper(par_env, agent_tables=agent_tables)
         ordered_env = OrderEnforcingWrapper(aec_env)
         return ordered_env
 
 
-def turn_based_aec_to_parallel(aec_env):
+def turn_based_aec_to_parallel(aec_env, lazy_obs=False):
     if isinstance(aec_env, parallel_to_aec_wrapper):
         return aec_env.env
     else:
-        par_env = turn_based_aec_to_parallel_wrapper(aec_env)
+        par_env = turn_based_aec_to_parallel_wrapper(aec_env, lazy_obs=lazy_obs)
         return par_env
 
 
@@ -55,8 +59,41 @@ def from_parallel(par_env):
     return parallel_to_aec(par_env)
 
 
+def _lazy_observations(aec_env, agents, previous):
+    """
+    Returns a LazyObservationDict over `agents` and expires `previous`.
+
+    Done agents are removed from the AEC environment right after the parallel
+    step, so their observations are computed immediately.
+    """
+    if previous is not None:
+        previous.expire()
+    observations = LazyObservationDict(aec_env.observe, agents)
+    for agent in agents:
+        if aec_env.dones[agent]:
+            observations[agent]
+    return observations
+
+
 class aec_to_parallel_wrapper(ParallelEnv):
-    def __init__(self, aec_env):
+    """
+    Steps every live agent of a parallelizable AEC environment in one cycle.
+
+    With `fast=True` the wrapper takes the rewards of a cycle from the AEC
+    environment once the cycle is over instead of summing them after every
+    sub-step, which is O(n_agents) per cycle rather than O(n_agents^2). This
+    is only correct for environments which follow the `is_parallelizable`
+    contract and produce their rewards at the end of the cycle. The returned
+    dictionaries are also reused between calls to `reset` and `step`, so copy
+    them if you need to keep them across steps.
+
+    With `lazy_obs=True` observations are returned as a LazyObservationDict,
+    which only calls `observe` for the agents whose observation is accessed.
+    `lazy_obs` defaults to `fast`: pass `fast=True, lazy_obs=False` to get the
+    observations of every agent computed eagerly into a reused dict.
+    """
+
+    def __init__(self, aec_env, fast=False, lazy_obs=None):
         assert aec_env.metadata.get("is_parallelizable", False), (
             "Converting from an AEC environment to a parallel environment "
             "with the to_parallel wrapper is not generally safe "
@@ -67,6 +104,9 @@ class aec_to_parallel_wrapper(ParallelEnv):
         )
 
         self.aec_env = aec_env
+        self.fast = fast
+        self.lazy_obs = fast if lazy_obs is None else lazy_obs
+        self._lazy_observations = None
 
         try:
             self.possible_agents = aec_env.possible_agents
@@ -81,6 +121,12 @@ class aec_to_parallel_wrapper(ParallelEnv):
         except AttributeError:
             pass
 
+        # containers reused between steps in fast mode
+        self._observations = {}
+        self._rewards = {}
+        self._dones = {}
+        self._infos = {}
+
     @property
     def observation_spaces(self):
         warnings.warn(
@@ -120,11 +166,24 @@ class aec_to_parallel_wrapper(ParallelEnv):
     def reset(self, seed=None, return_info=False, options=None):
         self.aec_env.reset(seed=seed, return_info=return_info, options=options)
         self.agents = self.aec_env.agents[:]
-        observations = {
-            agent: self.aec_env.observe(agent)
-            for agent in self.aec_env.agents
-            if not self.aec_env.dones[agent]
-        }
+        if self.lazy_obs:
+            observations = self._lazy_observations = _lazy_observations(
+                self.aec_env,
+                [agent for agent in self.agents if not self.aec_env.dones[agent]],
+                self._lazy_observations,
+            )
+        elif self.fast:
+            observations = self._observations
+            observations.clear()
+            for agent in self.aec_env.agents:
+                if not self.aec_env.dones[agent]:
+                    observations[agent] = self.aec_env.observe(agent)
+        else:
+            observations = {
+                agent: self.aec_env.observe(agent)
+                for agent in self.aec_env.agents
+                if not self.aec_env.dones[agent]
+            }
 
         if not return_info:
             return observations
@@ -132,37 +191,85 @@ class aec_to_parallel_wrapper(ParallelEnv):
             infos = dict(**self.aec_env.infos)
             return observations, infos
 
+    def _check_agent_order(self, agent):
+        if agent != self.aec_env.agent_selection:
+            if self.aec_env.dones[agent]:
+                raise AssertionError(
+                    f"expected agent {agent} got done agent {self.aec_env.agent_selection}. Parallel environment wrapper expects all agent termination (setting an agent's self.dones entry to True) to happen only at the end of a cycle."
+                )
+            else:
+                raise AssertionError(
+                    f"expected agent {agent} got agent {self.aec_env.agent_selection}, Parallel environment wrapper expects agents to step in a cycle."
+                )
+
     def step(self, actions):
+        if self.fast:
+            return self._fast_step(actions)
+
         rewards = defaultdict(int)
         dones = {}
         infos = {}
         observations = {}
         for agent in self.aec_env.agents:
-            if agent != self.aec_env.agent_selection:
-                if self.aec_env.dones[agent]:
-                    raise AssertionError(
-                        f"expected agent {agent} got done agent {self.aec_env.agent_selection}. Parallel environment wrapper expects all agent termination (setting an agent's self.dones entry to True) to happen only at the end of a cycle."
-                    )
-                else:
-                    raise AssertionError(
-                        f"expected agent {agent} got agent {self.aec_env.agent_selection}, Parallel environment wrapper expects agents to step in a cycle."
-                    )
-            obs, rew, done, info = self.aec_env.last()
+            self._check_agent_order(agent)
             self.aec_env.step(actions[agent])
             for agent in self.aec_env.agents:
                 rewards[agent] += self.aec_env.rewards[agent]
 
         dones = dict(**self.aec_env.dones)
         infos = dict(**self.aec_env.infos)
-        observations = {
-            agent: self.aec_env.observe(agent) for agent in self.aec_env.agents
-        }
+        if self.lazy_obs:
+            observations = self._lazy_observations = _lazy_observations(
+                self.aec_env, self.aec_env.agents[:], self._lazy_observations
+            )
+        else:
+            observations = {
+                agent: self.aec_env.observe(agent) for agent in self.aec_env.agents
+            }
         while self.aec_env.agents and self.aec_env.dones[self.aec_env.agent_selection]:
             self.aec_env.step(None)
 
         self.agents = self.aec_env.agents
         return observations, rewards, dones, infos
 
+    def _fast_step(self, actions):
+        aec_env = self.aec_env
+        for agent in aec_env.agents:
+            if agent != aec_env.agent_selection:
+                self._check_agent_order(agent)
+            aec_env.step(actions[agent])
+
+        agents = aec_env.agents
+        env_rewards = aec_env.rewards
+        rewards = self._rewards
+        rewards.clear()
+        for agent in agents:
+            rewards[agent] = env_rewards[agent]
+        dones = self._dones
+        dones.clear()
+        dones.update(aec_env.dones)
+        infos = self._infos
+        infos.clear()
+        infos.update(aec_env.infos)
+        if self.lazy_obs:
+            observations = self._lazy_observations = _lazy_observations(
+                aec_env, agents[:], self._lazy_observations
+            )
+        else:
+            observations = self._observations
+            observations.clear()
+            for agent in agents:
+                observations[agent] = aec_env.observe(agent)
+
+        while aec_env.agents and aec_env.dones[aec_env.agent_selection]:
+            aec_env.step(None)
+
+        self.agents = aec_env.agents
+        return observations, rewards, dones, infos
+
+    def observe_batch(self, agents):
+        return self.aec_env.observe_batch(agents)
+
     def render(self, mode="human"):
         return self.aec_env.render(mode)
 
@@ -174,8 +281,19 @@ class aec_to_parallel_wrapper(ParallelEnv):
 
 
 class parallel_to_aec_wrapper(AECEnv):
-    def __init__(self, parallel_env):
+    """
+    Exposes a parallel environment as an AEC environment which steps the
+    parallel environment once every agent has acted.
+
+    With `agent_tables=True`, `rewards`, `dones` and `_cumulative_rewards`
+    are AgentArrayDicts instead of dicts and `agents` is an AgentList, which
+    makes removing done agents and clearing or accumulating rewards cheap in
+    environments with many agents.
+    """
+
+    def __init__(self, parallel_env, agent_tables=False):
         self.env = parallel_env
+        self.agent_tables = agent_tables
 
         self.metadata = {**parallel_env.metadata}
         self.metadata["is_parallelizable"] = True
@@ -234,10 +352,17 @@ class parallel_to_aec_wrapper(AECEnv):
         self._actions = {agent: None for agent in self.agents}
         self._agent_selector = agent_selector(self._live_agents)
         self.agent_selection = self._agent_selector.reset()
-        self.dones = {agent: False for agent in self.agents}
+        if self.agent_tables:
+            self._table = AgentTable(getattr(self, "possible_agents", self.agents))
+            self.agents = self._table.agent_list(self.agents)
+            self.dones = self._table.fromkeys(self.agents, False, bool)
+            self.rewards = self._table.fromkeys(self.agents, 0, np.float64)
+            self._cumulative_rewards = self._table.fromkeys(self.agents, 0, np.float64)
+        else:
+            self.dones = {agent: False for agent in self.agents}
+            self.rewards = {agent: 0 for agent in self.agents}
+            self._cumulative_rewards = {agent: 0 for agent in self.agents}
         self.infos = {agent: {} for agent in self.agents}
-        self.rewards = {agent: 0 for agent in self.agents}
-        self._cumulative_rewards = {agent: 0 for agent in self.agents}
         self.new_agents = []
         self.new_values = {}
 
@@ -266,10 +391,7 @@ class parallel_to_aec_wrapper(AECEnv):
             obss, rews, dones, infos = self.env.step(self._actions)
 
             self._observations = copy.copy(obss)
-            self.dones = copy.copy(dones)
             self.infos = copy.copy(infos)
-            self.rewards = copy.copy(rews)
-            self._cumulative_rewards = copy.copy(rews)
 
             env_agent_set = set(self.env.agents)
 
@@ -279,6 +401,21 @@ class parallel_to_aec_wrapper(AECEnv):
                 if agent not in env_agent_set
             ]
 
+            if self.agent_tables:
+                self.agents = self._table.agent_list(self.agents)
+                # ordered like self.agents, which _dones_step_first relies on
+                self.dones = self._table.array_dict(
+                    ((agent, dones[agent]) for agent in self.agents), bool
+                )
+                self.rewards = self._table.array_dict(
+                    ((agent, rews[agent]) for agent in self.agents), np.float64
+                )
+                self._cumulative_rewards = self.rewards.copy()
+            else:
+                self.dones = copy.copy(dones)
+                self.rewards = copy.copy(rews)
+                self._cumulative_rewards = copy.copy(rews)
+
             if len(self.env.agents):
                 self._agent_selector = agent_selector(self.env.agents)
                 self.agent_selection = self._agent_selector.reset()
@@ -311,8 +448,18 @@ class parallel_to_aec_wrapper(AECEnv):
 
 
 class turn_based_aec_to_parallel_wrapper(ParallelEnv):
-    def __init__(self, aec_env):
+    """
+    Exposes a turn based AEC environment as a parallel environment where only
+    the active agent (`infos[agent]["active_agent"]`) acts at each step.
+
+    With `lazy_obs=True` observations are returned as a LazyObservationDict,
+    which only calls `observe` for the agents whose observation is accessed.
+    """
+
+    def __init__(self, aec_env, lazy_obs=False):
         self.aec_env = aec_env
+        self.lazy_obs = lazy_obs
+        self._lazy_observations = None
 
         try:
             self.possible_agents = aec_env.possible_agents
@@ -366,11 +513,18 @@ class turn_based_aec_to_parallel_wrapper(ParallelEnv):
     def reset(self, seed=None, return_info=False, options=None):
         self.aec_env.reset(seed=seed, return_info=return_info, options=options)
         self.agents = self.aec_env.agents[:]
-        observations = {
-            agent: self.aec_env.observe(agent)
-            for agent in self.aec_env.agents
-            if not self.aec_env.dones[agent]
-        }
+        if self.lazy_obs:
+            observations = self._lazy_observations = _lazy_observations(
+                self.aec_env,
+                [agent for agent in self.agents if not self.aec_env.dones[agent]],
+                self._lazy_observations,
+            )
+        else:
+            observations = {
+                agent: self.aec_env.observe(agent)
+                for agent in self.aec_env.agents
+                if not self.aec_env.dones[agent]
+            }
 
         if not return_info:
             return observations
@@ -385,9 +539,14 @@ class turn_based_aec_to_parallel_wrapper(ParallelEnv):
         rewards = {**self.aec_env.rewards}
         dones = {**self.aec_env.dones}
         infos = {**self.aec_env.infos}
-        observations = {
-            agent: self.aec_env.observe(agent) for agent in self.aec_env.agents
-        }
+        if self.lazy_obs:
+            observations = self._lazy_observations = _lazy_observations(
+                self.aec_env, self.aec_env.agents[:], self._lazy_observations
+            )
+        else:
+            observations = {
+                agent: self.aec_env.observe(agent) for agent in self.aec_env.agents
+            }
 
         while self.aec_env.agents:
             if self.aec_env.dones[self.aec_env.agent_selection]:
@@ -401,6 +560,9 @@ class turn_based_aec_to_parallel_wrapper(ParallelEnv):
         self.agents = self.aec_env.agents
         return observations, rewards, dones, infos
 
+    def observe_batch(self, agents):
+        return self.aec_env.observe_batch(agents)
+
     def render(self, mode="human"):
         return self.aec_env.render(mode)
 
@@ -6,6 +6,8 @@ from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 import gym
 import numpy as np
 
+from .agent_table import AgentArrayDict
+
 ObsType = TypeVar("ObsType")
 ActionType = TypeVar("ActionType")
 AgentID = str
@@ -87,6 +89,23 @@ class AECEnv:
         """
         raise NotImplementedError
 
+    def observe_batch(self, agents: List[AgentID]) -> np.ndarray:
+        """
+        Returns the observations of `agents` stacked into a single array, which
+        requires their observations to have the same shape.
+
+        The default implementation calls `observe` once per agent; environments
+        which compute shared intermediate state for each observation should
+        override it to compute the whole batch in one pass.
+        """
+        return np.stack([self.observe(agent) for agent in agents])
+
+    def observe_all(self) -> np.ndarray:
+        """
+        Returns the stacked observations of all live agents (see `observe_batch`).
+        """
+        return self.observe_batch(self.agents)
+
     def render(self, mode: str = "human") -> None | np.ndarray | str:
         """
         Displays a rendered frame from the environment, if supported.
@@ -153,16 +172,28 @@ class AECEnv:
         Makes .agent_selection point to first done agent. Stores old value of agent_selection
         so that _was_done_step can restore the variable after the done agent steps.
         """
-        _dones_order = [agent for agent in self.agents if self.dones[agent]]
-        if _dones_order:
+        first_done = self._first_done_agent()
+        if first_done is not None:
             self._skip_agent_selection = self.agent_selection
-            self.agent_selection = _dones_order[0]
+            self.agent_selection = first_done
         return self.agent_selection
 
+    def _first_done_agent(self) -> Optional[AgentID]:
+        if isinstance(self.dones, AgentArrayDict):
+            # with array-backed dones, agents are ordered like the keys of dones
+            return self.dones.first_true()
+        for agent in self.agents:
+            if self.dones[agent]:
+                return agent
+        return None
+
     def _clear_rewards(self) -> None:
         """
         Clears all items in .rewards
         """
+        if isinstance(self.rewards, AgentArrayDict):
+            self.rewards.fill(0)
+            return
         for agent in self.rewards:
             self.rewards[agent] = 0
 
@@ -171,6 +202,11 @@ class AECEnv:
         Adds .rewards dictionary to ._cumulative_rewards dictionary. Typically
         called near the end of a step() method
         """
+        if isinstance(self.rewards, AgentArrayDict) and isinstance(
+            self._cumulative_rewards, AgentArrayDict
+        ):
+            self._cumulative_rewards.add(self.rewards)
+            return
         for agent, reward in self.rewards.items():
             self._cumulative_rewards[agent] += reward
 
@@ -226,11 +262,11 @@ class AECEnv:
         self.agents.remove(agent)
 
         # finds next done agent or loads next live agent (Stored in _skip_agent_selection)
-        _dones_order = [agent for agent in self.agents if self.dones[agent]]
-        if _dones_order:
+        first_done = self._first_done_agent()
+        if first_done is not None:
             if getattr(self, "_skip_agent_selection", None) is None:
                 self._skip_agent_selection = self.agent_selection
-            self.agent_selection = _dones_order[0]
+            self.agent_selection = first_done
         else:
             if getattr(self, "_skip_agent_selection", None) is not None:
                 self.agent_selection = self._skip_agent_selection
@@ -316,6 +352,24 @@ class ParallelEnv:
         """
         raise NotImplementedError
 
+    def observe_batch(self, agents: List[AgentID]) -> np.ndarray:
+        """
+        Returns the current observations of `agents` stacked into a single
+        array, which requires their observations to have the same shape.
+        Optional: parallel environments are not required to support it.
+        """
+        raise NotImplementedError(
+            "observe_batch() method has not been implemented in the environment {}.".format(
+                self.metadata.get("name", self.__class__.__name__)
+            )
+        )
+
+    def observe_all(self) -> np.ndarray:
+        """
+        Returns the stacked observations of all live agents (see `observe_batch`).
+        """
+        return self.observe_batch(self.agents)
+
     def render(self, mode="human") -> None | np.ndarray | str:
         """
         Displays a rendered frame from the environment, if supported.
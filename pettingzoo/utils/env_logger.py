@@ -1,8 +1,27 @@
 import logging
+import time
+from collections import Counter, deque
 
 
 class EnvLogger:
-    mqueue = []
+    """
+    Logs the warnings of environments and wrappers.
+
+    Every warning is counted by type (`get_counts()`), but only the first
+    `max_repeats` warnings of each type are formatted and logged; after that a
+    type is logged at most once every `rate_limit_interval` seconds, together
+    with the number of warnings of that type that were suppressed. The last
+    `max_queue_len` logged messages are kept in `mqueue`.
+    """
+
+    max_queue_len = 100
+    max_repeats = 10
+    rate_limit_interval = 10.0
+
+    mqueue = deque(maxlen=max_queue_len)
+    counts = Counter()
+    _suppressed = Counter()
+    _last_logged = {}
     _output = True
 
     @staticmethod
@@ -11,19 +30,65 @@ class EnvLogger:
         return logger
 
     @staticmethod
-    def _generic_warning(msg):
+    def configure(max_queue_len=None, max_repeats=None, rate_limit_interval=None):
+        if max_queue_len is not None:
+            EnvLogger.max_queue_len = max_queue_len
+            EnvLogger.mqueue = deque(EnvLogger.mqueue, maxlen=max_queue_len)
+        if max_repeats is not None:
+            EnvLogger.max_repeats = max_repeats
+        if rate_limit_interval is not None:
+            EnvLogger.rate_limit_interval = rate_limit_interval
+
+    @staticmethod
+    def _generic_warning(msg, kind=None):
+        """
+        `msg` may be a function returning the message, so that it is only
+        formatted if the warning is logged. `kind` defaults to the message.
+        """
+        kind = msg if kind is None else kind
+        EnvLogger.counts[kind] += 1
+        if EnvLogger.counts[kind] > EnvLogger.max_repeats:
+            now = time.monotonic()
+            if (
+                now - EnvLogger._last_logged.get(kind, 0)
+                < EnvLogger.rate_limit_interval
+            ):
+                EnvLogger._suppressed[kind] += 1
+                return
+            EnvLogger._last_logged[kind] = now
+        else:
+            EnvLogger._last_logged[kind] = time.monotonic()
+
+        if callable(msg):
+            msg = msg()
+        suppressed = EnvLogger._suppressed.pop(kind, 0)
+        if suppressed:
+            msg = f"{msg} ({suppressed} similar warnings suppressed)"
         logger = EnvLogger.get_logger()
         if not logger.hasHandlers():
-            handler = EnvWarningHandler(mqueue=EnvLogger.mqueue)
+            handler = EnvWarningHandler()
             logger.addHandler(handler)
         logger.warning(msg)
         # needed to get the pytest runner to work correctly, and doesn't seem to have serious issues
         EnvLogger.mqueue.append(msg)
 
+    @staticmethod
+    def get_counts():
+        """
+        Returns the number of warnings of each type, including suppressed ones.
+        """
+        return dict(EnvLogger.counts)
+
     @staticmethod
     def flush():
         EnvLogger.mqueue.clear()
 
+    @staticmethod
+    def clear_counts():
+        EnvLogger.counts.clear()
+        EnvLogger._suppressed.clear()
+        EnvLogger._last_logged.clear()
+
     @staticmethod
     def suppress_output():
         EnvLogger._output = False
@@ -41,25 +106,29 @@ class EnvLogger:
     @staticmethod
     def warn_action_out_of_bound(action, action_space, backup_policy):
         EnvLogger._generic_warning(
-            f"[WARNING]: Received an action {action} that was outside action space {action_space}. Environment is {backup_policy}"
+            lambda: f"[WARNING]: Received an action {action} that was outside action space {action_space}. Environment is {backup_policy}",
+            kind="action_out_of_bound",
         )
 
     @staticmethod
     def warn_close_unrendered_env():
         EnvLogger._generic_warning(
-            "[WARNING]: Called close on an unrendered environment."
+            "[WARNING]: Called close on an unrendered environment.",
+            kind="close_unrendered_env",
         )
 
     @staticmethod
     def warn_close_before_reset():
         EnvLogger._generic_warning(
-            "[WARNING]: reset() needs to be called before close."
+            "[WARNING]: reset() needs to be called before close.",
+            kind="close_before_reset",
         )
 
     @staticmethod
     def warn_on_illegal_move():
         EnvLogger._generic_warning(
-            "[WARNING]: Illegal move made, game terminating with current player losing. \nobs['action_mask'] contains a mask of all legal moves that can be chosen."
+            "[WARNING]: Illegal move made, game terminating with current player losing. \nobs['action_mask'] contains a mask of all legal moves that can be chosen.",
+            kind="illegal_move",
         )
 
     @staticmethod
@@ -73,7 +142,8 @@ class EnvLogger:
     @staticmethod
     def warn_step_after_done():
         EnvLogger._generic_warning(
-            "[WARNING]: step() called after all agents are done. Should reset() first."
+            "[WARNING]: step() called after all agents are done. Should reset() first.",
+            kind="step_after_done",
         )
 
     @staticmethod
@@ -94,12 +164,7 @@ class EnvLogger:
 
 
 class EnvWarningHandler(logging.Handler):
-    def __init__(self, *args, mqueue, **kwargs):
-        logging.Handler.__init__(self, *args, **kwargs)
-        self.mqueue = mqueue
-
     def emit(self, record):
         m = self.format(record).rstrip("\n")
-        self.mqueue.append(m)
         if EnvLogger._output:
             print(m)
@@ -0,0 +1,57 @@
+from collections.abc import Mapping
+
+
+class LazyObservationDict(Mapping):
+    """
+    Read-only mapping from agents to observations which only calls
+    `observe(agent)` the first time an agent's observation is accessed,
+    then caches it.
+
+    The observations are computed from the current state of the environment,
+    so the wrapper that returned the mapping expires it when the environment
+    is stepped or reset again. Accessing an observation that had not been
+    computed before then raises a RuntimeError; observations that were already
+    read stay available.
+    """
+
+    def __init__(self, observe, agents):
+        self._observe = observe
+        self._agents = dict.fromkeys(agents)
+        self._cache = {}
+        self._expired = False
+
+    def __getitem__(self, agent):
+        try:
+            return self._cache[agent]
+        except KeyError:
+            pass
+        if agent not in self._agents:
+            raise KeyError(agent)
+        if self._expired:
+            raise RuntimeError(
+                f"The observation of agent {agent} was not accessed before the environment was stepped or reset again, so it can no longer be computed"
+            )
+        obs = self._cache[agent] = self._observe(agent)
+        return obs
+
+    def __iter__(self):
+        return iter(self._agents)
+
+    def __len__(self):
+        return len(self._agents)
+
+    def __contains__(self, agent):
+        return agent in self._agents
+
+    def __copy__(self):
+        # the mapping is read-only, copies can safely share it
+        return self
+
+    def expire(self):
+        self._expired = True
+
+    def __repr__(self):
+        computed = ", ".join(
+            f"{agent!r}: {obs!r}" for agent, obs in self._cache.items()
+        )
+        return f"{type(self).__name__}({len(self._cache)}/{len(self)} computed: {{{computed}}})"
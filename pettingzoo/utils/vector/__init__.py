@@ -0,0 +1,3 @@
+from .async_vector_env import AsyncVectorParallelEnv
+from .sync_vector_env import SyncVectorParallelEnv
+from .vector_env import VectorParallelEnv
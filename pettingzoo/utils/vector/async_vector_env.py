@@ -0,0 +1,381 @@
+import multiprocessing as mp
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+from gym.error import AlreadyPendingCallError, ClosedEnvironmentError, NoAsyncCallError
+from gym.vector.utils import CloudpickleWrapper
+
+from .vector_env import (
+    VectorParallelEnv,
+    make_parallel_env,
+    reset_env,
+    seed_list,
+    stacked_observation_space,
+    step_env,
+)
+
+
+class AsyncVectorParallelEnv(VectorParallelEnv):
+    """
+    Runs each ParallelEnv in its own worker process.
+
+    Workers write observations, rewards, dones and the alive mask straight
+    into `multiprocessing.shared_memory` arrays preallocated from
+    `observation_space(agent)`, so only actions and info dicts go through the
+    pipes. Use `step_async`/`step_wait` to overlap environment stepping with
+    other work, or `step` to do both at once.
+
+    A worker process that dies (for instance after a segfault in a physics
+    engine) is restarted with a fresh environment; if this happens during
+    `step`, the episode of that sub-environment is cut short (all its agents
+    are done, with a `"worker_restarted"` info entry). Pass
+    `restart_on_crash=False` to raise an error instead. Python exceptions raised
+    by an environment are never swallowed.
+
+    The spaces and metadata are read from an environment built with
+    `env_fns[0]`, or from `template_env` when it is given; the template
+    environment is then left open.
+    """
+
+    # arrays shared with the workers, in the order of self._shms
+    _shared_array_names = ("_observations", "_rewards", "_dones", "alive_mask")
+    # restarts of a worker that keeps dying while resetting before giving up
+    max_reset_restarts = 3
+
+    def __init__(
+        self,
+        env_fns,
+        copy=True,
+        context=None,
+        restart_on_crash=True,
+        template_env=None,
+    ):
+        self.env_fns = env_fns
+        self.restart_on_crash = restart_on_crash
+        self._ctx = mp.get_context(context)
+        self._shms = []
+
+        if template_env is None:
+            dummy_env = make_parallel_env(env_fns[0])
+        else:
+            dummy_env = template_env
+        assert hasattr(
+            dummy_env, "possible_agents"
+        ), "vector environments need possible_agents to be defined"
+        self._observation_spaces = {
+            agent: dummy_env.observation_space(agent)
+            for agent in dummy_env.possible_agents
+        }
+        self._action_spaces = {
+            agent: dummy_env.action_space(agent) for agent in dummy_env.possible_agents
+        }
+        super().__init__(
+            num_envs=len(env_fns),
+            metadata=dummy_env.metadata,
+            possible_agents=dummy_env.possible_agents,
+            observation_space=stacked_observation_space(
+                dummy_env, dummy_env.possible_agents
+            ),
+            copy=copy,
+        )
+        if template_env is None:
+            dummy_env.close()
+        del dummy_env
+
+        self._start_workers()
+        self._waiting = None
+        self.closed = False
+
+    def _allocate(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(shape)) * dtype.itemsize)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        self._shms.append(shm)
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        array.fill(0)
+        return array
+
+    def _start_workers(self):
+        # subclasses sharing more arrays with the workers allocate them here,
+        # before the workers map the shared memory
+        self.num_restarts = [0] * self.num_envs
+        self.parent_pipes = [None] * self.num_envs
+        self.processes = [None] * self.num_envs
+        for i in range(self.num_envs):
+            self._start_worker(i)
+
+    def _start_worker(self, index):
+        parent_pipe, child_pipe = self._ctx.Pipe()
+        buffers = [
+            (shm.name, array.shape, array.dtype)
+            for shm, array in zip(
+                self._shms,
+                (getattr(self, name) for name in self._shared_array_names),
+            )
+        ]
+        process = self._ctx.Process(
+            target=_worker,
+            name=f"Worker<{type(self).__name__}>-{index}",
+            args=(
+                index,
+                self._worker_env_fn(index),
+                child_pipe,
+                parent_pipe,
+                buffers,
+                self._agent_idxs,
+            ),
+        )
+        process.daemon = True
+        process.start()
+        child_pipe.close()
+        self.parent_pipes[index] = parent_pipe
+        self.processes[index] = process
+
+    def _worker_env_fn(self, index):
+        return CloudpickleWrapper(self.env_fns[index])
+
+    def _restart_seed(self, index):
+        # seed of the reset of a restarted worker when no seed is given; the
+        # environments built by env_fns are independent, so None is enough
+        return None
+
+    def _restart_worker(self, index):
+        if not self.restart_on_crash:
+            raise RuntimeError(
+                f"worker process of sub-environment {index} died (exit code {self.processes[index].exitcode})"
+            )
+        self.parent_pipes[index].close()
+        self.processes[index].join()
+        self.num_restarts[index] += 1
+        self._start_worker(index)
+
+    def observation_space(self, agent):
+        return self._observation_spaces[agent]
+
+    def action_space(self, agent):
+        return self._action_spaces[agent]
+
+    def _assert_is_running(self):
+        if self.closed:
+            raise ClosedEnvironmentError(
+                f"Trying to operate on `{type(self).__name__}`, after a call to `close()`."
+            )
+
+    def _poll(self, timeout):
+        """
+        Returns whether every worker has a result ready (or died) within
+        `timeout` seconds, without receiving any of them.
+        """
+        if timeout is None:
+            return True
+        deadline = time.perf_counter() + timeout
+        for pipe in self.parent_pipes:
+            if not pipe.poll(max(0, deadline - time.perf_counter())):
+                return False
+        return True
+
+    def _receive(self, index):
+        """
+        Returns (result, alive): alive is False if the worker process died.
+        """
+        pipe = self.parent_pipes[index]
+        try:
+            result, success = pipe.recv()
+        except (EOFError, ConnectionResetError):
+            return None, False
+        if not success:
+            raise RuntimeError(
+                f"sub-environment {index} raised an exception:\n{result}"
+            )
+        return result, True
+
+    def reset(self, seed=None, return_info=False, options=None):
+        self._assert_is_running()
+        if self._waiting is not None:
+            raise AlreadyPendingCallError(
+                f"Calling `reset` while waiting for a pending call to `{self._waiting}` to complete",
+                self._waiting,
+            )
+        seeds = seed_list(seed, self.num_envs)
+        for i, env_seed in enumerate(seeds):
+            self._send(i, "reset", (env_seed, return_info, options))
+
+        all_infos = []
+        for i, env_seed in enumerate(seeds):
+            infos, alive = self._receive(i)
+            restarts = 0
+            while not alive:
+                if restarts == self.max_reset_restarts:
+                    self.processes[i].join()
+                    raise RuntimeError(
+                        f"worker process of sub-environment {i} died {restarts + 1} times "
+                        f"while resetting (last exit code {self.processes[i].exitcode})"
+                    )
+                restarts += 1
+                self._restart_worker(i)
+                if env_seed is None:
+                    env_seed = self._restart_seed(i)
+                self._send(i, "reset", (env_seed, return_info, options))
+                infos, alive = self._receive(i)
+            all_infos.append(infos)
+        return self._reset_results(all_infos, return_info)
+
+    def _send(self, index, command, data):
+        try:
+            self.parent_pipes[index].send((command, data))
+        except (BrokenPipeError, ConnectionResetError):
+            # the worker died; this is detected when receiving its result
+            pass
+
+    def step_async(self, actions):
+        """
+        Sends the actions to the workers without waiting for the results.
+        """
+        self._assert_is_running()
+        if self._waiting is not None:
+            raise AlreadyPendingCallError(
+                f"Calling `step_async` while waiting for a pending call to `{self._waiting}` to complete",
+                self._waiting,
+            )
+        actions = np.asarray(actions)
+        for i in range(self.num_envs):
+            self._send(i, "step", actions[i])
+        self._waiting = "step"
+
+    def step_wait(self, timeout=None):
+        """
+        Waits for the results of `step_async`, at most `timeout` seconds. On
+        a timeout no result is received, so `step_wait` can be called again.
+        """
+        self._assert_is_running()
+        if self._waiting != "step":
+            raise NoAsyncCallError(
+                "Calling `step_wait` without any prior call to `step_async`.",
+                "step",
+            )
+        if not self._poll(timeout):
+            raise mp.TimeoutError(
+                f"the call to `step_wait` has timed out after {timeout} second(s)"
+            )
+        all_infos = []
+        for i in range(self.num_envs):
+            infos, alive = self._receive(i)
+            if not alive:
+                was_alive = self.alive_mask[i].copy()
+                self._restart_worker(i)
+                self._send(i, "reset", (self._restart_seed(i), False, None))
+                _, alive = self._receive(i)
+                if not alive:
+                    self._waiting = None
+                    raise RuntimeError(
+                        f"worker process of sub-environment {i} died again while restarting"
+                    )
+                self._rewards[i].fill(0)
+                self._dones[i].fill(True)
+                infos = {
+                    agent: {"worker_restarted": True}
+                    for agent, alive_agent in zip(self.possible_agents, was_alive)
+                    if alive_agent
+                }
+            all_infos.append(infos)
+        self._waiting = None
+        return self._step_results(all_infos)
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def render(self, mode="human"):
+        self._assert_is_running()
+        self._send(0, "render", mode)
+        result, alive = self._receive(0)
+        if not alive:
+            raise RuntimeError("worker process of sub-environment 0 died")
+        return result
+
+    def close(self, timeout=None, terminate=False):
+        """
+        Closes the workers, after waiting at most `timeout` seconds for a
+        pending step; they are terminated if it times out or if `terminate`.
+        """
+        if self.closed:
+            return
+        if self._waiting is not None and not terminate:
+            try:
+                self.step_wait(timeout)
+            except (RuntimeError, mp.TimeoutError):
+                terminate = True
+
+        for i, process in enumerate(self.processes):
+            if terminate:
+                if process.is_alive():
+                    process.terminate()
+            elif process.is_alive():
+                self._send(i, "close", None)
+                self._receive(i)
+        for pipe, process in zip(self.parent_pipes, self.processes):
+            pipe.close()
+            process.join()
+
+        # drop the numpy views before releasing the shared memory they point into
+        for name in self._shared_array_names:
+            delattr(self, name)
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._shms = []
+        self.closed = True
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close(terminate=True)
+
+
+def _worker(index, env_fn, pipe, parent_pipe, buffers, agent_idxs):
+    parent_pipe.close()
+    shms = [shared_memory.SharedMemory(name=name) for name, _, _ in buffers]
+    # an optional fifth buffer holds the actions of the steps sent without data
+    obs, rewards, dones, alive_mask, *actions = (
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf)[index]
+        for shm, (_, shape, dtype) in zip(shms, buffers)
+    )
+    env = None
+    try:
+        env = make_parallel_env(env_fn.fn)
+        while True:
+            command, data = pipe.recv()
+            if command == "reset":
+                seed, return_info, options = data
+                infos = reset_env(
+                    env, seed, return_info, options, obs, alive_mask, agent_idxs
+                )
+                pipe.send((infos, True))
+            elif command == "step":
+                infos = step_env(
+                    env,
+                    actions[0] if data is None else data,
+                    obs,
+                    rewards,
+                    dones,
+                    alive_mask,
+                    agent_idxs,
+                )
+                pipe.send((infos, True))
+            elif command == "render":
+                pipe.send((env.render(data), True))
+            elif command == "close":
+                pipe.send((None, True))
+                break
+            else:
+                raise RuntimeError(f"Received unknown command `{command}`.")
+    except (KeyboardInterrupt, Exception):
+        pipe.send((traceback.format_exc(), False))
+    finally:
+        if env is not None:
+            env.close()
+        del obs, rewards, dones, alive_mask, actions
+        for shm in shms:
+            shm.close()
+        pipe.close()
@@ -0,0 +1,86 @@
+from .vector_env import (
+    VectorParallelEnv,
+    make_parallel_env,
+    reset_env,
+    seed_list,
+    stacked_observation_space,
+    step_env,
+)
+
+
+class SyncVectorParallelEnv(VectorParallelEnv):
+    """
+    Runs a list of ParallelEnvs one after the other in the current process.
+
+    All environments must share the same `possible_agents` and a single
+    stackable observation space. Example:
+
+        env = SyncVectorParallelEnv([simple_spread_v2.parallel_env] * 8)
+        obs = env.reset(seed=42)  # shape (8, 3, 18)
+        obs, rewards, dones, infos = env.step(actions)  # actions shape (8, 3)
+    """
+
+    def __init__(self, env_fns, copy=True):
+        self.env_fns = env_fns
+        self.envs = [make_parallel_env(env_fn) for env_fn in env_fns]
+        env_0 = self.envs[0]
+        assert hasattr(
+            env_0, "possible_agents"
+        ), "vector environments need possible_agents to be defined"
+        for env in self.envs[1:]:
+            assert (
+                env.possible_agents == env_0.possible_agents
+            ), "all sub-environments must have the same possible_agents"
+
+        super().__init__(
+            num_envs=len(self.envs),
+            metadata=env_0.metadata,
+            possible_agents=env_0.possible_agents,
+            observation_space=stacked_observation_space(env_0, env_0.possible_agents),
+            copy=copy,
+        )
+
+    def observation_space(self, agent):
+        return self.envs[0].observation_space(agent)
+
+    def action_space(self, agent):
+        return self.envs[0].action_space(agent)
+
+    def reset(self, seed=None, return_info=False, options=None):
+        all_infos = [
+            reset_env(
+                env,
+                env_seed,
+                return_info,
+                options,
+                self._observations[i],
+                self.alive_mask[i],
+                self._agent_idxs,
+            )
+            for i, (env, env_seed) in enumerate(
+                zip(self.envs, seed_list(seed, self.num_envs))
+            )
+        ]
+        return self._reset_results(all_infos, return_info)
+
+    def step(self, actions):
+        all_infos = [
+            step_env(
+                env,
+                actions[i],
+                self._observations[i],
+                self._rewards[i],
+                self._dones[i],
+                self.alive_mask[i],
+                self._agent_idxs,
+            )
+            for i, env in enumerate(self.envs)
+        ]
+        return self._step_results(all_infos)
+
+    def render(self, mode="human"):
+        return self.envs[0].render(mode)
+
+    def close(self):
+        for env in self.envs:
+            env.close()
@@ -0,0 +1,198 @@
+import gym
+import numpy as np
+
+from ..conversions import aec_to_parallel
+from ..env import AECEnv
+
+
+def make_parallel_env(env_fn):
+    """
+    Builds a sub-environment, converting AEC environments with `aec_to_parallel`.
+    """
+    env = env_fn()
+    if isinstance(env, AECEnv):
+        env = aec_to_parallel(env)
+    return env
+
+
+def stacked_observation_space(env, agents):
+    """
+    Returns the single observation space shared by all `agents` of `env`.
+
+    Vector environments store observations as one array of shape
+    (num_envs, num_agents, *obs_shape), so every agent must expose a Box or
+    Discrete observation space with the same shape and dtype.
+    """
+    spaces = [env.observation_space(agent) for agent in agents]
+    space_0 = spaces[0]
+    assert isinstance(
+        space_0, (gym.spaces.Box, gym.spaces.Discrete)
+    ), "vector environments only support Box and Discrete observation spaces"
+    for agent, space in zip(agents, spaces):
+        assert type(space) is type(space_0) and space.shape == space_0.shape, (
+            f"observation space of agent {agent} ({space}) does not match the one of "
+            f"agent {agents[0]} ({space_0}); vector environments need a single "
+            "stackable observation space"
+        )
+        assert space.dtype == space_0.dtype, (
+            f"observation dtype of agent {agent} ({space.dtype}) does not match "
+            f"the one of agent {agents[0]} ({space_0.dtype})"
+        )
+    return space_0
+
+
+def seed_list(seed, num_envs):
+    """
+    Expands `seed` (None, an int or a sequence of ints) into one seed per sub-environment.
+    """
+    if seed is None:
+        return [None] * num_envs
+    if isinstance(seed, (int, np.integer)):
+        return [int(seed) + i for i in range(num_envs)]
+    seeds = list(seed)
+    assert (
+        len(seeds) == num_envs
+    ), f"expected {num_envs} seeds, one per sub-environment, got {len(seeds)}"
+    return seeds
+
+
+def write_observations(obs_row, alive_row, observations, agent_idxs):
+    """
+    Writes an observation dict into the rows of one sub-environment; agents
+    missing from the dict are zeroed and marked as not alive.
+    """
+    obs_row.fill(0)
+    alive_row.fill(False)
+    for agent, obs in observations.items():
+        idx = agent_idxs[agent]
+        obs_row[idx] = obs
+        alive_row[idx] = True
+
+
+def reset_env(env, seed, return_info, options, obs_row, alive_row, agent_idxs):
+    """
+    Resets one sub-environment into its rows, returns its infos (or None).
+    """
+    if return_info:
+        observations, infos = env.reset(seed=seed, return_info=True, options=options)
+    else:
+        observations = env.reset(seed=seed, options=options)
+        infos = None
+    write_observations(obs_row, alive_row, observations, agent_idxs)
+    return infos
+
+
+def step_env(env, action_row, obs_row, reward_row, done_row, alive_row, agent_idxs):
+    """
+    Steps one sub-environment and writes the results into its rows.
+
+    If all agents are done, the environment is reset and the final observation
+    of each agent is stored in its info dict under `"terminal_observation"`,
+    as a copy: environments may return views of buffers that the reset
+    overwrites. Returns the per-agent info dict.
+    """
+    observations, rewards, dones, infos = env.step(
+        {agent: action_row[agent_idxs[agent]] for agent in env.agents}
+    )
+    write_observations(obs_row, alive_row, observations, agent_idxs)
+    reward_row.fill(0)
+    # agents that are absent from the step results are not alive
+    done_row[:] = ~alive_row
+    for agent, reward in rewards.items():
+        reward_row[agent_idxs[agent]] = reward
+    for agent, done in dones.items():
+        done_row[agent_idxs[agent]] = done
+
+    if env.agents:
+        alive_row.fill(False)
+        for agent in env.agents:
+            alive_row[agent_idxs[agent]] = True
+    else:
+        infos = {agent: dict(info) for agent, info in infos.items()}
+        for agent, obs in observations.items():
+            if isinstance(obs, np.ndarray):
+                obs = obs.copy()
+            infos.setdefault(agent, {})["terminal_observation"] = obs
+        write_observations(obs_row, alive_row, env.reset(), agent_idxs)
+    return infos
+
+
+class VectorParallelEnv:
+    """
+    Steps `num_envs` copies of a ParallelEnv at once, using a fixed agent layout.
+
+    Agent `possible_agents[j]` of sub-environment `i` always lives at index
+    `[i, j]` of the observation, reward and done arrays. Agents which are not
+    alive (not yet spawned or already done) get zeroed observations and rewards,
+    and `alive_mask[i, j]` tells which entries are meaningful. Sub-environments
+    whose agents are all done are reset automatically; the final observation of
+    each agent is then stored in its info dict under `"terminal_observation"`.
+
+    Environment constructors may return AEC environments, which are converted
+    with `aec_to_parallel`.
+    """
+
+    def __init__(self, num_envs, metadata, possible_agents, observation_space, copy):
+        self.num_envs = num_envs
+        self.metadata = metadata
+        self.possible_agents = possible_agents[:]
+        self.single_observation_space = observation_space
+        self.copy = copy
+
+        self._agent_idxs = {agent: i for i, agent in enumerate(self.possible_agents)}
+        self._observations = self._allocate(
+            (num_envs, self.max_num_agents) + observation_space.shape,
+            observation_space.dtype,
+        )
+        self._rewards = self._allocate((num_envs, self.max_num_agents), np.float64)
+        self._dones = self._allocate((num_envs, self.max_num_agents), np.bool_)
+        self.alive_mask = self._allocate((num_envs, self.max_num_agents), np.bool_)
+
+    @property
+    def max_num_agents(self):
+        return len(self.possible_agents)
+
+    def _allocate(self, shape, dtype):
+        return np.zeros(shape, dtype=dtype)
+
+    def reset(self, seed=None, return_info=False, options=None):
+        """
+        Resets every sub-environment and returns the stacked observations.
+
+        `seed` can be an int (sub-environment `i` is seeded with `seed + i`)
+        or a sequence with one seed per sub-environment.
+        """
+        raise NotImplementedError
+
+    def step(self, actions):
+        """
+        Receives an array of actions of shape (num_envs, num_agents, *act_shape).
+        Returns the stacked observations, rewards and dones, and a list with the
+        per-agent info dictionary of each sub-environment.
+
+        Actions of agents that are not alive are ignored.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def _reset_results(self, all_infos, return_info):
+        obs = self._observations.copy() if self.copy else self._observations
+        if not return_info:
+            return obs
+        else:
+            return obs, all_infos
+
+    def _step_results(self, all_infos):
+        if self.copy:
+            return (
+                self._observations.copy(),
+                self._rewards.copy(),
+                self._dones.copy(),
+                all_infos,
+            )
+        return self._observations, self._rewards, self._dones, all_infos
+
+    def __str__(self):
+        return f"{type(self).__name__}<{self.metadata.get('name', 'env')}, {self.num_envs}>"
@@ -1,7 +1,12 @@
-from .assert_out_of_bounds import AssertOutOfBoundsWrapper
+from .assert_out_of_bounds import (
+    AssertOutOfBoundsWrapper,
+    ParallelAssertOutOfBoundsWrapper,
+)
 from .base import BaseWrapper
 from .base_parallel import BaseParallelWraper
 from .capture_stdout import CaptureStdoutWrapper
 from .clip_out_of_bounds import ClipOutOfBoundsWrapper
-from .order_enforcing import OrderEnforcingWrapper
+from .fused import FusedWrapper
+from .order_enforcing import OrderEnforcingWrapper, ParallelOrderEnforcingWrapper
+from .profiling import ParallelProfilingWrapper, ProfilingWrapper
 from .terminate_illegal import TerminateIllegalWrapper
@@ -1,6 +1,7 @@
 from gym.spaces import Discrete
 
 from .base import BaseWrapper
+from .base_parallel import BaseParallelWraper
 
 
 class AssertOutOfBoundsWrapper(BaseWrapper):
@@ -26,3 +27,28 @@ class AssertOutOfBoundsWrapper(BaseWrapper):
 
     def __str__(self):
         return str(self.env)
+
+
+class ParallelAssertOutOfBoundsWrapper(BaseParallelWraper):
+    """
+    this wrapper crashes for out of bounds actions of parallel environments
+    Should be used for Discrete spaces
+    """
+
+    def __init__(self, env):
+        super().__init__(env)
+        assert all(
+            isinstance(self.action_space(agent), Discrete)
+            for agent in getattr(self, "possible_agents", [])
+        ), "should only use ParallelAssertOutOfBoundsWrapper for Discrete spaces"
+
+    def step(self, actions):
+        for agent in self.agents:
+            assert agent in actions, f"missing action of agent {agent}"
+            assert self.action_space(agent).contains(
+                actions[agent]
+            ), "action is not in action space"
+        return super().step(actions)
+
+    def __str__(self):
+        return str(self.env)
@@ -94,6 +94,9 @@ class BaseWrapper(AECEnv):
     def observe(self, agent):
         return self.env.observe(agent)
 
+    def observe_batch(self, agents):
+        return self.env.observe_batch(agents)
+
     def state(self):
         return self.env.state()
 
@@ -53,6 +53,28 @@ class BaseParallelWraper(ParallelEnv):
     def state(self):
         return self.env.state()
 
+    def observe_batch(self, agents):
+        return self.env.observe_batch(agents)
+
+    def snapshot(self):
+        return self.env.snapshot()
+
+    def restore(self, snapshot):
+        self.env.restore(snapshot)
+        self.agents = self.env.agents
+
+    def branches(self, num_branches):
+        # the wrapped environment restores its state between the branches,
+        # the agents are read again after each restore
+        branches = self.env.branches(num_branches)
+        try:
+            for branch in branches:
+                self.agents = self.env.agents
+                yield branch
+        finally:
+            branches.close()
+            self.agents = self.env.agents
+
     @property
     def observation_spaces(self):
         warnings.warn(
@@ -0,0 +1,189 @@
+import numpy as np
+
+from ..capture_stdout import capture_stdout
+from ..env_logger import EnvLogger
+from .assert_out_of_bounds import AssertOutOfBoundsWrapper
+from .base import BaseWrapper
+from .capture_stdout import CaptureStdoutWrapper
+from .clip_out_of_bounds import ClipOutOfBoundsWrapper
+from .order_enforcing import AECOrderEnforcingIterable, OrderEnforcingWrapper
+from .terminate_illegal import TerminateIllegalWrapper
+
+# returned by a step hook which handled the step itself
+_HANDLED = object()
+
+
+class FusedWrapper(BaseWrapper):
+    """
+    Collapses a stack of the standard wrappers (`OrderEnforcingWrapper`,
+    `AssertOutOfBoundsWrapper`, `ClipOutOfBoundsWrapper`,
+    `TerminateIllegalWrapper` and `CaptureStdoutWrapper`) into a single
+    wrapper with the same behavior.
+
+    The checks of every layer run in one `step`, and `agent_selection`,
+    `rewards`, `dones`, `infos`, `agents` and `_cumulative_rewards` are
+    copied once from the innermost environment instead of once by each layer
+    after every step. Fusing stops at the first wrapper of another type, which
+    is kept as the inner environment.
+    """
+
+    _step_hooks = {
+        OrderEnforcingWrapper: "_order_enforcing_step",
+        AssertOutOfBoundsWrapper: "_assert_out_of_bounds_step",
+        ClipOutOfBoundsWrapper: "_clip_out_of_bounds_step",
+        TerminateIllegalWrapper: "_terminate_illegal_step",
+        CaptureStdoutWrapper: None,
+    }
+
+    def __init__(self, env):
+        layers = []
+        while type(env) in self._step_hooks:
+            layers.append(env)
+            env = env.env
+
+        super().__init__(env)
+        if layers:
+            # CaptureStdoutWrapper adds render modes to the metadata
+            self.metadata = layers[0].metadata
+
+        self.layer_types = [type(layer) for layer in layers]
+        self._hooks = [
+            getattr(self, self._step_hooks[type(layer)])
+            for layer in layers
+            if self._step_hooks[type(layer)] is not None
+        ]
+        self._order_enforcing = OrderEnforcingWrapper in self.layer_types
+        self._capture_stdout = CaptureStdoutWrapper in self.layer_types
+        self._terminate_illegal = TerminateIllegalWrapper in self.layer_types
+        for layer in layers:
+            if isinstance(layer, TerminateIllegalWrapper):
+                self._illegal_value = layer._illegal_value
+                break
+        self._has_reset = False
+        self._has_rendered = False
+        self._has_updated = False
+        self._terminated = False
+        self._prev_obs = None
+
+    def reset(self, seed=None, return_info=False, options=None):
+        self._has_reset = True
+        self._has_updated = True
+        self._terminated = False
+        self._prev_obs = None
+        self.env.reset(seed=seed, options=options)
+        self._update_from_env()
+
+    def step(self, action):
+        for hook in self._hooks:
+            action = hook(action)
+            if action is _HANDLED:
+                return
+        self.env.step(action)
+        self._update_from_env()
+
+    def _update_from_env(self):
+        env = self.env
+        self.agent_selection = env.agent_selection
+        self.rewards = env.rewards
+        self.dones = env.dones
+        self.infos = env.infos
+        self.agents = env.agents
+        self._cumulative_rewards = env._cumulative_rewards
+
+    def observe(self, agent):
+        if self._order_enforcing and not self._has_reset:
+            EnvLogger.error_observe_before_reset()
+        obs = self.env.observe(agent)
+        if self._terminate_illegal and agent == self.agent_selection:
+            self._prev_obs = obs
+        return obs
+
+    def observe_batch(self, agents):
+        if self._order_enforcing and not self._has_reset:
+            EnvLogger.error_observe_before_reset()
+        return self.env.observe_batch(agents)
+
+    def state(self):
+        if self._order_enforcing and not self._has_reset:
+            EnvLogger.error_state_before_reset()
+        return self.env.state()
+
+    def render(self, mode="human", **kwargs):
+        if self._order_enforcing:
+            if not self._has_reset:
+                EnvLogger.error_render_before_reset()
+            assert mode in self.metadata["render_modes"]
+            self._has_rendered = True
+        if self._capture_stdout and mode == "ansi":
+            with capture_stdout() as stdout:
+                self.env.render("human")
+                return stdout.getvalue()
+        return self.env.render(mode, **kwargs)
+
+    def agent_iter(self, max_iter=2**63):
+        if not self._order_enforcing:
+            return super().agent_iter(max_iter)
+        if not self._has_reset:
+            EnvLogger.error_agent_iter_before_reset()
+        return AECOrderEnforcingIterable(self, max_iter)
+
+    def _order_enforcing_step(self, action):
+        if not self._has_reset:
+            EnvLogger.error_step_before_reset()
+        self._has_updated = True
+        if not self.agents:
+            EnvLogger.warn_step_after_done()
+            return _HANDLED
+        return action
+
+    def _assert_out_of_bounds_step(self, action):
+        assert (
+            action is None and self.dones[self.agent_selection]
+        ) or self.action_space(self.agent_selection).contains(
+            action
+        ), "action is not in action space"
+        return action
+
+    def _clip_out_of_bounds_step(self, action):
+        space = self.action_space(self.agent_selection)
+        if not (
+            action is None and self.dones[self.agent_selection]
+        ) and not space.contains(action):
+            assert (
+                space.shape == action.shape
+            ), f"action should have shape {space.shape}, has shape {action.shape}"
+            if np.isnan(action).any():
+                EnvLogger.error_nan_action()
+
+            EnvLogger.warn_action_out_of_bound(
+                action=action, action_space=space, backup_policy="clipping to space"
+            )
+            action = np.clip(action, space.low, space.high)
+        return action
+
+    def _terminate_illegal_step(self, action):
+        current_agent = self.agent_selection
+        if self._prev_obs is None:
+            self.observe(self.agent_selection)
+        assert (
+            "action_mask" in self._prev_obs
+        ), "action_mask must always be part of environment observation as an element in a dictionary observation to use the TerminateIllegalWrapper"
+        _prev_action_mask = self._prev_obs["action_mask"]
+        self._prev_obs = None
+        if self._terminated and self.dones[self.agent_selection]:
+            self._was_done_step(action)
+        elif not self.dones[self.agent_selection] and not _prev_action_mask[action]:
+            EnvLogger.warn_on_illegal_move()
+            self._cumulative_rewards[self.agent_selection] = 0
+            self.dones = {d: True for d in self.dones}
+            self.rewards = {d: 0 for d in self.dones}
+            self.rewards[current_agent] = float(self._illegal_value)
+            self._accumulate_rewards()
+            self._dones_step_first()
+            self._terminated = True
+        else:
+            return action
+        return _HANDLED
+
+    def __str__(self):
+        return str(self.env)
@@ -1,6 +1,7 @@
 from ..env import AECIterable, AECIterator
 from ..env_logger import EnvLogger
 from .base import BaseWrapper
+from .base_parallel import BaseParallelWraper
 
 
 class OrderEnforcingWrapper(BaseWrapper):
@@ -43,6 +44,11 @@ class OrderEnforcingWrapper(BaseWrapper):
             EnvLogger.error_observe_before_reset()
         return super().observe(agent)
 
+    def observe_batch(self, agents):
+        if not self._has_reset:
+            EnvLogger.error_observe_before_reset()
+        return super().observe_batch(agents)
+
     def state(self):
         if not self._has_reset:
             EnvLogger.error_state_before_reset()
@@ -82,3 +88,47 @@ class AECOrderEnforcingIterator(AECIterator):
         ), "need to call step() or reset() in a loop over `agent_iter`"
         self.env._has_updated = False
         return agent
+
+
+class ParallelOrderEnforcingWrapper(BaseParallelWraper):
+    """
+    check the call orders of parallel environments:
+
+    * error on calling step, observe_batch, state or render before reset
+    * warn on calling step after all agents are done
+    """
+
+    def __init__(self, env):
+        self._has_reset = False
+        super().__init__(env)
+
+    def render(self, mode="human"):
+        if not self._has_reset:
+            EnvLogger.error_render_before_reset()
+        assert mode in self.metadata["render_modes"]
+        return super().render(mode)
+
+    def step(self, actions):
+        if not self._has_reset:
+            EnvLogger.error_step_before_reset()
+        elif not self.agents:
+            EnvLogger.warn_step_after_done()
+            return {}, {}, {}, {}
+        return super().step(actions)
+
+    def observe_batch(self, agents):
+        if not self._has_reset:
+            EnvLogger.error_observe_before_reset()
+        return super().observe_batch(agents)
+
+    def state(self):
+        if not self._has_reset:
+            EnvLogger.error_state_before_reset()
+        return super().state()
+
+    def reset(self, seed=None, return_info=False, options=None):
+        self._has_reset = True
+        return super().reset(seed=seed, return_info=return_info, options=options)
+
+    def __str__(self):
+        return str(self.env)
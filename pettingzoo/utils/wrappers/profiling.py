@@ -0,0 +1,214 @@
+import bisect
+import time
+
+import numpy as np
+
+from .base import BaseWrapper
+from .base_parallel import BaseParallelWraper
+
+# upper edges (in seconds) of the wall-time histogram buckets: 1, 2 and 5
+# per decade from 1 microsecond to 10 seconds, the last bucket collects
+# everything slower
+HISTOGRAM_EDGES = [
+    float(f"{mantissa}e{exponent}")
+    for exponent in range(-6, 1)
+    for mantissa in (1, 2, 5)
+] + [10.0]
+
+
+def observation_nbytes(obs):
+    """
+    Size in bytes of the arrays of an observation, or of a dict/tuple of them.
+    Mappings that are not dicts (such as lazily computed observations) are not
+    counted, to avoid computing observations just to measure them.
+    """
+    if isinstance(obs, np.ndarray):
+        return obs.nbytes
+    if isinstance(obs, dict):
+        return sum(observation_nbytes(value) for value in obs.values())
+    if isinstance(obs, (tuple, list)):
+        return sum(observation_nbytes(value) for value in obs)
+    if isinstance(obs, np.generic):
+        return obs.nbytes
+    return 0
+
+
+class CallStats:
+    """
+    Call count and wall-time histogram of a method.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_EDGES) + 1)
+
+    def record(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration < self.min:
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+        self.histogram[bisect.bisect_left(HISTOGRAM_EDGES, duration)] += 1
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "histogram": list(self.histogram),
+        }
+
+
+class Profiler:
+    """
+    Collects the statistics of a profiling wrapper and calls
+    `callback(stats)` every `callback_interval` steps if a callback is given.
+    """
+
+    methods = ("reset", "step", "observe", "last", "state", "render")
+
+    def __init__(self, callback=None, callback_interval=1000):
+        assert callback_interval > 0, "callback_interval must be positive"
+        self.callback = callback
+        self.callback_interval = callback_interval
+        self.clear()
+
+    def clear(self):
+        self.calls = {method: CallStats() for method in self.methods}
+        self.observation_bytes = 0
+        self.observations = 0
+
+    def record(self, method, duration):
+        self.calls[method].record(duration)
+        if (
+            method == "step"
+            and self.callback is not None
+            and self.calls["step"].count % self.callback_interval == 0
+        ):
+            self.callback(self.stats())
+
+    def record_observations(self, nbytes, count=1):
+        self.observation_bytes += nbytes
+        self.observations += count
+
+    def stats(self):
+        return {
+            "calls": {method: stats.snapshot() for method, stats in self.calls.items()},
+            "histogram_edges": list(HISTOGRAM_EDGES),
+            "observations": self.observations,
+            "observation_bytes": self.observation_bytes,
+        }
+
+
+class ProfilingWrapper(BaseWrapper):
+    """
+    Records call counts and wall-time histograms of `reset`, `step`,
+    `observe`, `last`, `state` and `render`, and the number of bytes of
+    observation produced. Put it at different levels of a wrapper stack to
+    see how much time the wrappers below it take.
+
+    `stats()` returns a snapshot of the statistics; `last` includes the time
+    of the `observe` call it makes. If `callback` is given, it is called with
+    the statistics every `callback_interval` steps.
+    """
+
+    def __init__(self, env, callback=None, callback_interval=1000):
+        super().__init__(env)
+        self.profiler = Profiler(callback, callback_interval)
+
+    def stats(self):
+        return self.profiler.stats()
+
+    def clear_stats(self):
+        self.profiler.clear()
+
+    def reset(self, seed=None, return_info=False, options=None):
+        start = time.perf_counter()
+        super().reset(seed=seed, return_info=return_info, options=options)
+        self.profiler.record("reset", time.perf_counter() - start)
+
+    def step(self, action):
+        start = time.perf_counter()
+        super().step(action)
+        self.profiler.record("step", time.perf_counter() - start)
+
+    def observe(self, agent):
+        start = time.perf_counter()
+        obs = super().observe(agent)
+        self.profiler.record("observe", time.perf_counter() - start)
+        self.profiler.record_observations(observation_nbytes(obs))
+        return obs
+
+    def last(self, observe=True):
+        start = time.perf_counter()
+        res = super().last(observe)
+        self.profiler.record("last", time.perf_counter() - start)
+        return res
+
+    def state(self):
+        start = time.perf_counter()
+        state = super().state()
+        self.profiler.record("state", time.perf_counter() - start)
+        return state
+
+    def render(self, mode="human", **kwargs):
+        start = time.perf_counter()
+        res = super().render(mode, **kwargs)
+        self.profiler.record("render", time.perf_counter() - start)
+        return res
+
+
+class ParallelProfilingWrapper(BaseParallelWraper):
+    """
+    Parallel counterpart of `ProfilingWrapper`. The observations are measured
+    from the dicts returned by `reset` and `step`, and `observe` and `last`
+    are never recorded.
+    """
+
+    def __init__(self, env, callback=None, callback_interval=1000):
+        super().__init__(env)
+        self.profiler = Profiler(callback, callback_interval)
+
+    def stats(self):
+        return self.profiler.stats()
+
+    def clear_stats(self):
+        self.profiler.clear()
+
+    def _record_observations(self, observations):
+        if isinstance(observations, dict):
+            self.profiler.record_observations(
+                observation_nbytes(observations), len(observations)
+            )
+
+    def reset(self, seed=None, return_info=False, options=None):
+        start = time.perf_counter()
+        res = super().reset(seed=seed, return_info=return_info, options=options)
+        self.profiler.record("reset", time.perf_counter() - start)
+        self._record_observations(res[0] if return_info else res)
+        return res
+
+    def step(self, actions):
+        start = time.perf_counter()
+        res = super().step(actions)
+        self.profiler.record("step", time.perf_counter() - start)
+        self._record_observations(res[0])
+        return res
+
+    def state(self):
+        start = time.perf_counter()
+        state = super().state()
+        self.profiler.record("state", time.perf_counter() - start)
+        return state
+
+    def render(self, mode="human"):
+        start = time.perf_counter()
+        res = super().render(mode)
+        self.profiler.record("render", time.perf_counter() - start)
+        return res
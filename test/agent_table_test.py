@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from pettingzoo.butterfly import knights_archers_zombies_v10, pistonball_v6
+from pettingzoo.sisl import multiwalker_v9
+from pettingzoo.test import api_test
+from pettingzoo.utils.agent_table import AgentArrayDict, AgentList, AgentTable
+from pettingzoo.utils.conversions import parallel_to_aec_wrapper
+
+
+def test_agent_array_dict():
+    table = AgentTable(["a", "b", "c"])
+    rewards = table.fromkeys(["c", "a", "b"], 0, np.float64)
+    assert list(rewards) == ["c", "a", "b"]
+    rewards["a"] = 1.5
+    assert rewards == {"c": 0.0, "a": 1.5, "b": 0.0}
+
+    cumulative = rewards.copy()
+    cumulative.add(rewards)
+    assert cumulative == {"c": 0.0, "a": 3.0, "b": 0.0}
+
+    del rewards["a"]
+    assert "a" not in rewards and len(rewards) == 2
+    rewards.fill(2)
+    assert rewards == {"c": 2.0, "b": 2.0}
+
+    # agents that were not in the table get a new slot
+    rewards["d"] = 4
+    assert rewards["d"] == 4.0 and len(table) == 4
+
+    dones = table.fromkeys(["a", "b", "c"], False, bool)
+    assert dones.first_true() is None
+    dones["c"] = True
+    dones["b"] = True
+    assert dones.first_true() == "b"
+    assert dones["b"] is True
+    with pytest.raises(KeyError):
+        dones["e"]
+
+
+def test_agent_array_dict_matches_dict():
+    rng = np.random.default_rng(0)
+    agents = [f"agent_{i}" for i in range(20)]
+    table = AgentTable(agents[:10])
+    array_dict = AgentArrayDict(table, np.float64)
+    reference = {}
+    for _ in range(2000):
+        agent = agents[rng.integers(len(agents))]
+        if agent in reference and rng.random() < 0.5:
+            del reference[agent]
+            del array_dict[agent]
+        else:
+            reference[agent] = float(rng.integers(10))
+            array_dict[agent] = reference[agent]
+        assert list(array_dict.items()) == list(reference.items())
+        first = next((agent for agent, value in reference.items() if value), None)
+        assert array_dict.first_true() == first
+
+
+def test_agent_list_matches_list():
+    rng = np.random.default_rng(0)
+    agents = [f"agent_{i}" for i in range(20)]
+    agent_list = AgentTable(agents).agent_list(agents)
+    reference = agents[:]
+    for _ in range(200):
+        agent = agents[rng.integers(len(agents))]
+        if agent in reference:
+            reference.remove(agent)
+            agent_list.remove(agent)
+        else:
+            reference.append(agent)
+            agent_list.append(agent)
+        assert agent_list == reference and list(agent_list) == reference
+        assert len(agent_list) == len(reference)
+        if reference:
+            assert agent_list[0] == reference[0]
+            assert agent_list[-1] == reference[-1]
+        assert agent_list[1:] == reference[1:]
+    with pytest.raises(ValueError):
+        agent_list.remove("agent_20")
+    agent_list.insert(0, "agent_20")
+    assert agent_list[:] == ["agent_20"] + reference
+
+
+def _play(env, seed):
+    env.reset(seed=seed)
+    for agent in env.possible_agents:
+        env.action_space(agent).seed(seed)
+    history = []
+    for agent in env.agent_iter(2000):
+        obs, reward, done, info = env.last()
+        history.append((agent, float(reward), bool(done), list(env.agents)))
+        env.step(None if done else env.action_space(agent).sample())
+    return history
+
+
+@pytest.mark.parametrize(
+    "env_module", [multiwalker_v9, pistonball_v6, knights_archers_zombies_v10]
+)
+def test_agent_tables_match_dicts(env_module):
+    env = parallel_to_aec_wrapper(env_module.parallel_env(), agent_tables=True)
+    api_test(env, num_cycles=100)
+    assert isinstance(env.dones, AgentArrayDict)
+    assert isinstance(env.agents, AgentList)
+    for seed in range(2):
+        assert _play(env, seed) == _play(
+            parallel_to_aec_wrapper(env_module.parallel_env()), seed
+        )
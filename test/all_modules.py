@@ -61,6 +61,7 @@ from pettingzoo.mpe import (
     simple_reference_v2,
     simple_speaker_listener_v3,
     simple_spread_v2,
+    simple_swarm_v0,
     simple_tag_v2,
     simple_v2,
     simple_world_comm_v2,
@@ -134,6 +135,7 @@ all_environments = {
     "mpe/simple_reference_v2": simple_reference_v2,
     "mpe/simple_speaker_listener_v3": simple_speaker_listener_v3,
     "mpe/simple_spread_v2": simple_spread_v2,
+    "mpe/simple_swarm_v0": simple_swarm_v0,
     "mpe/simple_tag_v2": simple_tag_v2,
     "mpe/simple_world_comm_v2": simple_world_comm_v2,
     "mpe/simple_v2": simple_v2,
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from pettingzoo.atari import pong_v3, space_invaders_v2
+from pettingzoo.atari.base_atari_env import ParallelAtariEnv
+from pettingzoo.utils.conversions import parallel_wrapper_fn
+from pettingzoo.utils.wrappers import ParallelOrderEnforcingWrapper
+
+
+@pytest.mark.parametrize("env_module", [pong_v3, space_invaders_v2])
+def test_parallel_env_matches_aec_env(env_module):
+    env = env_module.parallel_env(max_cycles=60)
+    assert isinstance(env, ParallelOrderEnforcingWrapper)
+    assert isinstance(env.unwrapped, ParallelAtariEnv)
+    aec_env = parallel_wrapper_fn(env_module.env)(max_cycles=60)
+
+    observations = env.reset(seed=0)
+    expected = aec_env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    while env.agents:
+        for agent, obs in expected.items():
+            assert np.array_equal(observations[agent], obs)
+        actions = {
+            agent: int(rng.integers(env.action_space(agent).n)) for agent in env.agents
+        }
+        observations, rewards, dones, _ = env.step(actions)
+        expected, expected_rewards, expected_dones, _ = aec_env.step(actions)
+        assert rewards == expected_rewards
+        assert dones == expected_dones
+    assert not aec_env.agents
+
+
+def test_parallel_env_checks_actions_and_order():
+    env = pong_v3.parallel_env()
+    with pytest.raises(AssertionError):
+        env.step({agent: 0 for agent in env.possible_agents})
+    env.reset(seed=0)
+    with pytest.raises(AssertionError, match="not in action space"):
+        env.step({agent: 100 for agent in env.agents})
+    with pytest.raises(AssertionError, match="missing action"):
+        env.step({env.agents[0]: 0})
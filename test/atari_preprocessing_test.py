@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from pettingzoo.atari import pong_v3
+from pettingzoo.atari.base_atari_env import area_weights
+
+
+def _actions(env, step):
+    return {agent: (step + i) % 6 for i, agent in enumerate(env.agents)}
+
+
+def _frames(env, steps, frameskip):
+    # observations and rewards of every frame, stepped one frame at a time
+    observations = [env.reset(seed=0)["first_0"]]
+    rewards = []
+    for step in range(steps):
+        for _ in range(frameskip):
+            obs, rew, _, _ = env.step(_actions(env, step))
+            observations.append(obs["first_0"])
+            rewards.append(rew["first_0"])
+    return observations, rewards
+
+
+@pytest.mark.parametrize("obs_type", ["rgb_image", "grayscale_image", "ram"])
+def test_frameskip_and_stack(obs_type):
+    frames, frame_rewards = _frames(pong_v3.parallel_env(obs_type=obs_type), 40, 4)
+    env = pong_v3.parallel_env(obs_type=obs_type, frameskip=4, stack=3)
+    size = frames[0].shape[-1]
+    assert env.observation_space("first_0").shape == frames[0].shape[:-1] + (3 * size,)
+    obs = env.reset(seed=0)["first_0"]
+    assert not obs[..., : 2 * size].any()
+    assert np.array_equal(obs[..., 2 * size :], frames[0])
+    for step in range(40):
+        observations, rewards, _, _ = env.step(_actions(env, step))
+        obs = observations["first_0"]
+        assert env.observation_space("first_0").contains(obs)
+        assert rewards["first_0"] == sum(frame_rewards[4 * step : 4 * step + 4])
+        for k in range(3):
+            index = 4 * (step + k - 1)
+            expected = frames[index] if index >= 0 else np.zeros_like(frames[0])
+            assert np.array_equal(obs[..., k * size : (k + 1) * size], expected)
+
+
+def test_max_pool_and_resize():
+    frames, _ = _frames(pong_v3.parallel_env(obs_type="grayscale_image"), 20, 4)
+    env = pong_v3.parallel_env(
+        obs_type="grayscale_image", frameskip=4, max_pool=True, resize=(84, 84)
+    )
+    env.reset(seed=0)
+    rows = area_weights(210, 84).astype(np.float64)
+    columns = area_weights(160, 84).astype(np.float64)
+    for step in range(20):
+        obs = env.step(_actions(env, step))[0]["first_0"]
+        assert obs.shape == (84, 84, 1) and obs.dtype == np.uint8
+        pooled = np.maximum(frames[4 * step + 3], frames[4 * step + 4])[..., 0]
+        expected = rows @ pooled @ columns.T
+        assert np.abs(obs[..., 0] - expected).max() <= 0.5 + 1e-3
+
+
+@pytest.mark.parametrize("frameskip", [1, (1, 4)])
+def test_max_pool_needs_frameskip(frameskip):
+    with pytest.raises(AssertionError):
+        pong_v3.parallel_env(
+            obs_type="grayscale_image", frameskip=frameskip, max_pool=True
+        )
+
+
+def test_observe_batch_keeps_stack():
+    # batched reads between steps do not advance the ring of stacked frames
+    env = pong_v3.parallel_env(obs_type="grayscale_image", frameskip=2, stack=3)
+    reference = pong_v3.parallel_env(obs_type="grayscale_image", frameskip=2, stack=3)
+    obs = env.reset(seed=0)["first_0"]
+    reference.reset(seed=0)
+    for step in range(10):
+        for _ in range(3):
+            batch = env.unwrapped.observe_batch(env.agents)
+            assert np.array_equal(batch[0], obs)
+        obs = env.step(_actions(env, step))[0]["first_0"]
+        expected = reference.step(_actions(reference, step))[0]["first_0"]
+        assert np.array_equal(obs, expected)
+
+
+def test_area_weights():
+    weights = area_weights(210, 84)
+    np.testing.assert_allclose(weights.sum(axis=1), 1, rtol=1e-6)
+    np.testing.assert_allclose(weights.sum(axis=0), 84 / 210, rtol=1e-6)
+    assert np.array_equal(area_weights(4, 2), [[0.5, 0.5, 0, 0], [0, 0, 0.5, 0.5]])
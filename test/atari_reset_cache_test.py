@@ -0,0 +1,103 @@
+import time
+
+import numpy as np
+import pytest
+
+from pettingzoo.atari import pong_v3
+
+
+def _rollout(env, seed, steps, start=0):
+    observations = [env.reset(seed=seed)["first_0"].copy()] if seed is not None else []
+    rewards = []
+    for step in range(start, start + steps):
+        actions = {agent: (3 * step + i) % 6 for i, agent in enumerate(env.agents)}
+        obs, rew, _, _ = env.step(actions)
+        observations.append(obs["first_0"].copy())
+        rewards.append(rew["first_0"])
+    return observations, rewards
+
+
+def _assert_same(actual, expected):
+    assert len(actual[0]) == len(expected[0])
+    for obs, expected_obs in zip(actual[0], expected[0]):
+        assert np.array_equal(obs, expected_obs)
+    assert actual[1] == expected[1]
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"obs_type": "ram", "frameskip": (2, 5)}])
+def test_cached_reset_matches_fresh_env(kwargs):
+    env = pong_v3.parallel_env(reset_cache_size=2, **kwargs)
+    for seed in [3, 5, 3, 5]:
+        _assert_same(
+            _rollout(env, seed, 200),
+            _rollout(pong_v3.parallel_env(**kwargs), seed, 200),
+        )
+    assert len(env.unwrapped._reset_cache) == 2
+
+
+def test_reset_cache_eviction():
+    env = pong_v3.parallel_env(reset_cache_size=2).unwrapped
+    for seed in [1, 2, 1, 3]:
+        env.reset(seed=seed)
+    cache = env._reset_cache
+    assert [key[-1] for key in cache] == [1, 3]
+    env.close()
+    assert not cache
+
+
+def test_render_after_cached_reset():
+    env = pong_v3.parallel_env(reset_cache_size=1)
+    _rollout(env, 0, 50)
+    obs = env.reset(seed=0)["first_0"]
+    # the ALE does not restore the screen, the one of the cache is rendered
+    assert np.array_equal(env.render("rgb_array"), obs)
+    obs = env.step({agent: 0 for agent in env.agents})[0]["first_0"]
+    assert np.array_equal(env.render("rgb_array"), obs)
+    env.close()
+
+
+def test_branches_restore_state():
+    env = pong_v3.parallel_env(obs_type="grayscale_image", stack=2, frameskip=(2, 4))
+    _rollout(env, 0, 30)
+    rollouts = []
+    for branch in env.branches(3):
+        rollouts.append(_rollout(env, None, 50, start=30))
+    _assert_same(rollouts[1], rollouts[0])
+    _assert_same(rollouts[2], rollouts[0])
+    # the environment is back where the branches started
+    _assert_same(_rollout(env, None, 50, start=30), rollouts[0])
+
+
+def test_branches_to_the_end_of_the_episode():
+    env = pong_v3.parallel_env(max_cycles=5)
+    _rollout(env, 0, 2)
+    snapshot = env.snapshot()
+    rollouts = []
+    for branch in env.branches(2):
+        rollouts.append(_rollout(env, None, 3, start=2))
+        assert not env.agents
+    _assert_same(rollouts[1], rollouts[0])
+    # the wrappers see the agents of the restored state again
+    assert env.agents == env.possible_agents
+    _assert_same(_rollout(env, None, 3, start=2), rollouts[0])
+    assert not env.agents
+    env.restore(snapshot)
+    assert env.agents == env.possible_agents
+    _assert_same(_rollout(env, None, 3, start=2), rollouts[0])
+    snapshot.release()
+
+
+def test_reset_cache_speed(record_property):
+    def seeded_resets(env):
+        env.reset(seed=0)
+        start = time.perf_counter()
+        for _ in range(20):
+            env.reset(seed=0)
+        return (time.perf_counter() - start) / 20
+
+    # recorded for benchmarking, not asserted on
+    record_property("reset_seconds", seeded_resets(pong_v3.parallel_env()))
+    record_property(
+        "cached_reset_seconds",
+        seeded_resets(pong_v3.parallel_env(reset_cache_size=1)),
+    )
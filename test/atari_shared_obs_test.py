@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from pettingzoo.atari import warlords_v3
+from pettingzoo.test import parallel_api_test
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"obs_type": "ram"},
+        {"obs_type": "grayscale_image", "resize": (84, 84), "stack": 4},
+    ],
+)
+def test_shared_obs_matches_copies(kwargs):
+    env = warlords_v3.parallel_env(**kwargs)
+    shared_env = warlords_v3.parallel_env(shared_obs=True, **kwargs)
+    expected = env.reset(seed=0)
+    observations = shared_env.reset(seed=0)
+    first = observations["first_0"]
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        views = list(observations.values())
+        assert all(view is first for view in views)
+        assert not first.flags.writeable
+        with pytest.raises(ValueError):
+            first[...] = 0
+        for agent, obs in expected.items():
+            assert np.array_equal(observations[agent], obs)
+
+        batch = shared_env.unwrapped.observe_batch(shared_env.agents)
+        assert batch.shape == (len(shared_env.agents),) + first.shape
+        assert batch.strides[0] == 0 and np.shares_memory(batch, first)
+
+        actions = {agent: int(rng.integers(6)) for agent in env.agents}
+        expected = env.step(actions)[0]
+        observations = shared_env.step(actions)[0]
+        # the buffer is updated in place
+        if observations:
+            assert observations["first_0"] is first
+
+
+def test_shared_obs_api():
+    parallel_api_test(warlords_v3.parallel_env(shared_obs=True), num_cycles=100)
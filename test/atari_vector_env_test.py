@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+import pytest
+
+from pettingzoo.atari import pong_v3, warlords_v3
+from pettingzoo.atari.atari_vector_env import AtariVectorEnv
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"obs_type": "ram"},
+        {"obs_type": "rgb_image"},
+        {"obs_type": "grayscale_image", "resize": (84, 84), "stack": 2},
+    ],
+)
+def test_vector_env_matches_single_envs(kwargs):
+    vec_env = AtariVectorEnv(pong_v3.parallel_env, 3, **kwargs)
+    envs = [pong_v3.parallel_env(**kwargs) for _ in range(3)]
+    obs_space = vec_env.observation_space("first_0")
+    assert vec_env.single_observation_space == obs_space
+    assert vec_env._actions.dtype == np.int32
+
+    vec_obs = vec_env.reset(seed=3)
+    assert vec_obs.shape == (3, 2) + obs_space.shape
+    assert vec_obs.dtype == np.uint8
+    for i, env in enumerate(envs):
+        observations = env.reset(seed=3 + i)
+        for j, agent in enumerate(env.possible_agents):
+            assert np.array_equal(vec_obs[i, j], observations[agent])
+
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        actions = rng.integers(6, size=(3, 2))
+        vec_obs, vec_rewards, vec_dones, _ = vec_env.step(actions)
+        for i, env in enumerate(envs):
+            observations, rewards, dones, _ = env.step(
+                {agent: actions[i, j] for j, agent in enumerate(env.agents)}
+            )
+            for j, agent in enumerate(env.possible_agents):
+                assert np.array_equal(vec_obs[i, j], observations[agent])
+                assert vec_rewards[i, j] == rewards[agent]
+                assert vec_dones[i, j] == dones[agent]
+    vec_env.close()
+
+
+def test_vector_env_autoreset():
+    vec_env = AtariVectorEnv(warlords_v3.parallel_env, 2, obs_type="ram", max_cycles=5)
+    vec_env.reset()
+    assert len(vec_env.processes) == 2
+    for _ in range(5):
+        obs, rewards, dones, infos = vec_env.step(np.zeros((2, 4), dtype=np.int32))
+    assert dones.all() and vec_env.alive_mask.all()
+    for infos_i in infos:
+        for agent in vec_env.possible_agents:
+            assert infos_i[agent]["terminal_observation"].shape == (128,)
+    vec_env.close()
+    assert vec_env.closed
+
+
+@pytest.mark.parametrize("action", [6, -1])
+def test_vector_env_rejects_invalid_actions(action):
+    vec_env = AtariVectorEnv(pong_v3.parallel_env, 2, obs_type="ram")
+    vec_env.reset(seed=0)
+    actions = np.zeros((2, 2), dtype=np.int64)
+    actions[1, 0] = action
+    with pytest.raises(AssertionError):
+        vec_env.step(actions)
+    # the invalid actions were not sent to the workers
+    vec_env.step(np.zeros((2, 2), dtype=np.int64))
+    vec_env.close()
+
+
+def test_vector_env_startup(record_property):
+    # recorded for benchmarking, not asserted on
+    start = time.perf_counter()
+    envs = [pong_v3.parallel_env() for _ in range(4)]
+    record_property("separate_startup_seconds", time.perf_counter() - start)
+    for env in envs:
+        env.close()
+    start = time.perf_counter()
+    vec_env = AtariVectorEnv(pong_v3.parallel_env, 4)
+    record_property("forked_startup_seconds", time.perf_counter() - start)
+    assert len(vec_env.processes) == 4
+    vec_env.close()
+
+
+def test_restarted_workers_get_new_seeds():
+    # the random frameskip depends on the seed of the environment
+    vec_env = AtariVectorEnv(pong_v3.parallel_env, 2, obs_type="ram", frameskip=(2, 5))
+    vec_env.reset(seed=0)
+    for process in vec_env.processes:
+        process.kill()
+        process.join()
+    _, _, dones, infos = vec_env.step(np.zeros((2, 2), dtype=np.int64))
+    assert vec_env.num_restarts == [1, 1] and dones.all()
+    # both restarted workers are fresh copies of the template, but they are
+    # reset with different seeds and do not replay the same episode
+    rng = np.random.default_rng(0)
+    observations = []
+    for _ in range(200):
+        observations.append(vec_env.step(rng.integers(6, size=(1, 2)).repeat(2, 0))[0])
+    observations = np.array(observations)
+    assert not np.array_equal(observations[:, 0], observations[:, 1])
+    vec_env.close()
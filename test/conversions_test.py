@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from pettingzoo.butterfly import cooperative_pong_v5
+from pettingzoo.classic import tictactoe_v3
+from pettingzoo.mpe import simple_spread_v2, simple_tag_v2
+from pettingzoo.test.parallel_test import parallel_api_test
+from pettingzoo.utils.conversions import aec_to_parallel, turn_based_aec_to_parallel
+from pettingzoo.utils.lazy_observations import LazyObservationDict
+
+
+@pytest.mark.parametrize(
+    "env_module", [simple_spread_v2, simple_tag_v2, cooperative_pong_v5]
+)
+def test_fast_aec_to_parallel_matches_default(env_module):
+    env = aec_to_parallel(env_module.env())
+    fast_env = aec_to_parallel(env_module.env(), fast=True)
+    obs = env.reset(seed=0)
+    fast_obs = fast_env.reset(seed=0)
+    for agent in env.possible_agents:
+        env.action_space(agent).seed(0)
+
+    while env.agents:
+        for agent in obs:
+            np.testing.assert_array_equal(obs[agent], fast_obs[agent])
+        actions = {agent: env.action_space(agent).sample() for agent in env.agents}
+        obs, rewards, dones, infos = env.step(actions)
+        fast_obs, fast_rewards, fast_dones, fast_infos = fast_env.step(actions)
+        assert rewards == fast_rewards
+        assert dones == fast_dones
+        assert infos == fast_infos
+        assert env.agents == fast_env.agents
+
+
+@pytest.mark.parametrize("lazy_obs", [None, False])
+def test_fast_aec_to_parallel_reuses_containers(lazy_obs):
+    env = aec_to_parallel(simple_spread_v2.env(), fast=True, lazy_obs=lazy_obs)
+    parallel_api_test(env, num_cycles=100)
+    env.reset()
+    actions = {agent: 0 for agent in env.agents}
+    first = env.step(actions)
+    second = env.step(actions)
+    assert all(a is b for a, b in zip(first[1:], second[1:]))
+    # fast mode observes lazily unless lazy_obs=False
+    assert isinstance(first[0], LazyObservationDict) == (lazy_obs is None)
+    assert (first[0] is second[0]) == (lazy_obs is False)
+
+
+class CountingObserve:
+    def __init__(self, env):
+        self.observe = env.aec_env.observe
+        self.calls = []
+        env.aec_env.observe = self
+
+    def __call__(self, agent):
+        self.calls.append(agent)
+        return self.observe(agent)
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_lazy_obs_only_observes_accessed_agents(fast):
+    env = aec_to_parallel(simple_spread_v2.env(), fast=fast, lazy_obs=True)
+    parallel_api_test(env, num_cycles=50)
+    eager_env = aec_to_parallel(simple_spread_v2.env())
+    counter = CountingObserve(env)
+
+    obs = env.reset(seed=0)
+    eager_obs = eager_env.reset(seed=0)
+    assert set(obs) == set(eager_obs) and counter.calls == []
+    np.testing.assert_array_equal(obs["agent_1"], eager_obs["agent_1"])
+    assert counter.calls == ["agent_1"]
+
+    actions = {agent: 1 for agent in env.agents}
+    obs, _, _, _ = env.step(actions)
+    eager_obs, _, _, _ = eager_env.step(actions)
+    np.testing.assert_array_equal(obs["agent_2"], eager_obs["agent_2"])
+    np.testing.assert_array_equal(obs["agent_2"], obs["agent_2"])
+    assert counter.calls == ["agent_1", "agent_2"]
+
+    env.step(actions)
+    # observations that were read before the next step remain available
+    obs["agent_2"]
+    with pytest.raises(RuntimeError):
+        obs["agent_0"]
+
+
+def test_lazy_obs_turn_based():
+    env = turn_based_aec_to_parallel(tictactoe_v3.env(), lazy_obs=True)
+    eager_env = turn_based_aec_to_parallel(tictactoe_v3.env())
+    obs = env.reset(seed=0)
+    eager_obs = eager_env.reset(seed=0)
+    for agent in eager_obs:
+        np.testing.assert_array_equal(
+            obs[agent]["observation"], eager_obs[agent]["observation"]
+        )
+    obs, _, _, infos = env.step({"player_1": 4})
+    eager_obs, _, _, _ = eager_env.step({"player_1": 4})
+    active = infos["player_1"]["active_agent"]
+    np.testing.assert_array_equal(
+        obs[active]["action_mask"], eager_obs[active]["action_mask"]
+    )
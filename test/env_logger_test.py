@@ -0,0 +1,59 @@
+import numpy as np
+
+from pettingzoo.sisl import multiwalker_v9
+from pettingzoo.utils.env_logger import EnvLogger
+
+
+def _step_out_of_bounds(env, steps):
+    env.reset(seed=0)
+    while steps:
+        agent = env.agent_selection
+        if env.dones[agent]:
+            env.step(None)
+        else:
+            space = env.action_space(agent)
+            env.step(np.full(space.shape, 10, dtype=space.dtype))
+            steps -= 1
+        if not env.agents:
+            env.reset()
+
+
+def test_env_logger_is_bounded():
+    EnvLogger.flush()
+    EnvLogger.clear_counts()
+    EnvLogger.suppress_output()
+    try:
+        # ClipOutOfBoundsWrapper warns on every step
+        _step_out_of_bounds(multiwalker_v9.env(), 500)
+        assert EnvLogger.get_counts()["action_out_of_bound"] == 500
+        assert len(EnvLogger.mqueue) == EnvLogger.max_repeats
+    finally:
+        EnvLogger.unsuppress_output()
+        EnvLogger.flush()
+        EnvLogger.clear_counts()
+
+
+def test_env_logger_rate_limit():
+    max_queue_len = EnvLogger.max_queue_len
+    rate_limit_interval = EnvLogger.rate_limit_interval
+    EnvLogger.flush()
+    EnvLogger.clear_counts()
+    EnvLogger.suppress_output()
+    try:
+        EnvLogger.configure(max_queue_len=5, rate_limit_interval=1e9)
+        for _ in range(EnvLogger.max_repeats + 20):
+            EnvLogger.warn_step_after_done()
+        assert len(EnvLogger.mqueue) == 5
+        assert EnvLogger.get_counts() == {"step_after_done": EnvLogger.max_repeats + 20}
+
+        # once the interval has passed, the next warning reports the suppressed ones
+        EnvLogger.configure(rate_limit_interval=0)
+        EnvLogger.warn_step_after_done()
+        assert EnvLogger.mqueue[-1].endswith("(20 similar warnings suppressed)")
+    finally:
+        EnvLogger.configure(
+            max_queue_len=max_queue_len, rate_limit_interval=rate_limit_interval
+        )
+        EnvLogger.unsuppress_output()
+        EnvLogger.flush()
+        EnvLogger.clear_counts()
@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+import pytest
+
+from pettingzoo.butterfly import pistonball_v6
+from pettingzoo.classic import connect_four_v3, rps_v2, tictactoe_v3
+from pettingzoo.sisl import multiwalker_v9
+from pettingzoo.test import api_test
+from pettingzoo.utils.wrappers import FusedWrapper, OrderEnforcingWrapper
+
+
+@pytest.mark.parametrize(
+    "env_module",
+    [tictactoe_v3, connect_four_v3, rps_v2, pistonball_v6, multiwalker_v9],
+)
+def test_fused_wrapper_api(env_module):
+    env = FusedWrapper(env_module.env())
+    assert OrderEnforcingWrapper in env.layer_types
+    assert str(env) == str(env_module.env())
+    api_test(env, num_cycles=200)
+
+
+def _illegal_actions(env_fn, seed):
+    # plays random actions, many of them illegal, and records everything
+    env = env_fn()
+    rng = random.Random(seed)
+    history = []
+    env.reset(seed=seed)
+    for _ in range(3):
+        for agent in env.agent_iter(100):
+            obs, reward, done, info = env.last()
+            action = None if done else rng.randrange(env.action_space(agent).n)
+            history.append(
+                (agent, obs["observation"].tolist(), reward, done, sorted(env.agents))
+            )
+            env.step(action)
+        history.append(dict(env._cumulative_rewards))
+        env.reset(seed=seed)
+    return history
+
+
+@pytest.mark.parametrize("env_module", [tictactoe_v3, connect_four_v3])
+def test_fused_terminate_illegal_matches_stack(env_module):
+    for seed in range(5):
+        assert _illegal_actions(env_module.env, seed) == _illegal_actions(
+            lambda: FusedWrapper(env_module.env()), seed
+        )
+
+
+def test_fused_order_enforcing():
+    env = FusedWrapper(tictactoe_v3.env())
+    with pytest.raises(AssertionError):
+        env.step(0)
+    with pytest.raises(AssertionError):
+        env.observe("player_1")
+    env.reset()
+    with pytest.raises(AssertionError):
+        for agent in env.agent_iter():
+            pass
+
+
+def test_fused_clip_out_of_bounds():
+    env = FusedWrapper(multiwalker_v9.env())
+    env.reset(seed=0)
+    agent = env.agent_selection
+    space = env.action_space(agent)
+    env.step(np.full(space.shape, 10, dtype=space.dtype))
+    # the clipped action was accepted and the next agent plays
+    assert env.agent_selection != agent
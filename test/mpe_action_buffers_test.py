@@ -0,0 +1,37 @@
+import numpy as np
+
+from pettingzoo.mpe import simple_reference_v2, simple_speaker_listener_v3
+
+
+def test_actions_written_in_place():
+    env = simple_reference_v2.parallel_env()
+    env.reset(seed=0)
+    world = env.unwrapped.world
+    action_u, action_c = world.action_u, world.action_c
+    for _ in range(3):
+        # move right and say word 3
+        env.step({agent: 2 + 5 * 3 for agent in env.agents})
+        assert world.action_u is action_u and world.action_c is action_c
+        for i, agent in enumerate(world.agents):
+            assert np.shares_memory(agent.action.u, action_u[i])
+            assert np.shares_memory(agent.action.c, action_c[i])
+    assert np.array_equal(action_u, [[5.0, 0.0], [5.0, 0.0]])
+    assert np.array_equal(action_c, np.eye(world.dim_c)[[3, 3]])
+    assert np.array_equal(world.agents[0].state.c, np.eye(world.dim_c)[3])
+    env.reset(seed=1)
+    assert world.action_u is action_u
+
+
+def test_continuous_actions():
+    env = simple_speaker_listener_v3.parallel_env(continuous_actions=True)
+    env.reset(seed=0)
+    world = env.unwrapped.world
+    speaker, listener = world.agents
+    message = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+    movement = np.array([0.0, 0.5, 0.25, 0.0, 1.0], dtype=np.float32)
+    env.step({"speaker_0": message, "listener_0": movement})
+    assert np.array_equal(speaker.action.c, message)
+    assert np.array_equal(speaker.action.u, [0.0, 0.0])
+    assert np.array_equal(listener.action.u, [0.25 * 5.0, -1.0 * 5.0])
+    assert not listener.action.c.any()
+    assert not listener.state.c.any()
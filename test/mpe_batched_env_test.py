@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from pettingzoo.mpe import (
+    simple_adversary_v2,
+    simple_crypto_v2,
+    simple_push_v2,
+    simple_reference_v2,
+    simple_speaker_listener_v3,
+    simple_spread_v2,
+    simple_tag_v2,
+    simple_v2,
+    simple_world_comm_v2,
+)
+from pettingzoo.mpe._mpe_utils.batched_env import BatchedSimpleEnv
+
+env_modules = [
+    (simple_v2, {}),
+    (simple_adversary_v2, {}),
+    (simple_crypto_v2, {}),
+    (simple_push_v2, {}),
+    (simple_reference_v2, {}),
+    (simple_speaker_listener_v3, {}),
+    (simple_spread_v2, {}),
+    (simple_spread_v2, {"N": 6}),
+    (simple_tag_v2, {}),
+    (simple_tag_v2, {"num_good": 3, "num_adversaries": 8, "num_obstacles": 3}),
+    (simple_world_comm_v2, {}),
+]
+
+
+def _sample_actions(batched, rng):
+    if batched.continuous_actions:
+        return rng.random(
+            (batched.num_envs, batched.max_num_agents, batched.action_dims.max()),
+            dtype=np.float32,
+        )
+    return np.stack(
+        [
+            rng.integers(batched.action_space(agent).n, size=batched.num_envs)
+            for agent in batched.possible_agents
+        ],
+        axis=1,
+    )
+
+
+def _check_observations(batched_obs, observations, batched):
+    for j, agent in enumerate(batched.possible_agents):
+        obs = observations[agent]
+        np.testing.assert_allclose(batched_obs[j, : len(obs)], obs, atol=1e-6)
+        assert not batched_obs[j, len(obs) :].any()
+
+
+@pytest.mark.parametrize("continuous_actions", [False, True])
+@pytest.mark.parametrize(("env_module", "kwargs"), env_modules)
+def test_batched_matches_parallel_env(env_module, kwargs, continuous_actions):
+    kwargs = dict(kwargs, max_cycles=5, continuous_actions=continuous_actions)
+    batched = BatchedSimpleEnv(env_module.raw_env, 3, **kwargs)
+    envs = [env_module.parallel_env(**kwargs) for _ in range(batched.num_envs)]
+
+    batched_obs = batched.reset(seed=3)
+    assert batched_obs.shape == (3, batched.max_num_agents, batched.obs_dims.max())
+    for i, env in enumerate(envs):
+        _check_observations(batched_obs[i], env.reset(seed=3 + i), batched)
+
+    rng = np.random.default_rng(0)
+    for _ in range(12):
+        actions = _sample_actions(batched, rng)
+        batched_obs, batched_rewards, batched_dones, infos = batched.step(actions)
+        for i, env in enumerate(envs):
+            observations, rewards, dones, _ = env.step(
+                {
+                    agent: actions[i, j, : batched.action_dims[j]]
+                    if continuous_actions
+                    else actions[i, j]
+                    for j, agent in enumerate(env.possible_agents)
+                }
+            )
+            for j, agent in enumerate(env.possible_agents):
+                assert batched_rewards[i, j] == pytest.approx(rewards[agent])
+                assert batched_dones[i, j] == dones[agent]
+            if not env.agents:
+                terminal = {
+                    agent: info["terminal_observation"]
+                    for agent, info in infos[i].items()
+                }
+                for agent, obs in observations.items():
+                    np.testing.assert_allclose(terminal[agent], obs, atol=1e-6)
+                observations = env.reset()
+            _check_observations(batched_obs[i], observations, batched)
+
+
+def test_batched_world_axis():
+    batched = BatchedSimpleEnv(simple_spread_v2.raw_env, 64, copy=False)
+    obs = batched.reset(seed=0)
+    assert obs.shape == (64, 3, 18)
+    assert obs.dtype == np.float32
+    actions = np.zeros((64, 3), dtype=np.int64)
+    obs, rewards, dones, infos = batched.step(actions)
+    assert rewards.shape == dones.shape == (64, 3)
+    assert len(infos) == 64
+    assert batched.world.p_pos.shape == (64, 6, 2)
+    # different seeds give different worlds
+    assert not np.array_equal(obs[0], obs[1])
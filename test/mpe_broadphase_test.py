@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from pettingzoo.mpe import simple_spread_v2, simple_tag_v2, simple_world_comm_v2
+from pettingzoo.mpe._mpe_utils.core import candidate_pairs
+
+
+@pytest.mark.parametrize("n", [2, 10, 200, 1000])
+def test_candidate_pairs_superset(n):
+    rng = np.random.default_rng(n)
+    p_pos = rng.uniform(-3, 3, (n, 2))
+    radii = rng.uniform(0.01, 0.1, n)
+    margin = 0.05
+    i, j = candidate_pairs(p_pos, radii, margin)
+    assert (i < j).all()
+    found = set(zip(i.tolist(), j.tolist()))
+    assert len(found) == len(i)
+    assert list(zip(i.tolist(), j.tolist())) == sorted(found)
+
+    dist = np.sqrt(np.sum(np.square(p_pos[:, None] - p_pos[None]), axis=2))
+    close = dist < radii[:, None] + radii[None] + margin
+    expected = {(a, b) for a, b in zip(*np.nonzero(np.triu(close, 1)))}
+    assert expected <= found
+
+
+def test_contact_forces_match_all_pairs():
+    env = simple_spread_v2.parallel_env(N=60)
+    env.reset(seed=0)
+    world = env.unwrapped.world
+    entities = world.entities
+    p_force = world.apply_environment_force([None] * len(entities))
+
+    expected = [None] * len(entities)
+    for a, entity_a in enumerate(entities):
+        for b, entity_b in enumerate(entities):
+            if b <= a:
+                continue
+            [f_a, f_b] = world.get_collision_force(entity_a, entity_b)
+            if f_a is not None:
+                expected[a] = f_a + (0.0 if expected[a] is None else expected[a])
+            if f_b is not None:
+                expected[b] = f_b + (0.0 if expected[b] is None else expected[b])
+    assert any(np.any(f != 0) for f in expected if f is not None)
+    for force, expected_force in zip(p_force, expected):
+        if expected_force is None:
+            assert force is None
+        else:
+            assert np.array_equal(force, expected_force)
+
+
+@pytest.mark.parametrize(
+    ("env_module", "kwargs"),
+    [
+        (simple_spread_v2, {"N": 40}),
+        (simple_tag_v2, {"num_good": 10, "num_adversaries": 40}),
+        (simple_world_comm_v2, {"num_good": 10, "num_adversaries": 30}),
+    ],
+)
+def test_world_collisions_match_scenario(env_module, kwargs):
+    env = env_module.parallel_env(max_cycles=20, **kwargs)
+    env.reset(seed=0)
+    world = env.unwrapped.world
+    scenario = env.unwrapped.scenario
+    rng = np.random.default_rng(0)
+    while env.agents:
+        entities = world.entities
+        for a in entities:
+            for b in entities:
+                assert world.is_collision(a, b) == scenario.is_collision(a, b)
+        env.step(
+            {agent: rng.integers(env.action_space(agent).n) for agent in env.agents}
+        )
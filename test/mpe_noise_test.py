@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from pettingzoo.mpe import simple_reference_v2
+from pettingzoo.mpe._mpe_utils.batched_env import BatchedSimpleEnv
+
+
+def _add_noise(world):
+    for agent in world.agents:
+        agent.u_noise = 0.1
+        agent.c_noise = 0.2
+
+
+def _trajectory(env, seed):
+    observations = [env.reset(seed=seed)]
+    for step in range(20):
+        observations.append(
+            env.step({agent: (step + i) % 50 for i, agent in enumerate(env.agents)})[0]
+        )
+    return observations
+
+
+@pytest.mark.parametrize("vectorized_physics", [False, True])
+def test_noise_is_seeded(vectorized_physics):
+    trajectories = []
+    for _ in range(2):
+        env = simple_reference_v2.parallel_env(vectorized_physics=vectorized_physics)
+        _add_noise(env.unwrapped.world)
+        # the global random state must neither be used nor changed
+        np.random.seed(0)
+        trajectories.append(_trajectory(env, seed=4))
+        assert np.random.random() == np.random.RandomState(0).random()
+    for observations, expected in zip(*trajectories):
+        for agent, obs in observations.items():
+            assert np.array_equal(obs, expected[agent])
+
+
+def test_noise_does_not_change_resets():
+    noisy = simple_reference_v2.parallel_env()
+    _add_noise(noisy.unwrapped.world)
+    quiet = simple_reference_v2.parallel_env()
+    noisy_last = _trajectory(noisy, seed=1)[-1]
+    quiet_last = _trajectory(quiet, seed=1)[-1]
+    assert not np.array_equal(noisy_last["agent_0"], quiet_last["agent_0"])
+    noisy_obs = noisy.reset()
+    quiet_obs = quiet.reset()
+    for agent, obs in quiet_obs.items():
+        assert np.array_equal(noisy_obs[agent], obs)
+
+
+def test_batched_noise_matches_parallel_env():
+    batched = BatchedSimpleEnv(simple_reference_v2.raw_env, 3)
+    batched.world.u_noise[:] = 0.1
+    batched.world.c_noise[:] = 0.2
+    envs = [simple_reference_v2.parallel_env() for _ in range(batched.num_envs)]
+    batched.reset(seed=5)
+    for i, env in enumerate(envs):
+        _add_noise(env.unwrapped.world)
+        env.reset(seed=5 + i)
+    for step in range(10):
+        actions = np.full((3, 2), step % 50)
+        batched_obs = batched.step(actions)[0]
+        for i, env in enumerate(envs):
+            observations = env.step({agent: step % 50 for agent in env.agents})[0]
+            for j, agent in enumerate(env.possible_agents):
+                np.testing.assert_allclose(
+                    batched_obs[i, j], observations[agent], atol=1e-5
+                )
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from pettingzoo.mpe import (
+    simple_adversary_v2,
+    simple_crypto_v2,
+    simple_push_v2,
+    simple_reference_v2,
+    simple_speaker_listener_v3,
+    simple_spread_v2,
+    simple_tag_v2,
+    simple_v2,
+    simple_world_comm_v2,
+)
+
+env_modules = [
+    simple_v2,
+    simple_adversary_v2,
+    simple_crypto_v2,
+    simple_push_v2,
+    simple_reference_v2,
+    simple_speaker_listener_v3,
+    simple_spread_v2,
+    simple_tag_v2,
+]
+
+
+@pytest.mark.parametrize("continuous_actions", [False, True])
+@pytest.mark.parametrize("env_module", env_modules)
+def test_layout_matches_observation(env_module, continuous_actions):
+    env = env_module.parallel_env(continuous_actions=continuous_actions)
+    env.reset(seed=0)
+    for agent in env.possible_agents:
+        env.action_space(agent).seed(0)
+    unwrapped = env.unwrapped
+    assert unwrapped._observation_layout is not None
+    for _ in range(5):
+        state = unwrapped.state()
+        expected = [
+            unwrapped.scenario.observation(agent, unwrapped.world).astype(np.float32)
+            for agent in unwrapped.world.agents
+        ]
+        for agent, obs in zip(env.possible_agents, expected):
+            assert np.array_equal(unwrapped.observe(agent), obs)
+            assert np.shares_memory(unwrapped.observe(agent), state)
+        assert np.array_equal(state, np.concatenate(expected))
+        env.step({agent: env.action_space(agent).sample() for agent in env.agents})
+
+
+def test_observations_not_overwritten_by_step():
+    env = simple_spread_v2.parallel_env()
+    observations = env.reset(seed=0)
+    before = {agent: obs.copy() for agent, obs in observations.items()}
+    env.step({agent: 1 for agent in env.agents})
+    for agent, obs in observations.items():
+        assert np.array_equal(obs, before[agent])
+
+
+def test_scenario_without_layout():
+    env = simple_world_comm_v2.env()
+    env.reset(seed=0)
+    unwrapped = env.unwrapped
+    assert unwrapped._observation_layout is None
+    agent = env.agent_selection
+    assert env.observe(agent).shape == env.observation_space(agent).shape
@@ -0,0 +1,59 @@
+import subprocess
+import sys
+
+import numpy as np
+
+from pettingzoo.mpe import simple_spread_v2
+from pettingzoo.mpe._mpe_utils.batched_env import BatchedSimpleEnv
+from pettingzoo.mpe._mpe_utils.rendering import Rasterizer, camera_coordinates
+
+
+def test_no_pygame_without_render():
+    code = (
+        "import sys\n"
+        "from pettingzoo.mpe import simple_spread_v2\n"
+        "env = simple_spread_v2.parallel_env()\n"
+        "env.reset(seed=0)\n"
+        "env.step({agent: 0 for agent in env.agents})\n"
+        "assert 'pygame' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_rgb_array_is_headless():
+    env = simple_spread_v2.env()
+    env.reset(seed=0)
+    frame = env.render(mode="rgb_array")
+    assert frame.shape == (700, 700, 3) and frame.dtype == np.uint8
+    assert (frame != 255).any()
+    unwrapped = env.unwrapped
+    assert not unwrapped.renderOn
+    screen = unwrapped.screen
+    env.step(0)
+    env.render(mode="rgb_array")
+    assert unwrapped.screen is screen
+    env.close()
+
+
+def test_rasterizer():
+    p_pos = np.array([[0.5, 0.5], [-0.5, -0.25]])
+    colors = np.array([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+    out = np.zeros((100, 200, 3), dtype=np.uint8)
+    frame = Rasterizer(200, 100).draw(p_pos, [0.05, 0.05], colors, out=out)
+    assert frame is out
+    x, y = camera_coordinates(p_pos, 200, 100)
+    assert frame[int(y[0]), int(x[0])].tolist() == [200, 0, 0]
+    assert frame[int(y[1]), int(x[1])].tolist() == [0, 0, 200]
+    assert frame[0, 0].tolist() == [255, 255, 255]
+
+
+def test_batched_render():
+    batched = BatchedSimpleEnv(simple_spread_v2.raw_env, 4)
+    batched.rasterizer = Rasterizer(64, 48)
+    batched.reset(seed=0)
+    frames = batched.render()
+    assert frames.shape == (4, 48, 64, 3) and frames.dtype == np.uint8
+    world = batched.world
+    expected = batched.rasterizer.draw(world.p_pos[2], world.sizes, world.colors[2])
+    assert np.array_equal(frames[2], expected)
+    assert not np.array_equal(frames[0], frames[1])
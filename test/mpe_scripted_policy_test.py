@@ -0,0 +1,89 @@
+import numpy as np
+
+from pettingzoo.mpe import simple_tag_v2
+from pettingzoo.mpe._mpe_utils.batched_env import BatchedSimpleEnv
+from pettingzoo.mpe._mpe_utils.core import Action, Agent, ScriptedPolicy
+
+
+class Chase(ScriptedPolicy):
+    # pushes the agents towards the entity of index target
+    def __init__(self, target):
+        self.target = target
+        self.calls = 0
+
+    def act(self, world, agents, p_pos, p_vel):
+        self.calls += 1
+        delta = p_pos[..., [self.target], :] - p_pos[..., agents, :]
+        dist = np.sqrt(np.sum(np.square(delta), axis=-1, keepdims=True))
+        u = 3.0 * delta / dist
+        return u, np.zeros(u.shape[:-1] + (world.dim_c,))
+
+
+def chase(agent, world):
+    delta = world.agents[-1].state.p_pos - agent.state.p_pos
+    action = Action()
+    action.u = 3.0 * delta / np.sqrt(np.sum(np.square(delta)))
+    action.c = np.zeros(world.dim_c)
+    return action
+
+
+def _scripted_tag(callback, **kwargs):
+    env = simple_tag_v2.raw_env(**kwargs)
+    for agent in env.world.agents:
+        if agent.adversary:
+            agent.action_callback = callback
+    env.world.invalidate_agents()
+    return env
+
+
+def _observations(env, steps=20):
+    env.reset(seed=0)
+    observations = []
+    for _ in range(steps):
+        for agent in env.agents:
+            env.step(1)
+        observations.append(env.observe(env.agents[0]))
+    return np.array(observations)
+
+
+def test_scripted_policy_matches_callbacks():
+    policy = Chase(target=3)
+    expected = _observations(_scripted_tag(chase))
+    actual = _observations(_scripted_tag(policy, vectorized_physics=True))
+    assert policy.calls == 20
+    np.testing.assert_allclose(actual, expected, atol=1e-6)
+    # the adversaries did chase the good agent
+    assert not np.allclose(actual, _observations(simple_tag_v2.raw_env()))
+
+
+def test_batched_scripted_policy():
+    batched = BatchedSimpleEnv(lambda: _scripted_tag(Chase(target=3)), 2)
+    envs = [_scripted_tag(chase) for _ in range(2)]
+    batched.reset(seed=0)
+    for i, env in enumerate(envs):
+        env.reset(seed=i)
+    for _ in range(10):
+        batched_obs = batched.step(np.ones((2, 4), dtype=np.int64))[0]
+        for i, env in enumerate(envs):
+            for agent in env.agents:
+                env.step(1)
+            for j, agent in enumerate(env.possible_agents):
+                obs = env.observe(agent)
+                np.testing.assert_allclose(
+                    batched_obs[i, j, : len(obs)], obs, atol=1e-5
+                )
+
+
+def test_agent_partitions_are_cached():
+    world = _scripted_tag(chase).world
+    scripted = world.scripted_agents
+    assert world.scripted_agents is scripted
+    assert len(scripted) == 3 and len(world.policy_agents) == 1
+    # assigning a callback is noticed without invalidate_agents
+    world.agents[-1].action_callback = chase
+    assert len(world.scripted_agents) == 4 and not world.policy_agents
+    world.agents.append(Agent())
+    assert len(world.policy_agents) == 1
+    # a new list of the same size is noticed too
+    world.agents = world.agents[::-1]
+    assert world.scripted_agents[0] is world.agents[1]
@@ -0,0 +1,114 @@
+import time
+
+import numpy as np
+import pytest
+
+from pettingzoo.mpe import simple_swarm_v0
+from pettingzoo.mpe._mpe_utils.core import neighbor_pairs
+from pettingzoo.test import api_test, parallel_api_test
+from pettingzoo.utils.conversions import aec_to_parallel
+
+
+def _swarm(num_agents, **kwargs):
+    return simple_swarm_v0.env(
+        num_good=num_agents - num_agents // 5,
+        num_adversaries=num_agents // 5,
+        num_landmarks=num_agents // 10,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("continuous_actions", [False, True])
+def test_swarm_api(continuous_actions):
+    api_test(simple_swarm_v0.env(continuous_actions=continuous_actions))
+    parallel_api_test(
+        simple_swarm_v0.parallel_env(continuous_actions=continuous_actions)
+    )
+
+
+def test_neighbor_pairs():
+    rng = np.random.default_rng(0)
+    p_pos = rng.uniform(-3, 3, (300, 2))
+    i, j, dist = neighbor_pairs(p_pos, 0.4)
+    distances = np.sqrt(np.sum(np.square(p_pos[:, None] - p_pos[None]), axis=2))
+    expected = np.argwhere((distances < 0.4) & ~np.eye(300, dtype=bool))
+    assert sorted(zip(i, j)) == sorted(map(tuple, expected))
+    np.testing.assert_allclose(dist, distances[i, j])
+    assert np.all(np.diff(i) >= 0)
+    assert np.all(np.diff(dist)[np.diff(i) == 0] >= 0)
+
+
+def test_swarm_observations():
+    env = _swarm(200, num_neighbors=3, num_landmark_neighbors=2, obs_radius=0.6)
+    env.reset(seed=0)
+    for _ in range(200 * 3):
+        env.step(env.action_space(env.agent_selection).sample())
+    world = env.unwrapped.world
+    n = len(world.agents)
+    p_pos = world.positions()
+    distances = world.distances()
+    for agent in world.agents[::7]:
+        a = world.entity_index(agent)
+        obs = env.observe(agent.name)
+        assert obs.shape == (4 + 2 * 2 + 3 * 5,)
+        np.testing.assert_allclose(obs[2:4], agent.state.p_pos, rtol=1e-6)
+        landmarks = np.argsort(distances[a, n:]) + n
+        landmarks = [b for b in landmarks if distances[a, b] < 0.6][:2]
+        landmark_obs = obs[4:8].reshape(2, 2)
+        for slot, b in enumerate(landmarks):
+            np.testing.assert_allclose(
+                landmark_obs[slot], p_pos[b] - p_pos[a], atol=1e-6
+            )
+        assert not landmark_obs[len(landmarks) :].any()
+        others = [b for b in np.argsort(distances[a, :n]) if b != a]
+        others = [b for b in others if distances[a, b] < 0.6][:3]
+        agent_obs = obs[8:].reshape(3, 5)
+        for slot, b in enumerate(others):
+            other = world.agents[b]
+            np.testing.assert_allclose(
+                agent_obs[slot, :2], p_pos[b] - p_pos[a], atol=1e-6
+            )
+            np.testing.assert_allclose(
+                agent_obs[slot, 2:4], other.state.p_vel, atol=1e-6
+            )
+            assert agent_obs[slot, 4] == (
+                1 if other.adversary == agent.adversary else -1
+            )
+        assert not agent_obs[len(others) :].any()
+
+
+def test_swarm_rewards():
+    env = _swarm(300)
+    env.reset(seed=1)
+    world = env.unwrapped.world
+    scenario = env.unwrapped.scenario
+    for agent in world.agents:
+        caught = sum(
+            world.is_collision(agent, other)
+            for other in world.agents
+            if other is not agent and other.adversary != agent.adversary
+        )
+        if agent.adversary:
+            assert scenario.reward(agent, world) == 10 * caught
+            assert scenario.benchmark_data(agent, world) == caught
+        else:
+            assert scenario.reward(agent, world) <= -10 * caught
+
+
+def test_swarm_step_cost(record_property):
+    # the observations only cover the nearest neighbors, so the cost of a
+    # step of all agents grows about linearly with their number; the step
+    # times are recorded for benchmarking, not asserted on
+    for num_agents in (250, 1000, 4000):
+        env = aec_to_parallel(_swarm(num_agents), fast=True)
+        observations = env.reset(seed=0)
+        assert observations["agent_0"].shape == (52,)
+        rng = np.random.default_rng(0)
+        actions = dict(zip(env.possible_agents, rng.integers(5, size=num_agents)))
+        env.step(actions)
+        start = time.perf_counter()
+        for _ in range(3):
+            env.step(actions)
+            # the observations are lazy, reading them does the kNN work
+            assert env.observe_all().shape == (num_agents, 52)
+        record_property(f"step_seconds_{num_agents}", (time.perf_counter() - start) / 3)
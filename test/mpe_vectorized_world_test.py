@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from pettingzoo.mpe import (
+    simple_adversary_v2,
+    simple_crypto_v2,
+    simple_push_v2,
+    simple_reference_v2,
+    simple_speaker_listener_v3,
+    simple_spread_v2,
+    simple_tag_v2,
+    simple_v2,
+    simple_world_comm_v2,
+)
+from pettingzoo.mpe._mpe_utils.core import VectorizedWorld
+from pettingzoo.test import api_test
+
+env_fns = [
+    (simple_v2.env, {}),
+    (simple_adversary_v2.env, {}),
+    (simple_crypto_v2.env, {}),
+    (simple_push_v2.env, {}),
+    (simple_reference_v2.env, {}),
+    (simple_speaker_listener_v3.env, {}),
+    (simple_spread_v2.env, {}),
+    (simple_tag_v2.env, {}),
+    (simple_tag_v2.env, {"num_good": 5, "num_adversaries": 20, "num_obstacles": 5}),
+    (simple_tag_v2.env, {"num_good": 10, "num_adversaries": 40}),
+    (simple_world_comm_v2.env, {}),
+]
+
+
+def _trajectory(env_fn, kwargs, seed=0):
+    env = env_fn(max_cycles=50, **kwargs)
+    env.reset(seed=seed)
+    for i, agent in enumerate(env.possible_agents):
+        env.action_space(agent).seed(seed + i)
+    trajectory = []
+    for agent in env.agent_iter():
+        obs, reward, done, info = env.last()
+        trajectory.append((agent, obs, reward, done))
+        env.step(None if done else env.action_space(agent).sample())
+    env.close()
+    return trajectory
+
+
+@pytest.mark.parametrize("continuous_actions", [False, True])
+@pytest.mark.parametrize(("env_fn", "kwargs"), env_fns)
+def test_vectorized_physics_matches(env_fn, kwargs, continuous_actions):
+    kwargs = dict(kwargs, continuous_actions=continuous_actions)
+    expected = _trajectory(env_fn, kwargs)
+    actual = _trajectory(env_fn, dict(kwargs, vectorized_physics=True))
+    assert len(actual) == len(expected)
+    for (agent, obs, reward, done), (exp_agent, exp_obs, exp_reward, exp_done) in zip(
+        actual, expected
+    ):
+        assert agent == exp_agent
+        assert np.array_equal(obs, exp_obs)
+        assert reward == exp_reward
+        assert done == exp_done
+
+
+def test_vectorized_world_api():
+    env = simple_tag_v2.env(vectorized_physics=True)
+    assert isinstance(env.unwrapped.world, VectorizedWorld)
+    api_test(env)
+
+
+def test_vectorized_world_state_arrays():
+    env = simple_tag_v2.parallel_env(vectorized_physics=True)
+    env.reset(seed=0)
+    world = env.unwrapped.world
+    p_pos = world.positions()
+    assert not p_pos.flags.writeable
+    state_arrays = world.p_pos, world.p_vel
+    for _ in range(3):
+        env.step({agent: 1 for agent in env.agents})
+        # the arrays are updated in place, the states of the entities are
+        # views of their rows
+        assert world.p_pos is state_arrays[0] and world.p_vel is state_arrays[1]
+        for i, entity in enumerate(world.entities):
+            assert entity.state.p_pos.base is world.p_pos
+            np.testing.assert_array_equal(entity.state.p_pos, world.p_pos[i])
+        np.testing.assert_array_equal(world.positions(), world.p_pos)
+    # reset_world replaces the states, which are bound again
+    env.reset(seed=1)
+    world.step()
+    assert world.p_pos is not state_arrays[0]
+    assert all(entity.state.p_pos.base is world.p_pos for entity in world.entities)
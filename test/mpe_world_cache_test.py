@@ -0,0 +1,73 @@
+import numpy as np
+
+from pettingzoo.mpe import simple_spread_v2
+
+
+def test_relative_positions_and_distances():
+    env = simple_spread_v2.parallel_env(N=5)
+    env.reset(seed=0)
+    world = env.unwrapped.world
+    entities = world.entities
+    relative_pos = world.relative_positions()
+    distances = world.distances()
+    assert relative_pos.shape == (len(entities), len(entities), world.dim_p)
+    for i, entity_a in enumerate(entities):
+        assert world.entity_index(entity_a) == i
+        for j, entity_b in enumerate(entities):
+            delta_pos = entity_b.state.p_pos - entity_a.state.p_pos
+            assert np.array_equal(relative_pos[i, j], delta_pos)
+            assert distances[i, j] == np.sqrt(np.sum(np.square(delta_pos)))
+    # computed once per step
+    assert world.relative_positions() is relative_pos
+    assert world.distances() is distances
+
+
+def test_cache_invalidated_by_step_and_reset():
+    env = simple_spread_v2.parallel_env(N=5)
+    env.reset(seed=0)
+    world = env.unwrapped.world
+    distances = world.distances()
+    env.step({agent: 1 for agent in env.agents})
+    assert world.distances() is not distances
+    assert not np.array_equal(world.distances(), distances)
+    distances = world.distances()
+    env.reset(seed=1)
+    assert not np.array_equal(world.distances(), distances)
+
+
+def test_relative_positions_of_origins():
+    env = simple_spread_v2.parallel_env(N=5)
+    env.reset(seed=0)
+    world = env.unwrapped.world
+    # observing computes only the rows of the observing agents
+    env.unwrapped.observe(env.agents[0])
+    assert world._relative_positions is None
+    assert world._distances is None
+    origins = np.array([world.entity_index(lm) for lm in world.landmarks])
+    rows = world.relative_positions(origins)
+    distances = world.distances(origins)
+    row = world.relative_positions(origins[0])
+    assert world._relative_positions is None
+    assert np.array_equal(rows, world.relative_positions()[origins])
+    assert np.array_equal(row, world.relative_positions()[origins[0]])
+    assert np.array_equal(distances, world.distances()[origins])
+
+
+def test_contacts_match_collision_forces():
+    env = simple_spread_v2.parallel_env(N=5)
+    env.reset(seed=0)
+    env.step({agent: 1 for agent in env.agents})
+    world = env.unwrapped.world
+    entities = world.entities
+    a, b, force = world.contacts()
+    # computed once per step
+    assert world.contacts()[2] is force
+    assert len(a) == len(b) == len(force) > 0
+    for i, j, f in zip(a, b, force):
+        f_a, f_b = world.get_collision_force(entities[i], entities[j])
+        if f_a is not None:
+            assert np.array_equal(f_a, f)
+        if f_b is not None:
+            assert np.array_equal(f_b, -f)
+    env.step({agent: 1 for agent in env.agents})
+    assert world.contacts()[2] is not force
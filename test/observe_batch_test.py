@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from pettingzoo.butterfly import knights_archers_zombies_v10, pistonball_v6
+from pettingzoo.mpe import (
+    simple_adversary_v2,
+    simple_push_v2,
+    simple_reference_v2,
+    simple_spread_v2,
+    simple_tag_v2,
+    simple_v2,
+)
+from pettingzoo.sisl import multiwalker_v9, pursuit_v4
+from pettingzoo.utils.conversions import aec_to_parallel
+
+
+def _agent_groups(env):
+    # observe_batch needs observations of a single shape
+    groups = {}
+    for agent in env.agents:
+        groups.setdefault(env.observe(agent).shape, []).append(agent)
+    return list(groups.values())
+
+
+def _check_observe_batch(env):
+    for agents in _agent_groups(env):
+        batch = env.observe_batch(agents)
+        expected = np.stack([env.observe(agent) for agent in agents])
+        assert batch.dtype == expected.dtype
+        np.testing.assert_allclose(batch, expected, rtol=1e-6, atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    ("env_fn", "kwargs"),
+    [
+        (simple_v2.env, {}),
+        (simple_spread_v2.env, {}),
+        (simple_tag_v2.env, {}),
+        (simple_adversary_v2.env, {}),
+        (simple_push_v2.env, {}),
+        (simple_reference_v2.env, {}),
+        (pistonball_v6.env, {}),
+        (knights_archers_zombies_v10.env, {"vector_state": True}),
+        (knights_archers_zombies_v10.env, {"vector_state": False}),
+        (pursuit_v4.env, {}),
+        (multiwalker_v9.env, {}),
+    ],
+)
+def test_observe_batch_matches_observe(env_fn, kwargs):
+    env = env_fn(**kwargs)
+    env.reset(seed=0)
+    _check_observe_batch(env)
+    for i, agent in enumerate(env.agent_iter(max_iter=5 * env.num_agents)):
+        if env.dones[agent]:
+            env.step(None)
+        else:
+            env.action_space(agent).seed(i)
+            env.step(env.action_space(agent).sample())
+            _check_observe_batch(env)
+    env.close()
+
+
+def test_observe_batch_mixed_roles():
+    env = simple_tag_v2.env()
+    env.reset()
+    with pytest.raises(ValueError):
+        env.observe_batch(env.agents)
+
+
+def test_parallel_observe_all():
+    env = aec_to_parallel(simple_spread_v2.env())
+    obs = env.reset(seed=0)
+    np.testing.assert_array_equal(
+        env.observe_all(), np.stack([obs[agent] for agent in env.agents])
+    )
+
+
+def test_mpe_observe_batch_uses_layout_buffer():
+    env = simple_spread_v2.env()
+    env.reset(seed=0)
+    batch = env.observe_batch(env.agents)
+    # gathered from the buffer of the observation layout, like observe
+    np.testing.assert_array_equal(
+        batch, np.stack([env.observe(agent) for agent in env.agents])
+    )
+    assert env.observe_batch([]).shape[0] == 0
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from pettingzoo.classic import tictactoe_v3
+from pettingzoo.mpe import simple_spread_v2
+from pettingzoo.test.performance_benchmark import (
+    all_environments,
+    benchmark_modules,
+    compare_to_baseline,
+    load_env_modules,
+)
+
+
+def test_benchmark_modules():
+    results = benchmark_modules(
+        {
+            "mpe/simple_spread_v2": simple_spread_v2,
+            "classic/tictactoe_v3": tictactoe_v3,
+        },
+        duration=0.1,
+        warmup=0.05,
+        trials=2,
+    )
+    # the results must be JSON-serializable to be stored as a baseline
+    results = json.loads(json.dumps(results))
+    spread = results["results"]["mpe/simple_spread_v2"]
+    assert set(spread) == {"aec", "parallel"}
+    # the peak RSS of the process is reported once, not per environment
+    assert "peak_rss_kb" in results
+    for mode in spread.values():
+        assert "peak_rss_kb" not in mode
+        assert mode["steps_per_sec"] > 0
+        assert mode["trials"] == 2
+        assert abs(sum(mode["time_fraction"].values()) - 1) < 1e-6
+    # tictactoe has no parallel API
+    assert set(results["results"]["classic/tictactoe_v3"]) == {"aec"}
+
+    slower = json.loads(json.dumps(results))
+    slower["results"]["mpe/simple_spread_v2"]["aec"]["steps_per_sec"] /= 2
+    rows = compare_to_baseline(slower, results, threshold=0.1)
+    assert len(rows) == 3
+    regressions = [row for row in rows if row["regression"]]
+    assert [(row["env"], row["mode"]) for row in regressions] == [
+        ("mpe/simple_spread_v2", "aec")
+    ]
+
+
+def test_load_env_modules():
+    env_modules, errors = load_env_modules(
+        ["mpe/simple_spread_v2", "classic/not_an_env_v0"]
+    )
+    assert list(env_modules) == ["mpe/simple_spread_v2"]
+    assert env_modules["mpe/simple_spread_v2"].__name__ == simple_spread_v2.__name__
+    assert list(errors) == ["classic/not_an_env_v0"]
+
+
+def test_all_environments_match_test_suite():
+    try:
+        from .all_modules import all_environments as test_all_environments
+    except ImportError as e:
+        pytest.skip(f"not every environment can be imported: {e}")
+    assert set(all_environments) == set(test_all_environments)
@@ -0,0 +1,63 @@
+import numpy as np
+
+from pettingzoo.butterfly import pistonball_v6
+from pettingzoo.mpe import simple_spread_v2
+from pettingzoo.test import api_test, parallel_api_test
+from pettingzoo.utils.wrappers import ParallelProfilingWrapper, ProfilingWrapper
+
+
+def test_profiling_wrapper():
+    snapshots = []
+    env = ProfilingWrapper(
+        simple_spread_v2.env(max_cycles=10),
+        callback=snapshots.append,
+        callback_interval=10,
+    )
+    api_test(env, num_cycles=100)
+    env.clear_stats()
+    snapshots.clear()
+
+    env.reset()
+    steps = 0
+    for agent in env.agent_iter():
+        obs, reward, done, info = env.last()
+        env.step(None if done else env.action_space(agent).sample())
+        steps += 1
+    env.state()
+
+    stats = env.stats()
+    calls = stats["calls"]
+    assert calls["reset"]["count"] == 1
+    assert calls["step"]["count"] == steps
+    assert calls["last"]["count"] == steps
+    assert calls["observe"]["count"] == steps
+    assert calls["state"]["count"] == 1
+    assert calls["render"]["count"] == 0
+    for method in calls.values():
+        assert sum(method["histogram"]) == method["count"]
+        assert len(method["histogram"]) == len(stats["histogram_edges"]) + 1
+    assert stats["observations"] == steps
+    assert stats["observation_bytes"] == steps * obs.nbytes
+    assert len(snapshots) == steps // 10
+    assert snapshots[-1]["calls"]["step"]["count"] == steps - steps % 10
+
+
+def test_parallel_profiling_wrapper():
+    env = ParallelProfilingWrapper(pistonball_v6.parallel_env(max_cycles=20))
+    parallel_api_test(env, num_cycles=100)
+    env.clear_stats()
+
+    obs = env.reset()
+    steps = 0
+    while env.agents:
+        env.step({agent: env.action_space(agent).sample() for agent in env.agents})
+        steps += 1
+
+    stats = env.stats()
+    assert stats["calls"]["reset"]["count"] == 1
+    assert stats["calls"]["step"]["count"] == steps
+    assert stats["calls"]["observe"]["count"] == 0
+    agent_obs = next(iter(obs.values()))
+    assert isinstance(agent_obs, np.ndarray)
+    assert stats["observations"] == (steps + 1) * len(env.possible_agents)
+    assert stats["observation_bytes"] == stats["observations"] * agent_obs.nbytes
@@ -0,0 +1,214 @@
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+import pytest
+
+from pettingzoo.atari import pong_v3
+from pettingzoo.mpe import simple_spread_v2
+from pettingzoo.sisl import multiwalker_v9
+from pettingzoo.utils.conversions import aec_to_parallel_wrapper
+from pettingzoo.utils.vector import AsyncVectorParallelEnv, SyncVectorParallelEnv
+
+
+def sample_actions(vec_env):
+    return np.stack(
+        [
+            np.stack(
+                [
+                    vec_env.action_space(agent).sample()
+                    for agent in vec_env.possible_agents
+                ]
+            )
+            for _ in range(vec_env.num_envs)
+        ]
+    )
+
+
+def test_sync_vector_shapes_and_autoreset():
+    vec_env = SyncVectorParallelEnv(
+        [lambda: simple_spread_v2.parallel_env(max_cycles=5)] * 3
+    )
+    obs = vec_env.reset(seed=0)
+    obs_shape = vec_env.observation_space("agent_0").shape
+    assert obs.shape == (3, 3) + obs_shape
+    assert obs.dtype == np.float32
+    assert vec_env.alive_mask.all()
+
+    for step in range(5):
+        obs, rewards, dones, infos = vec_env.step(sample_actions(vec_env))
+        assert obs.shape == (3, 3) + obs_shape
+        assert rewards.shape == dones.shape == (3, 3)
+        assert len(infos) == 3
+
+    # the last step finished every episode: all sub-environments were reset
+    assert dones.all()
+    assert vec_env.alive_mask.all()
+    for infos_i in infos:
+        for agent in vec_env.possible_agents:
+            assert infos_i[agent]["terminal_observation"].shape == obs_shape
+
+
+def test_sync_vector_matches_single_env():
+    vec_env = SyncVectorParallelEnv([simple_spread_v2.parallel_env] * 2)
+    env = simple_spread_v2.parallel_env()
+    vec_obs = vec_env.reset(seed=[7, 8])
+    obs = env.reset(seed=8)
+    for j, agent in enumerate(env.possible_agents):
+        np.testing.assert_array_equal(vec_obs[1, j], obs[agent])
+
+    actions = np.ones((2, 3), dtype=np.int64)
+    vec_obs, vec_rewards, _, _ = vec_env.step(actions)
+    obs, rewards, _, _ = env.step({agent: 1 for agent in env.agents})
+    for j, agent in enumerate(env.possible_agents):
+        np.testing.assert_array_equal(vec_obs[1, j], obs[agent])
+        assert vec_rewards[1, j] == rewards[agent]
+
+
+def test_sync_vector_alive_mask():
+    vec_env = SyncVectorParallelEnv(
+        [
+            lambda: multiwalker_v9.parallel_env(
+                terminate_on_fall=False, remove_on_fall=True, max_cycles=100
+            )
+        ]
+        * 2
+    )
+    vec_env.reset(seed=0)
+    for _ in range(100):
+        vec_env.step(sample_actions(vec_env))
+        for env, alive in zip(vec_env.envs, vec_env.alive_mask):
+            expected = [agent in env.agents for agent in env.possible_agents]
+            assert list(alive) == expected
+
+
+class CrashingEnv(aec_to_parallel_wrapper):
+    """simple_spread which kills its process when every agent takes action 4"""
+
+    def __init__(self):
+        super().__init__(simple_spread_v2.env())
+
+    def step(self, actions):
+        if all(action == 4 for action in actions.values()):
+            os._exit(1)
+        return super().step(actions)
+
+
+def test_async_vector_matches_sync():
+    env_fns = [lambda: simple_spread_v2.parallel_env(max_cycles=10)] * 2
+    sync_env = SyncVectorParallelEnv(env_fns)
+    async_env = AsyncVectorParallelEnv(env_fns)
+    np.testing.assert_array_equal(sync_env.reset(seed=3), async_env.reset(seed=3))
+    for _ in range(15):
+        actions = sample_actions(sync_env)
+        async_env.step_async(actions)
+        sync_results = sync_env.step(actions)
+        async_results = async_env.step_wait()
+        for sync_res, async_res in zip(sync_results[:3], async_results[:3]):
+            np.testing.assert_array_equal(sync_res, async_res)
+        np.testing.assert_array_equal(sync_env.alive_mask, async_env.alive_mask)
+    async_env.close()
+
+
+def test_async_vector_accepts_aec_envs():
+    async_env = AsyncVectorParallelEnv([simple_spread_v2.env] * 2)
+    obs = async_env.reset(seed=0)
+    assert obs.shape == (2, 3) + async_env.observation_space("agent_0").shape
+    async_env.close()
+
+
+def test_async_vector_restarts_crashed_worker():
+    async_env = AsyncVectorParallelEnv([CrashingEnv] * 2)
+    async_env.reset(seed=0)
+    actions = np.zeros((2, 3), dtype=np.int64)
+    actions[1] = 4
+    obs, rewards, dones, infos = async_env.step(actions)
+    assert async_env.num_restarts == [0, 1]
+    assert dones[1].all() and not dones[0].any()
+    assert all(info["worker_restarted"] for info in infos[1].values())
+    assert async_env.alive_mask.all()
+    async_env.step(np.zeros((2, 3), dtype=np.int64))
+    async_env.close()
+
+    async_env = AsyncVectorParallelEnv([CrashingEnv], restart_on_crash=False)
+    async_env.reset()
+    with pytest.raises(RuntimeError):
+        async_env.step(np.full((1, 3), 4))
+    async_env.close(terminate=True)
+
+
+class SlowEnv(aec_to_parallel_wrapper):
+    """simple_spread whose steps take one second"""
+
+    def __init__(self):
+        super().__init__(simple_spread_v2.env())
+
+    def step(self, actions):
+        time.sleep(1)
+        return super().step(actions)
+
+
+class ResetCrashingEnv(aec_to_parallel_wrapper):
+    """simple_spread which kills its process on every reset"""
+
+    def __init__(self):
+        super().__init__(simple_spread_v2.env())
+
+    def reset(self, seed=None, return_info=False, options=None):
+        os._exit(1)
+
+
+def test_async_vector_step_wait_timeout():
+    async_env = AsyncVectorParallelEnv([simple_spread_v2.parallel_env] * 2 + [SlowEnv])
+    async_env.reset(seed=0)
+    actions = np.ones((3, 3), dtype=np.int64)
+    async_env.step_async(actions)
+    with pytest.raises(mp.TimeoutError):
+        async_env.step_wait(timeout=0.3)
+    # no result was lost, the step can still be waited for
+    obs, rewards, dones, infos = async_env.step_wait(timeout=2)
+    assert len(infos) == 3 and not dones.any()
+    async_env.step_async(actions)
+    with pytest.raises(mp.TimeoutError):
+        async_env.step_wait(timeout=0.3)
+    async_env.close(timeout=2)
+    assert async_env.closed
+
+    # a step still pending after the timeout of close terminates the workers
+    async_env = AsyncVectorParallelEnv([SlowEnv])
+    async_env.reset(seed=0)
+    async_env.step_async(actions[:1])
+    async_env.close(timeout=0.1)
+    assert async_env.closed and not async_env.processes[0].is_alive()
+
+
+def test_async_vector_reset_restarts_are_limited():
+    async_env = AsyncVectorParallelEnv(
+        [simple_spread_v2.parallel_env, ResetCrashingEnv]
+    )
+    with pytest.raises(RuntimeError, match="sub-environment 1"):
+        async_env.reset(seed=0)
+    assert async_env.num_restarts == [0, async_env.max_reset_restarts]
+    async_env.close(terminate=True)
+
+
+@pytest.mark.parametrize("vector_env", [SyncVectorParallelEnv, AsyncVectorParallelEnv])
+def test_terminal_observation_of_shared_obs(vector_env):
+    # with shared_obs, the observations are views of a buffer that the
+    # automatic reset overwrites
+    def env_fn():
+        return pong_v3.parallel_env(obs_type="ram", shared_obs=True, max_cycles=3)
+
+    vec_env = vector_env([env_fn] * 2)
+    env = env_fn()
+    vec_env.reset(seed=0)
+    env.reset(seed=0)
+    actions = np.ones((2, 2), dtype=np.int64)
+    for _ in range(3):
+        _, _, dones, infos = vec_env.step(actions)
+        last_obs = np.array(env.step({agent: 1 for agent in env.agents})[0]["first_0"])
+    assert dones.all()
+    for agent in vec_env.possible_agents:
+        np.testing.assert_array_equal(infos[0][agent]["terminal_observation"], last_obs)
+    vec_env.close()